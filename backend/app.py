@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, Response, render_template, jsonify, request
 from flask_cors import CORS
 from flask_login import LoginManager
 import json
@@ -6,9 +6,28 @@ import os
 from datetime import datetime, timedelta
 import random
 import logging
-from backend.db import init_db, db
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from sqlalchemy import func
+from werkzeug.datastructures import MultiDict
+from backend.db import init_db, db, pool_stats
+from backend.utils.latency import init_latency
+from backend.utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, init_metrics, metrics
 from backend.utils.auth import role_required
+from backend.utils.permissions import permissions, init_permissions
+from backend.utils.resource_catalog import ResourceCatalog
+from backend.utils.expiry import parse_expiry_window
+from backend.utils.response_cache import cached_response, response_cache
+from backend.utils.user_cache import init_user_cache, user_cache
+from backend.utils.access_audit import DECISIONS, access_audit, init_access_audit
+from backend.utils.password_hasher import init_password_hasher
+from backend.config import request_threads
+from backend.utils.upload_processing import init_upload_processing
+from backend.utils.pagination import (
+    COUNT_CAP, PaginationError, keyset_condition, page_payload, parse_date_arg, parse_page_args
+)
 from backend.models.contract import Contract
+from backend.routes.onboarding import onboarding_summary
 from backend.models.user import User
 
 app = Flask(__name__, template_folder='../templates', static_folder='../static')
@@ -18,14 +37,35 @@ CORS(app)
 # Initialize database
 init_db(app)
 
+# Request timing, status and DB query metrics, served at /metrics
+init_metrics(app)
+
+# Simulated backend latency and fault injection (off in production)
+init_latency(app)
+
+# Compiled role/feature permission policy
+init_permissions(app)
+
+# Buffered trail of permission decisions, written in the background
+init_access_audit(app)
+
 # Initialize Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'auth.login'
 
+# bcrypt work factor and the bounded verification pool
+init_password_hasher(app)
+
+# Uploads are checked and parsed on a background process pool
+init_upload_processing(app)
+
+# Session users are served from a short-lived in-process cache
+init_user_cache(app, User)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id), lambda uid: db.session.get(User, uid))
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -74,37 +114,22 @@ mock_onboarding_staff = [
     }
 ]
 
-# Mock data for resources (existing/enhanced)
-mock_resources = {
-    "Admin": [
-        {"title": "HR Policy Manual", "description": "Complete HR policies and procedures", "file_type": "pdf", "file_size": "2.5MB", "upload_date": "2025-01-15", "filename": "hr_policy_manual.pdf", "allowed_roles": ["Admin", "HR Specialist"]},
-        {"title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
-        {"title": "Salary Structure Guide", "description": "Confidential salary bands and structure", "file_type": "docx", "file_size": "850KB", "upload_date": "2025-01-20", "filename": "salary_structure.docx", "allowed_roles": ["Admin"]},
-        {"title": "Legal Compliance Documents", "description": "Legal requirements and compliance", "file_type": "zip", "file_size": "5.2MB", "upload_date": "2025-01-12", "filename": "legal_compliance.zip", "allowed_roles": ["Admin", "HR Specialist"]}
-    ],
-    "HR Specialist": [
-        {"title": "HR Policy Manual", "description": "Complete HR policies and procedures", "file_type": "pdf", "file_size": "2.5MB", "upload_date": "2025-01-15", "filename": "hr_policy_manual.pdf", "allowed_roles": ["Admin", "HR Specialist"]},
-        {"title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
-        {"title": "Recruitment Guidelines", "description": "Hiring process and procedures", "file_type": "docx", "file_size": "1.2MB", "upload_date": "2025-01-18", "filename": "recruitment_guide.docx", "allowed_roles": ["Admin", "HR Specialist", "Manager"]}
-    ],
-    "Manager": [
-        {"title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
-        {"title": "Management Best Practices", "description": "Team leadership guidelines", "file_type": "pdf", "file_size": "1.5MB", "upload_date": "2025-01-22", "filename": "management_guide.pdf", "allowed_roles": ["Admin", "Manager"]},
-        {"title": "Performance Review Templates", "description": "Annual review templates", "file_type": "docx", "file_size": "750KB", "upload_date": "2025-01-14", "filename": "performance_templates.docx", "allowed_roles": ["Admin", "HR Specialist", "Manager"]}
-    ],
-    "Engineer": [
-        {"title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
-        {"title": "Technical Documentation", "description": "Development standards and practices", "file_type": "pdf", "file_size": "3.2MB", "upload_date": "2025-01-16", "filename": "tech_docs.pdf", "allowed_roles": ["Admin", "Manager", "Engineer"]}
-    ],
-    "Marketing": [
-        {"title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
-        {"title": "Brand Guidelines", "description": "Company branding standards", "file_type": "pdf", "file_size": "4.1MB", "upload_date": "2025-01-19", "filename": "brand_guidelines.pdf", "allowed_roles": ["Admin", "Manager", "Marketing"]}
-    ],
-    "Intern": [
-        {"title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
-        {"title": "Intern Orientation Guide", "description": "Getting started as an intern", "file_type": "pdf", "file_size": "900KB", "upload_date": "2025-01-21", "filename": "intern_guide.pdf", "allowed_roles": ["Admin", "HR Specialist", "Intern"]}
-    ]
-}
+# Mock data for resources: each document stored once, visibility driven by allowed_roles
+mock_resources = [
+    {"id": "RES001", "title": "HR Policy Manual", "description": "Complete HR policies and procedures", "file_type": "pdf", "file_size": "2.5MB", "upload_date": "2025-01-15", "filename": "hr_policy_manual.pdf", "allowed_roles": ["Admin", "HR Specialist"]},
+    {"id": "RES002", "title": "Employee Handbook", "description": "Company rules and guidelines", "file_type": "pdf", "file_size": "1.8MB", "upload_date": "2025-01-10", "filename": "employee_handbook.pdf", "allowed_roles": ["Admin", "HR Specialist", "Manager", "Engineer", "Marketing", "Intern"]},
+    {"id": "RES003", "title": "Salary Structure Guide", "description": "Confidential salary bands and structure", "file_type": "docx", "file_size": "850KB", "upload_date": "2025-01-20", "filename": "salary_structure.docx", "allowed_roles": ["Admin"]},
+    {"id": "RES004", "title": "Legal Compliance Documents", "description": "Legal requirements and compliance", "file_type": "zip", "file_size": "5.2MB", "upload_date": "2025-01-12", "filename": "legal_compliance.zip", "allowed_roles": ["Admin", "HR Specialist"]},
+    {"id": "RES005", "title": "Recruitment Guidelines", "description": "Hiring process and procedures", "file_type": "docx", "file_size": "1.2MB", "upload_date": "2025-01-18", "filename": "recruitment_guide.docx", "allowed_roles": ["Admin", "HR Specialist", "Manager"]},
+    {"id": "RES006", "title": "Management Best Practices", "description": "Team leadership guidelines", "file_type": "pdf", "file_size": "1.5MB", "upload_date": "2025-01-22", "filename": "management_guide.pdf", "allowed_roles": ["Admin", "Manager"]},
+    {"id": "RES007", "title": "Performance Review Templates", "description": "Annual review templates", "file_type": "docx", "file_size": "750KB", "upload_date": "2025-01-14", "filename": "performance_templates.docx", "allowed_roles": ["Admin", "HR Specialist", "Manager"]},
+    {"id": "RES008", "title": "Technical Documentation", "description": "Development standards and practices", "file_type": "pdf", "file_size": "3.2MB", "upload_date": "2025-01-16", "filename": "tech_docs.pdf", "allowed_roles": ["Admin", "Manager", "Engineer"]},
+    {"id": "RES009", "title": "Brand Guidelines", "description": "Company branding standards", "file_type": "pdf", "file_size": "4.1MB", "upload_date": "2025-01-19", "filename": "brand_guidelines.pdf", "allowed_roles": ["Admin", "Manager", "Marketing"]},
+    {"id": "RES010", "title": "Intern Orientation Guide", "description": "Getting started as an intern", "file_type": "pdf", "file_size": "900KB", "upload_date": "2025-01-21", "filename": "intern_guide.pdf", "allowed_roles": ["Admin", "HR Specialist", "Intern"]}
+]
+
+# Role -> resource index over mock_resources
+mock_resource_catalog = ResourceCatalog(mock_resources)
 
 # NEW: Mock data for Time Off
 mock_time_off = {
@@ -168,19 +193,6 @@ mock_uploaded_files = [
     {"id": "F002", "title": "Team Building Photos", "original_filename": "team_photos.zip", "file_type": "zip", "file_size": "15.6MB", "category": "other", "uploaded_by": "HR Specialist", "upload_date": "2025-01-20", "upload_time": "10:15"}
 ]
 
-# ==========================================
-# ROLE-BASED ACCESS CONTROL
-# ==========================================
-
-role_module_access = {
-    "Admin": ["Contractors", "Onboarding", "Resources", "Upload", "Time Off", "Time Tracking", "Groups", "Entities", "Roles & Permissions", "Billing & Payments"],
-    "HR Specialist": ["Contractors", "Onboarding", "Resources", "Upload", "Time Off", "Time Tracking", "Groups"],
-    "Manager": ["Contractors", "Resources", "Upload", "Time Off"],
-    "Engineer": ["Resources", "Upload"],
-    "Marketing": ["Resources", "Upload"],
-    "Intern": ["Resources"]
-}
-
 # ==========================================
 # ROUTES
 # ==========================================
@@ -189,95 +201,390 @@ role_module_access = {
 def index():
     return render_template("index.html")
 
-def format_role_name(role):
-    """Convert role keys to proper format"""
-    role_mapping = {
-        'Admin': 'Admin',
-        'Hr Specialist': 'HR Specialist',
-        'Manager': 'Manager',
-        'Engineer': 'Engineer',
-        'Marketing': 'Marketing',
-        'Intern': 'Intern'
-    }
-    return role_mapping.get(role, role)
-
 @app.route("/api/role-access/<role>")
 def get_role_access(role):
-    role_formatted = format_role_name(role)
-    if role_formatted in role_module_access:
+    role_formatted = permissions.display_name(role)
+    if role_formatted:
         return jsonify({
             "role": role_formatted,
-            "modules": role_module_access[role_formatted],
+            "modules": list(permissions.modules(role)),
             "success": True
         })
     return jsonify({"error": "Invalid role", "success": False}), 400
 
+# Sortable contractor columns for keyset paging
+CONTRACTOR_SORT_COLUMNS = {
+    'id': Contract.id,
+    'name': Contract.name,
+    'position': Contract.position,
+    'contract_expiry': Contract.contract_expiry
+}
+
+def contractors_page(args):
+    """
+    One keyset page of contractors matching the filter arguments
+    
+    Raises:
+        PaginationError: for malformed paging or filter arguments
+    """
+    page = parse_page_args(args, CONTRACTOR_SORT_COLUMNS, 'name')
+    expiry_from = parse_date_arg(args, 'expiry_from')
+    expiry_to = parse_date_arg(args, 'expiry_to')
+    cursor = page["cursor"]
+    # parse_page_args has checked the cursor is a pair of strings
+    if cursor is not None and page["sort"] == 'contract_expiry':
+        try:
+            cursor = (datetime.strptime(cursor[0], "%Y-%m-%d").date(), cursor[1])
+        except ValueError:
+            raise PaginationError("Invalid cursor")
+    
+    # Filters only touch indexed columns
+    query = Contract.query
+    position = args.get('position')
+    if position:
+        query = query.filter(Contract.position == position)
+    name_prefix = args.get('name')
+    if name_prefix:
+        query = query.filter(Contract.name >= name_prefix, Contract.name < name_prefix + '\uffff')
+    if expiry_from:
+        query = query.filter(Contract.contract_expiry >= expiry_bound(expiry_from))
+    if expiry_to:
+        query = query.filter(Contract.contract_expiry <= expiry_bound(expiry_to))
+    
+    # Count before the cursor applies, stopping at COUNT_CAP rows
+    capped = query.with_entities(Contract.id).limit(COUNT_CAP).subquery()
+    total_count = db.session.query(func.count()).select_from(capped).scalar()
+    
+    sort_column = CONTRACTOR_SORT_COLUMNS[page["sort"]]
+    if cursor is not None:
+        query = query.filter(keyset_condition(sort_column, Contract.id, cursor, page["descending"]))
+    
+    if page["descending"]:
+        query = query.order_by(sort_column.desc(), Contract.id.desc())
+    else:
+        query = query.order_by(sort_column, Contract.id)
+    
+    # One extra row tells whether another page follows
+    contracts = query.limit(page["limit"] + 1).all()
+    contractors_data = [contract.to_dict() for contract in contracts[:page["limit"]]]
+    next_cursor = None
+    if len(contracts) > page["limit"]:
+        last = contractors_data[-1]
+        next_cursor = (last[page["sort"]], last['id'])
+    
+    return page_payload("contractors", contractors_data, next_cursor, total_count, total_count < COUNT_CAP)
+
 @app.route("/api/contractors/<role>")
 @role_required("contracts")
 def get_contractors(role):
     logger.info(f"Fetching contractors for role: {role}")
     try:
-        # Fetch contractors from database
-        contracts = Contract.query.all()
-        contractors_data = [contract.to_dict() for contract in contracts]
-        
-        logger.info(f"Successfully returned {len(contractors_data)} contractors from database")
-        return jsonify({"contractors": contractors_data, "success": True})
+        payload = contractors_page(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e), "success": False}), 400
     except Exception as e:
         logger.error(f"Database error fetching contractors: {str(e)}")
         return jsonify({"error": "Failed to fetch contractors", "success": False}), 500
+    
+    logger.info(f"Successfully returned {len(payload['contractors'])} contractors from database")
+    payload["success"] = True
+    return jsonify(payload)
+
+def expiry_bound(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+@app.route("/api/contractors/<role>/expiring")
+@role_required("contracts")
+def get_expiring_contractors(role):
+    try:
+        start, end = parse_expiry_window(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    
+    try:
+        # Range scan on the contract_expiry index
+        query = Contract.query
+        if start:
+            query = query.filter(Contract.contract_expiry >= expiry_bound(start))
+        if end:
+            query = query.filter(Contract.contract_expiry <= expiry_bound(end))
+        contracts = query.order_by(Contract.contract_expiry, Contract.id).all()
+        contractors_data = [contract.to_dict() for contract in contracts]
+        return jsonify({
+            "contractors": contractors_data,
+            "total_count": len(contractors_data),
+            "window": {"from": start, "to": end},
+            "success": True
+        })
+    except Exception as e:
+        logger.error(f"Database error fetching expiring contractors: {str(e)}")
+        return jsonify({"error": "Failed to fetch contractors", "success": False}), 500
+
+@app.route("/api/contractors/<role>/expiry-summary")
+@role_required("contracts")
+def get_expiry_summary(role):
+    try:
+        start = parse_date_arg(request.args, 'from')
+        end = parse_date_arg(request.args, 'to')
+    except PaginationError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    
+    try:
+        month = func.strftime('%Y-%m', Contract.contract_expiry)
+        query = db.session.query(month, func.count(Contract.id))
+        if start:
+            query = query.filter(Contract.contract_expiry >= expiry_bound(start))
+        if end:
+            query = query.filter(Contract.contract_expiry <= expiry_bound(end))
+        rows = query.group_by(month).order_by(month).all()
+        months = [{"month": m, "count": count} for m, count in rows]
+        return jsonify({
+            "months": months,
+            "total_count": sum(m["count"] for m in months),
+            "success": True
+        })
+    except Exception as e:
+        logger.error(f"Database error summarizing contract expiries: {str(e)}")
+        return jsonify({"error": "Failed to summarize contracts", "success": False}), 500
+
+# These mock payloads never change, so their cached responses are only
+# invalidated by a permission policy change
+def onboarding_payload(role):
+    return {"staff": mock_onboarding_staff}
+
+def resources_payload(role):
+    return {"resources": mock_resource_catalog.for_role(role)}
+
+def time_off_payload(role):
+    return {"time_off": mock_time_off}
+
+def time_tracking_payload(role):
+    return {"time_tracking": mock_time_tracking}
+
+def groups_payload(role):
+    return {"groups": mock_groups}
+
+def entities_payload(role):
+    return {"entities": mock_entities}
 
 @app.route("/api/onboarding/<role>")
 @role_required("onboarding")
+@cached_response()
 def get_onboarding(role):
     logger.info(f"Fetching onboarding data for role: {role}")
-    role_formatted = format_role_name(role)
-    if "Onboarding" in role_module_access.get(role_formatted, []):
+    if permissions.allows(role, "onboarding"):
         logger.info(f"Successfully returned {len(mock_onboarding_staff)} onboarding staff")
-        return jsonify({"staff": mock_onboarding_staff, "success": True})
+        return jsonify(dict(onboarding_payload(role), success=True))
     logger.warning(f"Access denied for role: {role}")
     return jsonify({"error": "Access denied for this role", "success": False}), 403
 
+@app.route("/api/onboarding/<role>/summary")
+@role_required("onboarding")
+def get_onboarding_summary(role):
+    try:
+        payload = onboarding_summary(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e), "success": False}), 400
+    payload["success"] = True
+    return jsonify(payload)
+
 @app.route("/api/resources/<role>")
 @role_required("resources")
+@cached_response(lambda: mock_resource_catalog.version)
 def get_resources(role):
     logger.info(f"Fetching resources for role: {role}")
-    role_formatted = format_role_name(role)
-    if "Resources" in role_module_access.get(role_formatted, []):
-        resources_count = len(mock_resources.get(role_formatted, []))
-        logger.info(f"Successfully returned {resources_count} resources for {role}")
-        return jsonify({"resources": mock_resources.get(role_formatted, []), "success": True})
+    if permissions.allows(role, "resources"):
+        payload = resources_payload(role)
+        logger.info(f"Successfully returned {len(payload['resources'])} resources for {role}")
+        return jsonify(dict(payload, success=True))
     logger.warning(f"Access denied for role: {role}")
     return jsonify({"error": "Access denied for this role", "success": False}), 403
 
 @app.route("/api/time-off/<role>")
+@cached_response()
 def get_time_off(role):
-    role_formatted = format_role_name(role)
-    if "Time Off" in role_module_access.get(role_formatted, []):
-        return jsonify({"time_off": mock_time_off, "success": True})
+    if permissions.allows(role, "time-off"):
+        return jsonify(dict(time_off_payload(role), success=True))
     return jsonify({"error": "Access denied for this role", "success": False}), 403
 
 @app.route("/api/time-tracking/<role>")
+@cached_response()
 def get_time_tracking(role):
-    role_formatted = format_role_name(role)
-    if "Time Tracking" in role_module_access.get(role_formatted, []):
-        return jsonify({"time_tracking": mock_time_tracking, "success": True})
+    if permissions.allows(role, "time-tracking"):
+        return jsonify(dict(time_tracking_payload(role), success=True))
     return jsonify({"error": "Access denied for this role", "success": False}), 403
 
 @app.route("/api/groups/<role>")
+@cached_response()
 def get_groups(role):
-    role_formatted = format_role_name(role)
-    if "Groups" in role_module_access.get(role_formatted, []):
-        return jsonify({"groups": mock_groups, "success": True})
+    if permissions.allows(role, "groups"):
+        return jsonify(dict(groups_payload(role), success=True))
     return jsonify({"error": "Access denied for this role", "success": False}), 403
 
 @app.route("/api/entities/<role>")
+@cached_response()
 def get_entities(role):
-    role_formatted = format_role_name(role)
-    if "Entities" in role_module_access.get(role_formatted, []):
-        return jsonify({"entities": mock_entities, "success": True})
+    if permissions.allows(role, "entities"):
+        return jsonify(dict(entities_payload(role), success=True))
     return jsonify({"error": "Access denied for this role", "success": False}), 403
 
+# ==========================================
+# AGGREGATE DASHBOARD
+# ==========================================
+
+# Module name -> (permission feature, payload builder taking the role)
+DASHBOARD_MODULES = {
+    "contracts": ("contracts", lambda role: contractors_page(MultiDict())),
+    "onboarding": ("onboarding", onboarding_payload),
+    "resources": ("resources", resources_payload),
+    "time-off": ("time-off", time_off_payload),
+    "time-tracking": ("time-tracking", time_tracking_payload),
+    "groups": ("groups", groups_payload),
+    "entities": ("entities", entities_payload)
+}
+
+# Seconds a module may run, and may wait for a thread, before the
+# dashboard answers without it
+DASHBOARD_MODULE_TIMEOUT = float(os.environ.get('MUVHR_DASHBOARD_TIMEOUT', 5))
+
+# Enough threads for every module of every request a worker serves at once,
+# so one request's modules do not queue behind another's. Threads start
+# lazily, so pre-fork workers each get their own.
+DASHBOARD_WORKERS = request_threads() * len(DASHBOARD_MODULES)
+dashboard_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+
+def build_module(name, role, started):
+    """Run one module builder in its own app context (and database session)"""
+    started[name] = time.monotonic()
+    builder = DASHBOARD_MODULES[name][1]
+    with app.app_context():
+        try:
+            return {"success": True, "data": builder(role)}
+        except Exception as e:
+            logger.error(f"Dashboard module {name} failed for {role}: {str(e)}")
+            return {"success": False, "error": f"Failed to load {name}", "status": 500}
+
+@app.route("/api/dashboard/<role>")
+def get_dashboard(role):
+    """
+    Payloads for every module the role may access, in one response
+    
+    ?modules=contracts,groups limits the response to a subset. Modules are
+    built concurrently and fail independently: a module that errors or
+    times out reports its own error while the others are still returned.
+    """
+    role = role.lower()
+    if not permissions.is_role(role):
+        logger.warning(f"Invalid role: {role}")
+        return jsonify({"error": "Invalid role", "success": False}), 401
+    
+    requested = request.args.get('modules')
+    if requested:
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in DASHBOARD_MODULES]
+        if unknown:
+            return jsonify({"error": f"Unknown modules: {', '.join(unknown)}", "success": False}), 400
+    else:
+        names = list(DASHBOARD_MODULES)
+    
+    modules = {}
+    futures = {}
+    started = {}
+    submitted = time.monotonic()
+    for name in dict.fromkeys(names):
+        if permissions.allows(role, DASHBOARD_MODULES[name][0]):
+            futures[name] = dashboard_executor.submit(build_module, name, role, started)
+        elif requested:
+            modules[name] = {"success": False, "error": "Access denied for this role", "status": 403}
+    
+    # A module's deadline counts from when it starts running; one still
+    # queued a full timeout after submission is cancelled instead
+    pending = dict(futures)
+    while pending:
+        now = time.monotonic()
+        for name, future in list(pending.items()):
+            if future.done():
+                modules[name] = future.result()
+            elif started.get(name, submitted) + DASHBOARD_MODULE_TIMEOUT > now:
+                continue
+            elif name not in started and not future.cancel():
+                # Started between the check and the cancel
+                started.setdefault(name, now)
+                continue
+            else:
+                logger.warning(f"Dashboard module {name} timed out for {role}")
+                modules[name] = {"success": False, "error": f"Timed out loading {name}", "status": 504}
+            del pending[name]
+        if pending:
+            next_deadline = min(started.get(name, submitted) for name in pending) + DASHBOARD_MODULE_TIMEOUT
+            wait(pending.values(), timeout=max(0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+    
+    logger.info(f"Dashboard for {role}: {len(futures)} modules")
+    return jsonify({"role": role, "modules": modules, "success": True})
+
+@app.route("/api/cache-stats")
+@role_required("roles-permissions")
+def get_cache_stats():
+    return jsonify({
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "success": True
+    })
+
+@app.route("/api/db-stats")
+@role_required("roles-permissions")
+def get_db_stats():
+    return jsonify({"pool": pool_stats(), "success": True})
+
+@app.route("/api/access-audit")
+@role_required("roles-permissions")
+def get_access_audit():
+    """Recent permission decisions; for_role/feature/decision/denied filter them"""
+    try:
+        window = float(request.args.get('window', 3600))
+        limit = min(int(request.args.get('limit', 100)), 1000)
+    except ValueError:
+        return jsonify({"error": "window and limit must be numbers", "success": False}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be at least 1", "success": False}), 400
+    decision = request.args.get('decision')
+    if decision and decision not in DECISIONS:
+        return jsonify({"error": f"decision must be one of {', '.join(DECISIONS)}", "success": False}), 400
+    denied = request.args.get('denied')
+    source = 'store' if request.args.get('source') == 'store' else 'memory'
+    
+    entries = access_audit.query(
+        since=time.time() - window,
+        role=request.args.get('for_role'),
+        feature=request.args.get('feature'),
+        decision=decision,
+        denied=None if denied is None else denied.lower() in ('1', 'true', 'yes'),
+        limit=limit,
+        source=source
+    )
+    return jsonify({"entries": entries, "window": window, "source": source, "success": True})
+
+@app.route("/api/access-audit/denials")
+@role_required("roles-permissions")
+def get_access_denials():
+    """Denied permission checks per role over the last ?window= seconds"""
+    try:
+        window = float(request.args.get('window', 3600))
+    except ValueError:
+        return jsonify({"error": "window must be a number of seconds", "success": False}), 400
+    source = 'store' if request.args.get('source') == 'store' else 'memory'
+    return jsonify({
+        "denials": access_audit.denials_by_role(window, source=source),
+        "window": window,
+        "source": source,
+        "audit": access_audit.stats(),
+        "success": True
+    })
+
+@app.route("/metrics")
+def get_metrics():
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route("/api/upload", methods=["POST"])
 @role_required("uploads")
 def mock_upload():
@@ -301,5 +608,21 @@ def get_uploaded_files():
 from backend.routes.auth import auth_bp
 app.register_blueprint(auth_bp)
 
+# Register module blueprints
+from backend.routes.contracts import contracts_bp
+from backend.routes.onboarding import onboarding_bp
+from backend.routes.resources import resources_bp
+from backend.routes.uploads import MAX_REQUEST_SIZE, uploads_bp
+from backend.routes.search import search_bp
+app.register_blueprint(contracts_bp)
+app.register_blueprint(onboarding_bp)
+app.register_blueprint(resources_bp)
+app.register_blueprint(uploads_bp)
+app.register_blueprint(search_bp)
+
+# Werkzeug stops reading any body past the largest upload, including
+# chunked bodies that carry no Content-Length
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_SIZE
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""Settings shared by the pre-fork server and the app it serves"""
+
+import os
+
+# Request threads per worker process
+DEFAULT_THREADS = 4
+
+
+def request_threads(environ=None):
+    """
+    Request threads per worker, from MUVHR_THREADS
+
+    The pre-fork server exports its --threads value under this name before
+    forking, so the app sizes per-request pools to match.
+    """
+    env = os.environ if environ is None else environ
+    return int(env.get('MUVHR_THREADS') or DEFAULT_THREADS)
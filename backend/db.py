@@ -1,15 +1,177 @@
+import json
+import logging
+import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
 
 db = SQLAlchemy()
 
+# Relative SQLite paths resolve inside the Flask instance folder
+DEFAULT_DATABASE_URI = 'sqlite:///muvhr.db'
+
+# Applied to every new SQLite connection. WAL lets readers proceed while a
+# writer commits; synchronous=NORMAL is durable across crashes in WAL mode
+# (a power loss may drop the last commits, never corrupt the file).
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative values are KiB rather than pages
+    "cache_size": -20000
+}
+
+DEFAULT_ENGINE_OPTIONS = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True
+}
+
+# Environment variables mapped onto engine options
+ENGINE_OPTION_ENV = {
+    "pool_size": "MUVHR_DB_POOL_SIZE",
+    "max_overflow": "MUVHR_DB_MAX_OVERFLOW",
+    "pool_timeout": "MUVHR_DB_POOL_TIMEOUT",
+    "pool_recycle": "MUVHR_DB_POOL_RECYCLE"
+}
+
+# Pool sizing options that in-memory SQLite's single-connection pool rejects
+POOL_SIZING_OPTIONS = ("pool_size", "max_overflow", "pool_timeout")
+
+
+def load_database_config(app):
+    """
+    Resolve the database URI, engine options and SQLite pragmas
+
+    The URI comes from SQLALCHEMY_DATABASE_URI in the app config, then the
+    MUVHR_DATABASE_URL environment variable. Engine options start from
+    DEFAULT_ENGINE_OPTIONS, take MUVHR_DB_POOL_* variables and a
+    MUVHR_DB_ENGINE_OPTIONS JSON object, and finally any
+    SQLALCHEMY_ENGINE_OPTIONS already set on the app. SQLite pragmas are
+    overridden by SQLITE_PRAGMAS in the config or MUVHR_SQLITE_PRAGMAS JSON.
+
+    Returns:
+        tuple: (uri, engine options dict, pragmas dict)
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or os.environ.get('MUVHR_DATABASE_URL') or DEFAULT_DATABASE_URI
+
+    options = dict(DEFAULT_ENGINE_OPTIONS)
+    for option, variable in ENGINE_OPTION_ENV.items():
+        if os.environ.get(variable):
+            options[option] = int(os.environ[variable])
+    if os.environ.get('MUVHR_DB_ENGINE_OPTIONS'):
+        options.update(json.loads(os.environ['MUVHR_DB_ENGINE_OPTIONS']))
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') in ('sqlite:', 'sqlite:/')):
+        for option in POOL_SIZING_OPTIONS:
+            options.pop(option, None)
+
+    pragmas = dict(SQLITE_PRAGMAS)
+    overrides = app.config.get('SQLITE_PRAGMAS')
+    if overrides is None and os.environ.get('MUVHR_SQLITE_PRAGMAS'):
+        overrides = json.loads(os.environ['MUVHR_SQLITE_PRAGMAS'])
+    pragmas.update(overrides or {})
+
+    return uri, options, pragmas
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Run PRAGMA statements on a raw sqlite3 connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Apply pragmas to every connection the engine opens (no-op for other databases)"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
 def init_db(app):
     """Initialize SQLAlchemy with Flask app"""
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///muvhr.db'
+    uri, options, pragmas = load_database_config(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    
+
     db.init_app(app)
-    
+
     with app.app_context():
-        from backend.models.contract import Contract
-        db.create_all()
-        print("Database tables created successfully!")
\ No newline at end of file
+        install_sqlite_pragmas(db.engine, pragmas)
+        logger.info(f"Database: {db.engine.url.render_as_string(hide_password=True)}")
+
+
+def add_missing_columns():
+    """
+    Add columns declared on a model but missing from its existing table
+
+    New columns must be nullable or carry a server_default.
+
+    Returns:
+        list: "table.column" names that were added
+    """
+    inspector = inspect(db.engine)
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+            with db.engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            added.append(f"{table.name}.{column.name}")
+            logger.info(f"Added column {table.name}.{column.name}")
+    return added
+
+
+def create_tables():
+    """
+    Create missing tables, columns and indexes (run from run/init_db.py, needs an app context)
+
+    Returns:
+        list: "table.column" names added to existing tables
+    """
+    from backend.models.contract import Contract
+    from backend.models.onboarding import Staff, OnboardingTask
+    from backend.models.user import User
+    db.create_all()
+    # create_all skips existing tables, so add columns and indexes declared since
+    added = add_missing_columns()
+    if any(name.startswith('staff.tasks_') for name in added):
+        # New rollup columns start at zero; fill them from the task rows
+        # before any caller (seeding, imports, the app) can read or bump them
+        count = Staff.refresh_progress()
+        db.session.commit()
+        logger.info(f"Recounted onboarding progress for {count} staff")
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    logger.info("Database tables created successfully")
+    return added
+
+
+def pool_stats():
+    """Connection pool counters for the default engine (needs an app context)"""
+    pool = db.engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    return stats
@@ -4,9 +4,9 @@ class Contract(db.Model):
     __tablename__ = 'contracts'
     
     id = db.Column(db.String(10), primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    position = db.Column(db.String(100), nullable=False)
-    contract_expiry = db.Column(db.Date, nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    position = db.Column(db.String(100), nullable=False, index=True)
+    contract_expiry = db.Column(db.Date, nullable=False, index=True)
     
     def to_dict(self):
         return {
@@ -0,0 +1,73 @@
+from sqlalchemy import func, select, update
+from backend.db import db
+
+class Staff(db.Model):
+    __tablename__ = 'staff'
+
+    id = db.Column(db.String(10), primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    position = db.Column(db.String(100), nullable=False)
+    start_date = db.Column(db.Date, nullable=False, index=True)
+    # Progress rollups, kept in step with task flips by toggle_onboarding_task
+    # so summaries never load task lists
+    tasks_completed = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    tasks_total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    tasks = db.relationship(
+        'OnboardingTask',
+        back_populates='staff',
+        order_by='OnboardingTask.task_index',
+        cascade='all, delete-orphan'
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'position': self.position,
+            'start_date': self.start_date.strftime('%Y-%m-%d') if self.start_date else None,
+            'tasks_completed': self.tasks_completed,
+            'tasks_total': self.tasks_total,
+            'tasks': [task.to_dict() for task in self.tasks]
+        }
+
+    @staticmethod
+    def refresh_progress(staff_ids=None):
+        """
+        Recount tasks_completed/tasks_total from the task rows
+        
+        Run after tasks are inserted or deleted in bulk (migrations, seeding);
+        single flips are applied incrementally instead. Does not commit.
+        """
+        completed = (
+            select(func.count(OnboardingTask.id))
+            .where(OnboardingTask.staff_id == Staff.id, OnboardingTask.completed.is_(True))
+            .scalar_subquery()
+        )
+        total = select(func.count(OnboardingTask.id)).where(OnboardingTask.staff_id == Staff.id).scalar_subquery()
+        stmt = update(Staff).values(tasks_completed=completed, tasks_total=total)
+        if staff_ids is not None:
+            stmt = stmt.where(Staff.id.in_(staff_ids))
+        return db.session.execute(stmt).rowcount
+
+class OnboardingTask(db.Model):
+    __tablename__ = 'onboarding_tasks'
+    __table_args__ = (
+        db.UniqueConstraint('staff_id', 'task_index', name='uq_onboarding_tasks_staff_task'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    staff_id = db.Column(db.String(10), db.ForeignKey('staff.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Task id as exposed by the API; unique per staff member
+    task_index = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    completed = db.Column(db.Boolean, nullable=False, default=False)
+
+    staff = db.relationship('Staff', back_populates='tasks')
+
+    def to_dict(self):
+        return {
+            'id': self.task_index,
+            'name': self.name,
+            'completed': self.completed
+        }
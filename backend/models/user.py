@@ -11,8 +11,8 @@ class User(UserMixin, db.Model):
     role = db.Column(db.String(50), nullable=False)
 
     def check_password(self, password):
-        from flask_bcrypt import check_password_hash
-        return check_password_hash(self.password_hash, password)
+        from backend.utils.password_hasher import password_hasher
+        return password_hasher.verify(self.password_hash, password)
     
     def to_dict(self):
         return {
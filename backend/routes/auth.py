@@ -2,20 +2,27 @@ from flask import Blueprint, request, jsonify
 from flask_login import login_user, logout_user, current_user
 from backend.models.user import User
 from backend.db import db
-from flask_bcrypt import check_password_hash
 from functools import wraps
+import logging
+from backend.utils.permissions import permissions
+from backend.utils.user_cache import user_cache
+from backend.utils.password_hasher import password_hasher, HasherBusyError
+
+logger = logging.getLogger(__name__)
 
 auth_bp = Blueprint("auth", __name__)
 
-# Role permissions mapping
-role_permissions = {
-    "admin": ["Contractors", "Onboarding", "Resources", "Upload", "Time Off", "Time Tracking", "Groups", "Entities", "Roles & Permissions", "Billing & Payments"],
-    "hr": ["Contractors", "Onboarding", "Resources", "Upload", "Time Off", "Time Tracking", "Groups"],
-    "manager": ["Contractors", "Resources", "Upload", "Time Off"],
-    "engineer": ["Resources", "Upload"],
-    "marketing": ["Resources", "Upload"],
-    "intern": ["Resources"]
-}
+def rehash_password(user, password):
+    """Re-hash a verified password at the configured work factor"""
+    try:
+        user.password_hash = password_hasher.hash(password)
+        db.session.commit()
+    except HasherBusyError:
+        # The login itself succeeded; upgrade the hash on a later login
+        db.session.rollback()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to rehash password for {user.username}: {str(e)}")
 
 @auth_bp.route("/login", methods=["POST"])
 def login():
@@ -24,13 +31,26 @@ def login():
         return jsonify({"error": "Username and password required"}), 400
         
     user = User.query.filter_by(username=data["username"]).first()
-    if user and user.check_password(data["password"]):
+    try:
+        # Bounded bcrypt concurrency; a saturated hasher fails fast with 503
+        valid = user is not None and password_hasher.verify(user.password_hash, data["password"])
+        if valid and password_hasher.needs_rehash(user.password_hash):
+            rehash_password(user, data["password"])
+    except HasherBusyError as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    
+    if valid:
         login_user(user)
+        user_cache.put(user)
         return jsonify({"success": True, "role": user.role})
     return jsonify({"error": "Invalid credentials"}), 401
 
 @auth_bp.route("/logout", methods=["POST"])
 def logout():
+    if current_user.is_authenticated:
+        user_cache.invalidate(current_user.id)
     logout_user()
     return jsonify({"success": True})
 
@@ -48,8 +68,7 @@ def role_required(feature):
             if not current_user.is_authenticated:
                 return jsonify({"error": "Not logged in"}), 401
             
-            role = current_user.role.lower()
-            if role not in role_permissions or feature not in role_permissions[role]:
+            if not permissions.allows(current_user.role, feature):
                 return jsonify({"error": "Access denied"}), 403
             return f(*args, **kwargs)
         return decorated_function
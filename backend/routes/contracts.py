@@ -1,40 +1,50 @@
 from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta
-import json
-import os
-import time
+from backend.utils.doc_cache import load_mock_document
+from backend.utils.auth import check_role_access
+from backend.utils.expiry import count_by_month, is_iso_date, parse_expiry_window
+from backend.utils.pagination import (
+    PaginationError, SortedView, page_payload, parse_date_arg, parse_page_args
+)
 
 contracts_bp = Blueprint('contracts', __name__)
 
-def load_contracts():
-    """Load contracts from JSON file with error handling"""
-    try:
-        mock_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mock', 'contracts.json')
-        with open(mock_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-    except json.JSONDecodeError:
-        return []
+CONTRACT_SORT_FIELDS = ('id', 'name', 'position', 'contract_expiry')
+
+# Sorted views per field, rebuilt when the cached document is reloaded
+_sorted_views = {}
+_views_source = None
+
+def _views_for(contracts):
+    global _views_source
+    if contracts is not _views_source:
+        _sorted_views.clear()
+        _views_source = contracts
+    return _sorted_views
+
+def sorted_contracts(contracts, field):
+    """Return the SortedView of contracts for a sort field"""
+    views = _views_for(contracts)
+    view = views.get(field)
+    if view is None:
+        view = views[field] = SortedView(contracts, field)
+    return view
+
+def contracts_by_expiry(contracts):
+    """SortedView by expiry date, leaving out contracts without a valid date"""
+    views = _views_for(contracts)
+    view = views.get('expiry')
+    if view is None:
+        valid = [c for c in contracts if is_iso_date(c.get('contract_expiry'))]
+        view = views['expiry'] = SortedView(valid, 'contract_expiry')
+    return view
 
-def check_role_access(user_role, feature='contracts'):
-    """Check if user role has access to contracts feature"""
-    role_permissions = {
-        'admin': ['contracts', 'onboarding', 'resources', 'uploads'],
-        'hr': ['contracts', 'onboarding'],
-        'manager': ['contracts'],
-        'engineer': [],
-        'marketing': [],
-        'intern': []
-    }
-    
-    return feature in role_permissions.get(user_role, [])
+def load_contracts(copy_result=False):
+    """Load contracts from the cached JSON document"""
+    return load_mock_document('contracts.json', copy_result=copy_result)
 
 @contracts_bp.route("/contracts", methods=["GET"])
 def list_contracts():
     """Get contracts with role-based filtering"""
-    time.sleep(0.3)  # Simulate API delay
-    
     user_role = request.args.get('role', '').lower()
     if not user_role:
         return jsonify({"error": "Role parameter is required"}), 400
@@ -43,6 +53,13 @@ def list_contracts():
     if not check_role_access(user_role, 'contracts'):
         return jsonify({"error": "Access denied - insufficient permissions"}), 403
     
+    try:
+        page = parse_page_args(request.args, CONTRACT_SORT_FIELDS, 'name')
+        expiry_from = parse_date_arg(request.args, 'expiry_from')
+        expiry_to = parse_date_arg(request.args, 'expiry_to')
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    
     contracts = load_contracts()
     if not contracts:
         return jsonify({"error": "Error loading contracts data"}), 500
@@ -53,17 +70,39 @@ def list_contracts():
         # For demo, showing all but could be filtered
         pass
     
-    return jsonify({
-        "contracts": contracts,
-        "role": user_role,
-        "total_count": len(contracts)
-    })
+    # A filter on the sort field becomes a binary-searched bound,
+    # the others are checked against each scanned record
+    view = sorted_contracts(contracts, page["sort"])
+    low = high = None
+    checks = []
+    position = request.args.get('position')
+    if position:
+        if page["sort"] == 'position':
+            # Bounds select the prefix range; the check drops longer titles
+            low = high = position
+        checks.append(lambda c: c.get('position') == position)
+    name_prefix = request.args.get('name')
+    if name_prefix:
+        if page["sort"] == 'name':
+            low = high = name_prefix
+        else:
+            checks.append(lambda c: (c.get('name') or '').startswith(name_prefix))
+    if expiry_from or expiry_to:
+        if page["sort"] == 'contract_expiry':
+            low, high = expiry_from, expiry_to
+        else:
+            checks.append(lambda c: (not expiry_from or (c.get('contract_expiry') or '') >= expiry_from)
+                          and (not expiry_to or (c.get('contract_expiry') or '') <= expiry_to))
+    predicate = (lambda c: all(check(c) for check in checks)) if checks else None
+    
+    items, next_cursor, total_count, exact = view.page(
+        page["limit"], page["cursor"], page["descending"], predicate, low, high
+    )
+    return jsonify(page_payload("contracts", items, next_cursor, total_count, exact, role=user_role))
 
 @contracts_bp.route("/contracts/expiring", methods=["GET"])
 def expiring_contracts():
-    """Get contracts expiring within 30 days"""
-    time.sleep(0.3)  # Simulate API delay
-    
+    """Get contracts expiring within a window (default: overdue or within 30 days)"""
     user_role = request.args.get('role', '').lower()
     if not user_role:
         return jsonify({"error": "Role parameter is required"}), 400
@@ -71,24 +110,50 @@ def expiring_contracts():
     if not check_role_access(user_role, 'contracts'):
         return jsonify({"error": "Access denied - insufficient permissions"}), 403
     
+    try:
+        start, end = parse_expiry_window(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    
     contracts = load_contracts()
     if not contracts:
         return jsonify({"error": "Error loading contracts data"}), 500
     
-    today = datetime.now().date()
-    thirty_days = today + timedelta(days=30)
-    
-    expiring = []
-    for contractor in contracts:
-        try:
-            expiry_date = datetime.strptime(contractor["contract_expiry"], "%Y-%m-%d").date()
-            if expiry_date <= thirty_days:
-                expiring.append(contractor)
-        except ValueError:
-            continue
+    # ISO dates sort as strings, so the window is two binary searches
+    expiring = contracts_by_expiry(contracts).between(start, end)
     
     return jsonify({
         "contracts": expiring,
         "role": user_role,
-        "total_count": len(expiring)
-    })
\ No newline at end of file
+        "total_count": len(expiring),
+        "window": {"from": start, "to": end}
+    })
+
+@contracts_bp.route("/contracts/expiry-summary", methods=["GET"])
+def expiry_summary():
+    """Get contract expiry counts per month"""
+    user_role = request.args.get('role', '').lower()
+    if not user_role:
+        return jsonify({"error": "Role parameter is required"}), 400
+    
+    if not check_role_access(user_role, 'contracts'):
+        return jsonify({"error": "Access denied - insufficient permissions"}), 403
+    
+    try:
+        start = parse_date_arg(request.args, 'from')
+        end = parse_date_arg(request.args, 'to')
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    contracts = load_contracts()
+    if not contracts:
+        return jsonify({"error": "Error loading contracts data"}), 500
+    
+    in_range = contracts_by_expiry(contracts).between(start, end)
+    months = count_by_month(c['contract_expiry'] for c in in_range)
+    
+    return jsonify({
+        "months": months,
+        "role": user_role,
+        "total_count": len(in_range)
+    })
@@ -1,49 +1,126 @@
 from flask import Blueprint, jsonify, request
-import json
-import os
-import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, case, func, update
+from sqlalchemy.orm import joinedload
+import logging
+from backend.db import db
+from backend.models.onboarding import Staff, OnboardingTask
+from backend.utils.doc_cache import load_mock_document
+from backend.utils.auth import check_role_access
+from backend.utils.pagination import (
+    PaginationError, keyset_condition, page_payload, parse_date_arg, parse_page_args
+)
+
+logger = logging.getLogger(__name__)
 
 onboarding_bp = Blueprint('onboarding', __name__)
 
-def load_onboarding_data():
-    """Load onboarding data from JSON file with error handling"""
-    try:
-        mock_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mock', 'onboarding.json')
-        with open(mock_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-    except json.JSONDecodeError:
-        return []
+# Days after start_date by which every onboarding task should be done
+DEFAULT_DUE_DAYS = 30
 
-def save_onboarding_data(data):
-    """Save onboarding data to JSON file"""
-    try:
-        mock_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mock', 'onboarding.json')
-        with open(mock_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception:
-        return False
+STAFF_SORT_COLUMNS = {
+    'id': Staff.id,
+    'name': Staff.name,
+    'start_date': Staff.start_date
+}
+
+def load_onboarding_data(copy_result=False):
+    """Load legacy onboarding data from the cached JSON document (migration source)"""
+    return load_mock_document('onboarding.json', copy_result=copy_result)
+
+def completion_percentage(completed, total):
+    return round(100.0 * completed / total, 1) if total else None
 
-def check_role_access(user_role, feature='onboarding'):
-    """Check if user role has access to onboarding feature"""
-    role_permissions = {
-        'admin': ['onboarding', 'contracts', 'resources', 'uploads'],
-        'hr': ['onboarding', 'contracts'],
-        'manager': ['onboarding'],
-        'engineer': ['onboarding'],  # Read-only for engineers
-        'marketing': ['onboarding'],  # Read-only for marketing
-        'intern': ['onboarding']  # Read-only for interns
+def progress_dict(staff, due_before):
+    """Rollup view of one staff member, without their task list"""
+    return {
+        'id': staff.id,
+        'name': staff.name,
+        'position': staff.position,
+        'start_date': staff.start_date.strftime('%Y-%m-%d'),
+        'tasks_completed': staff.tasks_completed,
+        'tasks_total': staff.tasks_total,
+        'completion_percentage': completion_percentage(staff.tasks_completed, staff.tasks_total),
+        'overdue': staff.tasks_completed < staff.tasks_total and staff.start_date < due_before
     }
-    
-    return feature in role_permissions.get(user_role, [])
+
+def onboarding_summary(args, today=None):
+    """
+    Cohort progress aggregates plus one keyset page of per-staff rollups
+    
+    Reads start_from/start_to (cohort by start date), due_days and the
+    usual limit/cursor/sort/order arguments. Only the staff counters are
+    read; task rows are never loaded.
+    
+    Raises:
+        PaginationError: for malformed arguments
+    """
+    page = parse_page_args(args, STAFF_SORT_COLUMNS, 'start_date')
+    start_from = parse_date_arg(args, 'start_from')
+    start_to = parse_date_arg(args, 'start_to')
+    try:
+        due_days = int(args.get('due_days', DEFAULT_DUE_DAYS))
+    except ValueError:
+        raise PaginationError("due_days must be an integer")
+    cursor = page["cursor"]
+    # parse_page_args has checked the cursor is a pair of strings
+    if cursor is not None and page["sort"] == 'start_date':
+        try:
+            cursor = (datetime.strptime(cursor[0], "%Y-%m-%d").date(), cursor[1])
+        except ValueError:
+            raise PaginationError("Invalid cursor")
+    
+    # Overdue: unfinished tasks more than due_days after the start date
+    due_before = (today or date.today()) - timedelta(days=due_days)
+    overdue = and_(Staff.tasks_completed < Staff.tasks_total, Staff.start_date < due_before)
+    finished = and_(Staff.tasks_total > 0, Staff.tasks_completed >= Staff.tasks_total)
+    
+    filters = []
+    if start_from:
+        filters.append(Staff.start_date >= datetime.strptime(start_from, "%Y-%m-%d").date())
+    if start_to:
+        filters.append(Staff.start_date <= datetime.strptime(start_to, "%Y-%m-%d").date())
+    
+    staff_count, tasks_completed, tasks_total, finished_count, overdue_count = db.session.query(
+        func.count(Staff.id),
+        func.coalesce(func.sum(Staff.tasks_completed), 0),
+        func.coalesce(func.sum(Staff.tasks_total), 0),
+        func.coalesce(func.sum(case((finished, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((overdue, 1), else_=0)), 0)
+    ).filter(*filters).one()
+    
+    sort_column = STAFF_SORT_COLUMNS[page["sort"]]
+    query = Staff.query.filter(*filters)
+    if cursor is not None:
+        query = query.filter(keyset_condition(sort_column, Staff.id, cursor, page["descending"]))
+    if page["descending"]:
+        query = query.order_by(sort_column.desc(), Staff.id.desc())
+    else:
+        query = query.order_by(sort_column, Staff.id)
+    
+    rows = query.limit(page["limit"] + 1).all()
+    staff_data = [progress_dict(staff, due_before) for staff in rows[:page["limit"]]]
+    next_cursor = None
+    if len(rows) > page["limit"]:
+        last = staff_data[-1]
+        next_cursor = (last[page["sort"]], last['id'])
+    
+    cohort = {
+        "staff": staff_count,
+        "tasks_completed": tasks_completed,
+        "tasks_total": tasks_total,
+        "completion_percentage": completion_percentage(tasks_completed, tasks_total),
+        "completed_staff": finished_count,
+        "overdue": overdue_count,
+        "due_days": due_days,
+        "start_from": start_from,
+        "start_to": start_to
+    }
+    return page_payload("staff", staff_data, next_cursor, staff_count, True, cohort=cohort)
 
 @onboarding_bp.route("/onboarding", methods=["GET"])
 def list_onboarding():
     """Get onboarding data with role-based access"""
-    time.sleep(0.4)  # Simulate API delay
-    
     user_role = request.args.get('role', '').lower()
     if not user_role:
         return jsonify({"error": "Role parameter is required"}), 400
@@ -51,27 +128,62 @@ def list_onboarding():
     if not check_role_access(user_role, 'onboarding'):
         return jsonify({"error": "Access denied - insufficient permissions"}), 403
     
-    staff_data = load_onboarding_data()
-    if not staff_data:
+    # Staff and their tasks in one joined query
+    staff_rows = Staff.query.options(joinedload(Staff.tasks)).order_by(Staff.id).all()
+    if not staff_rows:
         return jsonify({"error": "Error loading onboarding data"}), 500
     
+    staff_data = [staff.to_dict() for staff in staff_rows]
     return jsonify({
         "staff": staff_data,
         "role": user_role,
         "total_count": len(staff_data)
     })
 
+@onboarding_bp.route("/onboarding/summary", methods=["GET"])
+def onboarding_progress_summary():
+    """Completion and overdue rollups for a hiring cohort, without task lists"""
+    user_role = request.args.get('role', '').lower()
+    if not user_role:
+        return jsonify({"error": "Role parameter is required"}), 400
+    
+    if not check_role_access(user_role, 'onboarding'):
+        return jsonify({"error": "Access denied - insufficient permissions"}), 403
+    
+    try:
+        payload = onboarding_summary(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    payload["role"] = user_role
+    return jsonify(payload)
+
+@onboarding_bp.route("/onboarding/<staff_id>", methods=["GET"])
+def onboarding_detail(staff_id):
+    """One staff member with their task list, for drilling into the summary"""
+    user_role = request.args.get('role', '').lower()
+    if not user_role:
+        return jsonify({"error": "Role parameter is required"}), 400
+    
+    if not check_role_access(user_role, 'onboarding'):
+        return jsonify({"error": "Access denied - insufficient permissions"}), 403
+    
+    staff = Staff.query.options(joinedload(Staff.tasks)).filter(Staff.id == staff_id).first()
+    if staff is None:
+        return jsonify({"error": "Staff member not found"}), 404
+    
+    staff_data = staff.to_dict()
+    staff_data['completion_percentage'] = completion_percentage(staff.tasks_completed, staff.tasks_total)
+    return jsonify({"staff": staff_data, "role": user_role})
+
 @onboarding_bp.route("/onboarding/<staff_id>/toggle", methods=["POST"])
 def toggle_onboarding_task(staff_id):
     """Toggle task completion status"""
-    time.sleep(0.3)  # Simulate API delay
-    
     user_role = request.form.get('role') or request.args.get('role', '').lower()
     if not user_role:
         return jsonify({"error": "Role parameter is required"}), 400
     
     # Only admin and HR can modify onboarding tasks
-    if user_role not in ['admin', 'hr']:
+    if not check_role_access(user_role, 'onboarding-modify'):
         return jsonify({"error": "Access denied - insufficient permissions to modify tasks"}), 403
     
     data = request.get_json()
@@ -80,42 +192,41 @@ def toggle_onboarding_task(staff_id):
     if task_id is None:
         return jsonify({"error": "task_id is required"}), 400
     
-    # Load current data
-    staff_data = load_onboarding_data()
-    if not staff_data:
-        return jsonify({"error": "Error loading onboarding data"}), 500
-    
-    # Find the staff member
-    staff_member = None
-    for staff in staff_data:
-        if staff['id'] == staff_id:
-            staff_member = staff
-            break
-    
-    if not staff_member:
-        return jsonify({"error": "Staff member not found"}), 404
+    # Flip the flag in a single-row UPDATE so concurrent toggles never
+    # overwrite each other
+    try:
+        completed = db.session.execute(
+            update(OnboardingTask)
+            .where(OnboardingTask.staff_id == staff_id, OnboardingTask.task_index == task_id)
+            .values(completed=~OnboardingTask.completed)
+            .returning(OnboardingTask.completed)
+        ).scalar_one_or_none()
+        progress = None
+        if completed is not None:
+            # Keep the rollup in the same transaction as the flip
+            progress = db.session.execute(
+                update(Staff)
+                .where(Staff.id == staff_id)
+                .values(tasks_completed=Staff.tasks_completed + (1 if completed else -1))
+                .returning(Staff.tasks_completed, Staff.tasks_total)
+            ).one_or_none()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to toggle task {task_id} for {staff_id}: {str(e)}")
+        return jsonify({"error": "Failed to save changes"}), 500
     
-    # Find and toggle the task
-    task_found = False
-    updated_task = None
-    for task in staff_member['tasks']:
-        if task['id'] == task_id:
-            task['completed'] = not task['completed']
-            updated_task = task
-            task_found = True
-            break
-    
-    if not task_found:
+    if completed is None:
+        if db.session.get(Staff, staff_id) is None:
+            return jsonify({"error": "Staff member not found"}), 404
         return jsonify({"error": "Task not found"}), 404
     
-    # Save updated data
-    if not save_onboarding_data(staff_data):
-        return jsonify({"error": "Failed to save changes"}), 500
-    
     return jsonify({
         "success": True,
         "staff_id": staff_id,
         "task_id": task_id,
-        "completed": updated_task['completed'],
-        "message": f"Task {'completed' if updated_task['completed'] else 'marked incomplete'}"
-    })
\ No newline at end of file
+        "completed": completed,
+        "tasks_completed": progress.tasks_completed if progress else None,
+        "tasks_total": progress.tasks_total if progress else None,
+        "message": f"Task {'completed' if completed else 'marked incomplete'}"
+    })
@@ -1,39 +1,34 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 import json
 import os
-import time
+from backend.utils.doc_cache import load_mock_document
+from backend.utils.resource_catalog import ResourceCatalog
+from backend.utils.file_delivery import send_stored_file
+from backend.utils.auth import check_role_access
 
 resources_bp = Blueprint('resources', __name__)
 
-def load_resources_data():
-    """Load resources from JSON file with error handling"""
-    try:
-        mock_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mock', 'resources.json')
-        with open(mock_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-    except json.JSONDecodeError:
-        return []
+# Directory holding the actual resource documents, by filename
+RESOURCE_FOLDER = os.environ.get(
+    'MUVHR_RESOURCE_FOLDER',
+    os.path.join(os.path.dirname(__file__), '..', 'resource_files')
+)
 
-def check_role_access(user_role, feature='resources'):
-    """Check if user role has access to resources feature"""
-    role_permissions = {
-        'admin': ['resources', 'contracts', 'onboarding', 'uploads'],
-        'hr': ['resources'],
-        'manager': ['resources'],
-        'engineer': ['resources'],
-        'marketing': ['resources'],
-        'intern': ['resources']  # Limited access - filtered by allowed_roles
-    }
-    
-    return feature in role_permissions.get(user_role, [])
+# Normalized view of mock/resources.json, indexed by role and filename
+resource_catalog = ResourceCatalog()
+
+def load_resources_data(copy_result=False):
+    """Load resources from the cached JSON document"""
+    return load_mock_document('resources.json', copy_result=copy_result)
+
+def load_resource_catalog():
+    """Return the catalog, re-indexing only resources changed on disk"""
+    resource_catalog.sync(load_resources_data())
+    return resource_catalog
 
 @resources_bp.route("/resources", methods=["GET"])
 def list_resources():
     """Get resources filtered by user role"""
-    time.sleep(0.4)  # Simulate API delay
-    
     user_role = request.args.get('role', '').lower()
     
     if not user_role:
@@ -42,27 +37,18 @@ def list_resources():
     if not check_role_access(user_role, 'resources'):
         return jsonify({"error": "Access denied - insufficient permissions"}), 403
     
-    resources = load_resources_data()
-    if not resources:
+    catalog = load_resource_catalog()
+    if not len(catalog):
         return jsonify({"error": "Error loading resources data"}), 500
     
-    # Filter resources based on user role
-    accessible_resources = []
-    for resource in resources:
-        if user_role in resource.get('allowed_roles', []):
-            accessible_resources.append(resource)
-    
-    return jsonify({
-        "resources": accessible_resources,
-        "role": user_role,
-        "total_count": len(accessible_resources)
-    })
+    # Per-role listing comes pre-serialized from the catalog's role index
+    count, encoded = catalog.encoded_for_role(user_role)
+    body = f'{{"resources":{encoded},"role":{json.dumps(user_role)},"total_count":{count}}}'
+    return current_app.response_class(body, mimetype='application/json')
 
 @resources_bp.route("/files/<filename>", methods=["GET"])
 def serve_file(filename):
     """Serve or provide file info with role-based access control"""
-    time.sleep(0.3)  # Simulate API delay
-    
     user_role = request.args.get('role', '').lower()
     
     if not user_role:
@@ -71,24 +57,24 @@ def serve_file(filename):
     if not check_role_access(user_role, 'resources'):
         return jsonify({"error": "Access denied - insufficient permissions"}), 403
     
-    resources = load_resources_data()
-    
-    # Find the requested file
-    requested_file = None
-    for resource in resources:
-        if resource['filename'] == filename:
-            requested_file = resource
-            break
+    catalog = load_resource_catalog()
+    requested_file = catalog.get_by_filename(filename)
     
     if not requested_file:
         return jsonify({"error": "File not found"}), 404
     
     # Check if user role has access to this specific file
-    if user_role not in requested_file.get('allowed_roles', []):
+    if not catalog.role_can_access(user_role, requested_file['id']):
         return jsonify({"error": "Access denied - insufficient permissions for this file"}), 403
     
-    # In a real implementation, this would serve the actual file
-    # For now, return file information as simulation
+    # Stream the document when it exists on disk, unless only info was asked for
+    file_path = os.path.join(RESOURCE_FOLDER, os.path.basename(requested_file['filename']))
+    if not request.args.get('info') and os.path.isfile(file_path):
+        return send_stored_file(
+            file_path, requested_file['filename'],
+            accel_root=RESOURCE_FOLDER, accel_location='resources'
+        )
+    
     return jsonify({
         "message": f"File '{filename}' access granted",
         "file_info": requested_file,
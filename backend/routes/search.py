@@ -0,0 +1,77 @@
+from flask import Blueprint, jsonify, request
+import logging
+import threading
+from backend.routes.resources import load_resources_data
+from backend.utils.auth import check_role_access
+from backend.utils.permissions import permissions
+from backend.utils.search_index import DEFAULT_LIMIT, MAX_LIMIT, SearchIndex, canonical_roles
+from backend.utils.upload_log import project_public, upload_log
+
+logger = logging.getLogger(__name__)
+
+search_bp = Blueprint('search', __name__)
+
+# Result types accepted by ?type=, mapped to index kinds
+SEARCH_TYPES = {'resources': 'resource', 'files': 'upload'}
+
+search_index = SearchIndex()
+_follow_lock = threading.Lock()
+_following = False
+
+def load_search_index():
+    """Return the index, bringing resources and uploads up to date"""
+    global _following
+    if not _following:
+        with _follow_lock:
+            if not _following:
+                # Replays the log once, then applies each upload as it lands
+                upload_log.add_listener(search_index.follow('upload', public=project_public))
+                _following = True
+    # Appends by other processes reach the index through the listener
+    upload_log.refresh()
+    search_index.sync('resource', load_resources_data(), roles=lambda record: canonical_roles(record.get('allowed_roles')))
+    return search_index
+
+@search_bp.route("/search", methods=["GET"])
+def search():
+    """Ranked search over resources and uploaded files the role may see"""
+    user_role = request.args.get('role', '').lower()
+    query = request.args.get('q', '').strip()
+    
+    if not user_role:
+        return jsonify({"error": "Role parameter is required"}), 400
+    
+    if not permissions.is_role(user_role):
+        return jsonify({"error": "Invalid role"}), 403
+    
+    if not query:
+        return jsonify({"error": "Query parameter q is required"}), 400
+    
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "limit must be positive and offset not negative"}), 400
+    
+    requested = request.args.get('type', '').strip().lower()
+    if requested and requested not in SEARCH_TYPES:
+        return jsonify({"error": f"type must be one of: {', '.join(sorted(SEARCH_TYPES))}"}), 400
+    kinds = {SEARCH_TYPES[requested]} if requested else set(SEARCH_TYPES.values())
+    
+    # Each kind needs the feature that guards its own routes; resource
+    # allowed_roles are also checked per hit.
+    for name, kind, feature in (('resources', 'resource', 'resources'), ('files', 'upload', 'uploads')):
+        if not check_role_access(user_role, feature):
+            if requested == name:
+                return jsonify({"error": "Access denied - insufficient permissions"}), 403
+            kinds.discard(kind)
+    
+    results, total_count = load_search_index().search(query, role=user_role, kinds=kinds, limit=limit, offset=offset)
+    return jsonify({
+        "query": query,
+        "results": results,
+        "total_count": total_count,
+        "role": user_role
+    })
@@ -1,56 +1,34 @@
 from flask import Blueprint, jsonify, request
 from datetime import datetime
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
 import os
 import uuid
-import json
-import time
 import logging
-from backend.utils.auth import role_required
+from backend.utils.auth import role_required, check_role_access
+from backend.utils.upload_log import upload_log
+from backend.utils.upload_processing import FAILED, PENDING, upload_processor
+from backend.utils.blob_store import BlobStore
+from backend.utils.file_delivery import send_stored_file
+from backend.utils.pagination import PaginationError, page_payload, parse_date_arg, parse_page_args
+from backend.utils.upload_storage import (
+    stream_to_file, ResumableUploads, FileTooLargeError, UploadSessionError
+)
 
 logger = logging.getLogger(__name__)
 
 uploads_bp = Blueprint('uploads', __name__)
 
 # Configuration
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'uploads')
+UPLOAD_FOLDER = os.environ.get('MUVHR_UPLOAD_FOLDER', os.path.join(os.path.dirname(__file__), '..', 'uploads'))
 # Restricted file extensions for security
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'xlsx'}  # Only allow safe document types
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB max file size
+MULTIPART_OVERHEAD = 64 * 1024  # Allowance for form fields and multipart boundaries
+MAX_REQUEST_SIZE = MAX_FILE_SIZE + MULTIPART_OVERHEAD  # Installed as MAX_CONTENT_LENGTH
 
-def load_uploads_data():
-    """Load uploads from JSON file with error handling"""
-    try:
-        mock_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mock', 'uploads.json')
-        with open(mock_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-    except json.JSONDecodeError:
-        return []
-
-def save_uploads_data(data):
-    """Save uploads data to JSON file"""
-    try:
-        mock_path = os.path.join(os.path.dirname(__file__), '..', '..', 'mock', 'uploads.json')
-        with open(mock_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception:
-        return False
-
-def check_role_access(user_role, feature='uploads'):
-    """Check if user role has access to uploads feature"""
-    role_permissions = {
-        'admin': ['uploads', 'contracts', 'onboarding', 'resources'],
-        'hr': ['uploads'],
-        'manager': ['uploads'],
-        'engineer': ['uploads'],
-        'marketing': ['uploads'],
-        'intern': []  # Interns cannot upload files
-    }
-    
-    return feature in role_permissions.get(user_role, [])
+blob_store = BlobStore(UPLOAD_FOLDER)
+resumable_uploads = ResumableUploads(os.path.join(UPLOAD_FOLDER, '.sessions'), MAX_FILE_SIZE)
 
 def allowed_file(filename):
     """Check if file extension is allowed and secure"""
@@ -83,14 +61,62 @@ def format_file_size(size_bytes):
     
     return f"{size_bytes:.1f} {size_names[i]}"
 
-@uploads_bp.route("/upload", methods=["POST"])
-@role_required("uploads")
-def upload_file():
-    """Handle file upload with role-based access control"""
-    time.sleep(0.5)  # Simulate upload processing delay
+def build_file_metadata(title, category, user_role, original_filename, file_path, size, sha256, deduplicated):
+    """Create the upload log record for a stored blob"""
+    now = datetime.now()
+    return {
+        "id": str(uuid.uuid4()),
+        "title": title,
+        "original_filename": original_filename,
+        "stored_filename": sha256,
+        "category": category,
+        "uploaded_by": user_role,
+        "upload_date": now.strftime("%Y-%m-%d"),
+        "upload_time": now.strftime("%H:%M:%S"),
+        "file_size": format_file_size(size),
+        "size_bytes": size,
+        "sha256": sha256,
+        "file_type": original_filename.rsplit('.', 1)[1].lower(),
+        "file_path": file_path,
+        "deduplicated": deduplicated,
+        "status": PENDING
+    }
+
+def file_too_large_response():
+    logger.warning("Upload aborted: file too large")
+    return jsonify({"error": f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"}), 400
+
+def record_upload(file_metadata):
+    """Append a record to the upload log and build the 201 response"""
+    try:
+        upload_log.append(file_metadata)
+    except (OSError, ValueError) as e:
+        # A blob left without references is reclaimed by run/gc_blobs.py
+        logger.error(f"Failed to save file metadata: {str(e)}")
+        return jsonify({"error": "Failed to save file metadata"}), 500
     
-    user_role = request.form.get('uploaded_by', '').lower()
+    # Checksums, type sniffing and text extraction run in the background
+    status = upload_processor.enqueue(file_metadata)
     
+    return jsonify({
+        "success": True,
+        "message": "File uploaded successfully",
+        "file_info": {
+            "id": file_metadata["id"],
+            "title": file_metadata["title"],
+            "filename": file_metadata["original_filename"],
+            "category": file_metadata["category"],
+            "uploaded_by": file_metadata["uploaded_by"],
+            "upload_date": file_metadata["upload_date"],
+            "file_size": file_metadata["file_size"],
+            "sha256": file_metadata["sha256"],
+            "deduplicated": file_metadata["deduplicated"],
+            "status": status
+        }
+    }), 201
+
+def validate_upload_fields(user_role, title, category, filename):
+    """Return an error response for invalid upload fields, or None"""
     if not user_role:
         return jsonify({"error": "User role is required"}), 400
     
@@ -98,16 +124,11 @@ def upload_file():
     if not check_role_access(user_role, 'uploads'):
         return jsonify({"error": "Access denied - insufficient permissions to upload files"}), 403
     
-    # Check if file is in request
-    if 'file' not in request.files:
+    # Check if a file was sent at all
+    if filename is None:
         return jsonify({"error": "No file provided"}), 400
     
-    file = request.files['file']
-    title = request.form.get('title', '').strip()
-    category = request.form.get('category', '').strip()
-    
-    # Validate inputs
-    if file.filename == '':
+    if filename == '':
         return jsonify({"error": "No file selected"}), 400
     
     if not title:
@@ -116,125 +137,203 @@ def upload_file():
     if not category:
         return jsonify({"error": "Category is required"}), 400
     
-    if not allowed_file(file.filename):
-        logger.warning(f"Attempted upload of disallowed file: {file.filename}")
+    if not allowed_file(filename):
+        logger.warning(f"Attempted upload of disallowed file: {filename}")
         return jsonify({"error": "File type not allowed. Only PDF, DOCX, and XLSX files are permitted."}), 400
     
-    # Check file size
-    file.seek(0, os.SEEK_END)
-    file_size = file.tell()
-    file.seek(0)
+    return None
+
+@uploads_bp.route("/upload", methods=["POST"])
+@role_required("uploads")
+def upload_file():
+    """Handle file upload with role-based access control"""
+    # Reject oversized bodies before the multipart parser spools them; bodies
+    # without a Content-Length are cut off by MAX_CONTENT_LENGTH while parsed
+    if request.content_length and request.content_length > MAX_REQUEST_SIZE:
+        return file_too_large_response()
     
-    if file_size > MAX_FILE_SIZE:
-        logger.warning(f"File too large: {file_size} bytes")
-        return jsonify({"error": f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"}), 400
+    try:
+        user_role = request.form.get('uploaded_by', '').lower()
+        file = request.files.get('file')
+    except RequestEntityTooLarge:
+        return file_too_large_response()
+    title = request.form.get('title', '').strip()
+    category = request.form.get('category', '').strip()
     
-    if file_size == 0:
-        return jsonify({"error": "Empty file not allowed"}), 400
+    error = validate_upload_fields(user_role, title, category, file.filename if file else None)
+    if error:
+        return error
     
     try:
-        # Create uploads directory if it doesn't exist
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        
-        # Generate unique filename
         original_filename = secure_filename(file.filename)
-        file_extension = original_filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-        file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
+        tmp_path = blob_store.temp_path()
         
-        # For demo purposes, simulate file save without actually saving
-        # In production, you would: file.save(file_path)
+        # Copy to disk in fixed-size pieces, hashing as we go
+        file_size, sha256 = stream_to_file(file.stream, tmp_path, MAX_FILE_SIZE)
+        if file_size == 0:
+            os.remove(tmp_path)
+            return jsonify({"error": "Empty file not allowed"}), 400
         
-        # Simulate file size (in production, get actual size after saving)
-        simulated_size = len(file.read())
-        file.seek(0)  # Reset file pointer
-        file_size_str = format_file_size(simulated_size)
-        
-        # Create file metadata
-        file_metadata = {
-            "id": str(uuid.uuid4()),
+        # Identical content already stored: keep only the new metadata
+        file_path, is_new = blob_store.commit(tmp_path, sha256)
+    except FileTooLargeError:
+        return file_too_large_response()
+    except Exception as e:
+        return jsonify({"error": f"Upload failed: {str(e)}"}), 500
+    
+    return record_upload(build_file_metadata(
+        title, category, user_role, original_filename, file_path, file_size, sha256, not is_new
+    ))
+
+@uploads_bp.route("/upload/sessions", methods=["POST"])
+@role_required("uploads")
+def init_resumable_upload():
+    """Start a resumable upload; the file is then sent with PUT .../chunks/<index>"""
+    data = request.get_json(silent=True) or {}
+    user_role = str(data.get('uploaded_by', '')).lower()
+    title = str(data.get('title', '')).strip()
+    category = str(data.get('category', '')).strip()
+    filename = data.get('filename')
+    
+    error = validate_upload_fields(user_role, title, category, filename)
+    if error:
+        return error
+    
+    total_size = data.get('total_size')
+    try:
+        session = resumable_uploads.create({
             "title": title,
-            "original_filename": original_filename,
-            "stored_filename": unique_filename,
             "category": category,
             "uploaded_by": user_role,
-            "upload_date": datetime.now().strftime("%Y-%m-%d"),
-            "upload_time": datetime.now().strftime("%H:%M:%S"),
-            "file_size": file_size_str,
-            "file_type": file_extension,
-            "file_path": file_path
-        }
-        
-        # Load current uploads and add new file
-        uploads_data = load_uploads_data()
-        uploads_data.append(file_metadata)
-        
-        # Save updated uploads data
-        if not save_uploads_data(uploads_data):
-            return jsonify({"error": "Failed to save file metadata"}), 500
-        
-        return jsonify({
-            "success": True,
-            "message": "File uploaded successfully",
-            "file_info": {
-                "id": file_metadata["id"],
-                "title": file_metadata["title"],
-                "filename": file_metadata["original_filename"],
-                "category": file_metadata["category"],
-                "uploaded_by": file_metadata["uploaded_by"],
-                "upload_date": file_metadata["upload_date"],
-                "file_size": file_metadata["file_size"]
-            }
-        }), 201
+            "original_filename": secure_filename(filename)
+        }, total_size=int(total_size) if total_size is not None else None)
+    except FileTooLargeError:
+        return file_too_large_response()
+    except (TypeError, ValueError):
+        return jsonify({"error": "total_size must be an integer"}), 400
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    
+    return jsonify({
+        "success": True,
+        "upload_id": session["upload_id"],
+        "chunk_size": session["chunk_size"],
+        "total_chunks": session["total_chunks"]
+    }), 201
+
+@uploads_bp.route("/upload/sessions/<upload_id>", methods=["GET"])
+@role_required("uploads")
+def resumable_upload_status(upload_id):
+    """Report which chunks have been received so a client can resume"""
+    try:
+        session = resumable_uploads.load(upload_id)
+        received = resumable_uploads.received_chunks(upload_id)
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    
+    return jsonify({
+        "upload_id": upload_id,
+        "chunk_size": session["chunk_size"],
+        "total_chunks": session["total_chunks"],
+        "received_chunks": received
+    })
+
+@uploads_bp.route("/upload/sessions/<upload_id>/chunks/<int:index>", methods=["PUT"])
+@role_required("uploads")
+def put_upload_chunk(upload_id, index):
+    """Store one chunk of a resumable upload (raw request body)"""
+    try:
+        size = resumable_uploads.put_chunk(upload_id, index, request.stream)
+    except (FileTooLargeError, RequestEntityTooLarge):
+        return jsonify({"error": "Chunk exceeds the session chunk size or maximum file size"}), 400
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    
+    return jsonify({"success": True, "upload_id": upload_id, "index": index, "size": size})
+
+@uploads_bp.route("/upload/sessions/<upload_id>/finalize", methods=["POST"])
+@role_required("uploads")
+def finalize_resumable_upload(upload_id):
+    """Assemble the received chunks and record the upload"""
+    data = request.get_json(silent=True) or {}
+    expected_sha256 = data.get('sha256')
+    if expected_sha256 is not None and not isinstance(expected_sha256, str):
+        return jsonify({"error": "sha256 must be a hex string"}), 400
+    
+    try:
+        tmp_path = blob_store.temp_path()
+        session, file_size, sha256 = resumable_uploads.finalize(upload_id, tmp_path)
+        meta = session["metadata"]
+    except FileTooLargeError:
+        resumable_uploads.discard(upload_id)
+        return file_too_large_response()
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
     
+    # The session outlives a mismatch so corrupted chunks can be re-sent
+    if expected_sha256 and expected_sha256.lower() != sha256:
+        os.remove(tmp_path)
+        return jsonify({"error": "Checksum mismatch", "upload_id": upload_id}), 400
+    
+    try:
+        file_path, is_new = blob_store.commit(tmp_path, sha256)
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return jsonify({"error": f"Upload failed: {str(e)}"}), 500
+    resumable_uploads.discard(upload_id)
+    
+    return record_upload(build_file_metadata(
+        meta["title"], meta["category"], meta["uploaded_by"], meta["original_filename"],
+        file_path, file_size, sha256, not is_new
+    ))
 
 @uploads_bp.route("/files", methods=["GET"])
+@role_required("uploads")
 def list_uploaded_files():
-    """Get list of all uploaded files (archive view)"""
-    time.sleep(0.3)  # Simulate API delay
+    """Get a page of uploaded files (archive view, roles with upload access only)"""
+    try:
+        # Log order is (upload_date, upload_time, id)
+        page = parse_page_args(request.args, ('upload_date',), 'upload_date', cursor_types=(str, str, str))
+        date_from = parse_date_arg(request.args, 'date_from')
+        date_to = parse_date_arg(request.args, 'date_to')
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
     
-    uploads_data = load_uploads_data()
+    cursor = page["cursor"]
     
-    # Return file metadata without sensitive file paths
-    files_info = []
-    for file_meta in uploads_data:
-        files_info.append({
-            "id": file_meta["id"],
-            "title": file_meta["title"],
-            "original_filename": file_meta["original_filename"],
-            "category": file_meta["category"],
-            "uploaded_by": file_meta["uploaded_by"],
-            "upload_date": file_meta["upload_date"],
-            "upload_time": file_meta["upload_time"],
-            "file_size": file_meta["file_size"],
-            "file_type": file_meta["file_type"]
-        })
+    # Public projections (no sensitive file paths) are precomputed by the log;
+    # filters are answered from its secondary indexes and date ordering
+    files_info, next_cursor, total_count, exact = upload_log.page_public(
+        page["limit"], cursor, page["descending"],
+        date_from=date_from, date_to=date_to,
+        category=request.args.get('category', '').strip(),
+        uploaded_by=request.args.get('uploaded_by', '').strip().lower(),
+        status=request.args.get('status', '').strip().lower()
+    )
     
-    return jsonify({
-        "files": files_info,
-        "total_count": len(files_info)
-    })
+    return jsonify(page_payload("files", files_info, next_cursor, total_count, exact))
 
 @uploads_bp.route("/files/download/<file_id>", methods=["GET"])
+@role_required("uploads")
 def download_uploaded_file(file_id):
-    """Download uploaded file by ID"""
-    time.sleep(0.3)  # Simulate API delay
-    
-    uploads_data = load_uploads_data()
-    
-    # Find file by ID
-    file_meta = None
-    for f in uploads_data:
-        if f["id"] == file_id:
-            file_meta = f
-            break
-    
+    """Download uploaded file by ID (roles with upload access only)"""
+    file_meta = upload_log.get(file_id)
     if not file_meta:
         return jsonify({"error": "File not found"}), 404
     
-    # For demo purposes, return file info (in production, would serve actual file)
+    # Stream the stored blob; records from before blob storage only have info
+    file_path = file_meta.get("file_path")
+    if not request.args.get('info') and file_path and os.path.isfile(file_path):
+        # Failed uploads may not be what their name claims (the content check
+        # is one of the stages), so they are only offered as opaque bytes
+        failed = file_meta.get("status") == FAILED
+        return send_stored_file(
+            file_path, file_meta["original_filename"], sha256=file_meta.get("sha256"),
+            accel_root=UPLOAD_FOLDER, accel_location='uploads',
+            mimetype='application/octet-stream' if failed else None
+        )
+    
     return jsonify({
         "message": f"Download started: {file_meta['title']}",
         "file_info": {
@@ -243,7 +342,12 @@ def download_uploaded_file(file_id):
             "category": file_meta["category"],
             "file_size": file_meta["file_size"],
             "uploaded_by": file_meta["uploaded_by"],
-            "upload_date": file_meta["upload_date"]
+            "upload_date": file_meta["upload_date"],
+            "status": file_meta.get("status"),
+            "mime_type": file_meta.get("mime_type"),
+            "page_count": file_meta.get("page_count"),
+            "text_excerpt": file_meta.get("text_excerpt"),
+            "processing_error": file_meta.get("processing_error")
         },
         "download_url": f"/files/download/{file_id}",
         "note": "In production, this would trigger an actual file download"
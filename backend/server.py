@@ -0,0 +1,411 @@
+"""
+Pre-forking production server for the MuvHR app
+
+The master process binds the listening socket and forks workers. Each
+worker imports the app itself, warms its caches and database connections,
+tells the master it is ready, and only then starts accepting connections
+from the shared socket. Requests are handled by a bounded thread pool per
+worker; when every thread is busy the worker stops accepting, leaving new
+connections in the kernel backlog for idle workers.
+
+Signals sent to the master:
+    SIGHUP   start a fresh generation of workers (re-importing the code),
+             then drain and stop the old ones once the new ones are ready
+    SIGTERM  drain in-flight requests and stop (SIGINT too)
+    SIGTTIN / SIGTTOU   add / remove one worker
+
+Workers exit after serving ``max_requests`` requests (plus jitter) and are
+replaced, which caps memory growth.
+"""
+
+import importlib
+import logging
+import os
+import random
+import select
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+from backend.config import DEFAULT_THREADS, request_threads
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_APP = 'backend.app:app'
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 8080
+DEFAULT_MAX_REQUESTS = 10000
+DEFAULT_MAX_REQUESTS_JITTER = 1000
+DEFAULT_GRACEFUL_TIMEOUT = 30
+# Time a new worker gets to import the app and warm up before it is replaced
+DEFAULT_BOOT_TIMEOUT = 60
+LISTEN_BACKLOG = 2048
+
+
+def default_workers():
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+def server_config(environ=None):
+    """
+    Server settings from MUVHR_* environment variables
+
+    MUVHR_HOST, MUVHR_PORT (or PORT), MUVHR_WORKERS, MUVHR_THREADS,
+    MUVHR_MAX_REQUESTS, MUVHR_MAX_REQUESTS_JITTER, MUVHR_GRACEFUL_TIMEOUT
+    and MUVHR_APP (module:attribute of the WSGI app).
+    """
+    env = os.environ if environ is None else environ
+    return {
+        "app_path": env.get('MUVHR_APP', DEFAULT_APP),
+        "host": env.get('MUVHR_HOST', DEFAULT_HOST),
+        "port": int(env.get('MUVHR_PORT') or env.get('PORT') or DEFAULT_PORT),
+        "workers": int(env.get('MUVHR_WORKERS') or default_workers()),
+        "threads": request_threads(env),
+        "max_requests": int(env.get('MUVHR_MAX_REQUESTS') or DEFAULT_MAX_REQUESTS),
+        "max_requests_jitter": int(env.get('MUVHR_MAX_REQUESTS_JITTER') or DEFAULT_MAX_REQUESTS_JITTER),
+        "graceful_timeout": float(env.get('MUVHR_GRACEFUL_TIMEOUT') or DEFAULT_GRACEFUL_TIMEOUT)
+    }
+
+
+def import_app(app_path):
+    module_name, _, attribute = app_path.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or 'app')
+
+
+def warm_up(app):
+    """Open pooled DB connections and build the in-memory caches before serving"""
+    from sqlalchemy import text
+    from backend.db import db
+
+    with app.app_context():
+        engine = db.engine
+        size = getattr(engine.pool, 'size', lambda: 1)()
+        connections = [engine.connect() for _ in range(size)]
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+        # Returned to the pool, so the first requests skip connect and pragmas
+        for connection in connections:
+            connection.close()
+
+    from backend.routes.contracts import contracts_by_expiry, load_contracts
+    from backend.routes.resources import load_resource_catalog
+    from backend.utils.upload_log import upload_log
+    from backend.utils.permissions import permissions
+
+    contracts = load_contracts()
+    if contracts:
+        contracts_by_expiry(contracts)
+    catalog = load_resource_catalog()
+    len(upload_log)
+
+    # Prime the per-role dashboard response cache
+    client = app.test_client()
+    for role in permissions.roles():
+        for feature in permissions.features(role):
+            if feature in ('onboarding', 'resources', 'time-off', 'time-tracking', 'groups', 'entities'):
+                client.get(f"/api/{feature}/{role}?role={role}")
+        catalog.for_role(role)
+
+
+class DrainingRequestHandler(WSGIRequestHandler):
+    # One request per connection, so idle keep-alive clients never pin a thread
+    protocol_version = "HTTP/1.0"
+
+    def log_request(self, code="-", size="-"):
+        # Access logging belongs to the proxy in front; keep worker output quiet
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug WSGI server handling requests on a fixed-size thread pool"""
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads=DEFAULT_THREADS, fd=None):
+        super().__init__(host, port, app, handler=DrainingRequestHandler, fd=fd)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+        # Held while a thread is busy; a full pool stops the accept loop
+        self._slots = threading.Semaphore(threads)
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        try:
+            self._pool.submit(self._process, request, client_address)
+        except RuntimeError:
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self):
+        """Stop listening and wait for in-flight requests to finish"""
+        self.server_close()
+        self._pool.shutdown(wait=True)
+
+
+class Worker:
+    """Code run in a forked child: serve until told to stop or recycled"""
+
+    def __init__(self, listener, ready_fd, config):
+        self.listener = listener
+        self.ready_fd = ready_fd
+        self.config = config
+        jitter = config["max_requests_jitter"]
+        self.max_requests = config["max_requests"] + (random.randint(0, jitter) if jitter else 0)
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self.server = None
+        self.stopping = False
+
+    def _stop(self, *args):
+        self.stopping = True
+        if self.server is not None:
+            # shutdown() blocks until serve_forever returns, so not from its thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def _counting(self, app):
+        def counted_app(environ, start_response):
+            with self._count_lock:
+                self.requests += 1
+                recycle = self.max_requests and self.requests == self.max_requests
+            if recycle:
+                logger.info(f"Worker {os.getpid()} recycling after {self.requests} requests")
+                self._stop()
+            return app(environ, start_response)
+        return counted_app
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for sig in (signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, signal.SIG_IGN)
+
+        app = import_app(self.config["app_path"])
+        warm_up(app)
+        self.server = PooledWSGIServer(
+            self.config["host"], self.config["port"], self._counting(app),
+            threads=self.config["threads"], fd=self.listener.fileno()
+        )
+        self.listener.close()
+        if self.stopping:
+            # Told to stop while booting (e.g. a reload raced this worker)
+            self.server.drain()
+            return
+
+        os.write(self.ready_fd, b'1')
+        os.close(self.ready_fd)
+        logger.info(f"Worker {os.getpid()} ready ({self.config['threads']} threads)")
+        try:
+            self.server.serve_forever(poll_interval=0.5)
+        finally:
+            self.server.drain()
+            # The worker leaves through os._exit, which skips atexit hooks
+            metrics = app.extensions.get('metrics')
+            if metrics is not None:
+                metrics.flush()
+
+
+class Arbiter:
+    """Master process: owns the socket, forks, watches and replaces workers"""
+
+    def __init__(self, config):
+        self.config = config
+        self.num_workers = config["workers"]
+        # Workers import the app after fork; it sizes its per-request pools
+        # from this, which --threads may have overridden
+        os.environ['MUVHR_THREADS'] = str(config["threads"])
+        # Workers share request metrics through snapshot files, so a scrape
+        # answered by any of them covers the whole server
+        self.metrics_dir = None
+        if not os.environ.get('MUVHR_METRICS_DIR'):
+            self.metrics_dir = tempfile.mkdtemp(prefix='muvhr-metrics-')
+            os.environ['MUVHR_METRICS_DIR'] = self.metrics_dir
+        self.listener = None
+        # pid -> {"generation", "ready", "ready_fd", "started"}
+        self.workers = {}
+        self.generation = 0
+        self._signals = []
+
+    def _handle_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _listen(self):
+        listener = socket.create_server(
+            (self.config["host"], self.config["port"]), backlog=LISTEN_BACKLOG, reuse_port=False
+        )
+        listener.set_inheritable(True)
+        return listener
+
+    def spawn(self):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            status = 0
+            try:
+                Worker(self.listener, write_fd, self.config).run()
+            except Exception:
+                logger.exception(f"Worker {os.getpid()} failed")
+                status = 1
+            finally:
+                logging.shutdown()
+                os._exit(status)
+
+        os.close(write_fd)
+        self.workers[pid] = {
+            "generation": self.generation,
+            "ready": False,
+            "ready_fd": read_fd,
+            "started": time.monotonic()
+        }
+        return pid
+
+    def _collect_ready(self, timeout):
+        pending = {info["ready_fd"]: pid for pid, info in self.workers.items() if not info["ready"]}
+        if not pending:
+            time.sleep(timeout)
+            return
+        try:
+            readable, _, _ = select.select(list(pending), [], [], timeout)
+        except InterruptedError:
+            return
+        for fd in readable:
+            pid = pending[fd]
+            os.read(fd, 1)
+            os.close(fd)
+            self.workers[pid]["ready"] = True
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            info = self.workers.pop(pid, None)
+            if info and not info["ready"]:
+                os.close(info["ready_fd"])
+            if os.WIFSIGNALED(status) or os.WEXITSTATUS(status):
+                logger.warning(f"Worker {pid} exited with status {status}")
+
+    def _signal_workers(self, pids, sig):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _current(self):
+        return [pid for pid, info in self.workers.items() if info["generation"] == self.generation]
+
+    def _retire_old_generations(self):
+        """Stop older workers once the current generation is fully ready"""
+        current = self._current()
+        if len(current) < self.num_workers or not all(self.workers[pid]["ready"] for pid in current):
+            return
+        old = [pid for pid, info in self.workers.items() if info["generation"] != self.generation and not info.get("stopping")]
+        for pid in old:
+            self.workers[pid]["stopping"] = True
+        self._signal_workers(old, signal.SIGTERM)
+
+    def _kill_stuck_boots(self):
+        now = time.monotonic()
+        for pid, info in list(self.workers.items()):
+            if not info["ready"] and now - info["started"] > DEFAULT_BOOT_TIMEOUT:
+                logger.error(f"Worker {pid} did not become ready in {DEFAULT_BOOT_TIMEOUT}s, killing it")
+                self._signal_workers([pid], signal.SIGKILL)
+
+    def _manage(self):
+        current = self._current()
+        for _ in range(self.num_workers - len(current)):
+            self.spawn()
+        surplus = [pid for pid in current if not self.workers[pid].get("stopping")][self.num_workers:]
+        for pid in surplus:
+            self.workers[pid]["stopping"] = True
+        self._signal_workers(surplus, signal.SIGTERM)
+
+    def stop(self):
+        """Drain all workers, killing any still busy after the graceful timeout"""
+        self._signal_workers(list(self.workers), signal.SIGTERM)
+        deadline = time.monotonic() + self.config["graceful_timeout"]
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        if self.workers:
+            logger.warning(f"Killing {len(self.workers)} workers still busy after {self.config['graceful_timeout']}s")
+            self._signal_workers(list(self.workers), signal.SIGKILL)
+            while self.workers:
+                self._reap()
+                time.sleep(0.05)
+        self.listener.close()
+        if self.metrics_dir:
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+
+    def run(self):
+        self.listener = self._listen()
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU, signal.SIGCHLD):
+            signal.signal(sig, self._handle_signal)
+        logger.info(
+            f"Master {os.getpid()} listening on {self.config['host']}:{self.config['port']} "
+            f"with {self.num_workers} workers x {self.config['threads']} threads"
+        )
+
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    logger.info("Shutting down: draining workers")
+                    self.stop()
+                    return
+                if signum == signal.SIGHUP:
+                    logger.info("Reloading: starting a new worker generation")
+                    self.generation += 1
+                elif signum == signal.SIGTTIN:
+                    self.num_workers += 1
+                elif signum == signal.SIGTTOU and self.num_workers > 1:
+                    self.num_workers -= 1
+
+            self._reap()
+            self._manage()
+            self._retire_old_generations()
+            self._kill_stuck_boots()
+            self._collect_ready(0.5)
+
+
+def main(argv=None):
+    import argparse
+
+    config = server_config()
+    parser = argparse.ArgumentParser(description="Run MuvHR with pre-forked workers")
+    parser.add_argument('--host', default=config["host"])
+    parser.add_argument('--port', type=int, default=config["port"])
+    parser.add_argument('--workers', type=int, default=config["workers"])
+    parser.add_argument('--threads', type=int, default=config["threads"])
+    parser.add_argument('--max-requests', type=int, default=config["max_requests"], help="0 disables recycling")
+    parser.add_argument('--max-requests-jitter', type=int, default=config["max_requests_jitter"])
+    parser.add_argument('--graceful-timeout', type=float, default=config["graceful_timeout"])
+    parser.add_argument('--app', dest='app_path', default=config["app_path"])
+    args = parser.parse_args(argv)
+    config.update(vars(args))
+
+    if not hasattr(os, 'fork'):
+        sys.exit("The pre-fork server needs a POSIX system; use run_server.py on Windows")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s')
+    Arbiter(config).run()
@@ -0,0 +1,321 @@
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from backend.utils.doc_cache import mock_path
+from backend.utils.doc_store import file_lock
+
+logger = logging.getLogger(__name__)
+
+GRANTED = 'granted'
+DENIED = 'denied'
+INVALID_ROLE = 'invalid_role'
+MISSING_ROLE = 'missing_role'
+
+# Decisions recorded for every check; anything but GRANTED is a denial
+DECISIONS = (GRANTED, DENIED, INVALID_ROLE, MISSING_ROLE)
+
+DEFAULT_CAPACITY = 10000
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_BATCH_SIZE = 500
+# Records waiting for the flusher beyond this are dropped (and counted)
+DEFAULT_MAX_PENDING = 50000
+# The store is rotated to <path>.1 once it grows past this many bytes,
+# keeping this many rotated files (<path>.1 newest)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+
+FIELDS = ('timestamp', 'role', 'feature', 'decision', 'route')
+
+
+def entry_dict(entry):
+    return dict(zip(FIELDS, entry))
+
+
+class AccessAudit:
+    """
+    In-memory access-audit trail with batched writes to an append-only file
+
+    Each permission check becomes one (timestamp, role, feature, decision,
+    route) tuple. Granted checks are kept with probability ``sample_rate``;
+    denials are always kept. Recent entries stay queryable in two ring
+    buffers (granted and denied, so a flood of grants cannot push denials
+    out), and a background thread appends pending entries to ``path`` as
+    compact JSON arrays, one per line, in a single write per batch.
+
+    The store is rotated by size (``max_bytes``, ``backups`` older files),
+    and a store query skips rotated files last written before its window,
+    so it reads at most one file's worth of entries older than the window.
+
+    The request path only takes a lock and appends a tuple; formatting and
+    file I/O happen on the flusher thread.
+    """
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, sample_rate=DEFAULT_SAMPLE_RATE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, batch_size=DEFAULT_BATCH_SIZE,
+                 max_pending=DEFAULT_MAX_PENDING, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS,
+                 clock=time.time, seed=None):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._thread = None
+        self._pid = None
+        self.configure(path, capacity, sample_rate, flush_interval, batch_size, max_pending, max_bytes, backups)
+
+    def configure(self, path=None, capacity=DEFAULT_CAPACITY, sample_rate=DEFAULT_SAMPLE_RATE,
+                  flush_interval=DEFAULT_FLUSH_INTERVAL, batch_size=DEFAULT_BATCH_SIZE,
+                  max_pending=DEFAULT_MAX_PENDING, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        with self._lock:
+            self.path = path
+            self.capacity = capacity
+            self.sample_rate = sample_rate
+            self.flush_interval = flush_interval
+            self.batch_size = batch_size
+            self.max_pending = max_pending
+            self.max_bytes = max_bytes
+            self.backups = backups
+            self._granted = deque(maxlen=capacity)
+            self._denied = deque(maxlen=capacity)
+            self._pending = []
+            self.recorded = 0
+            self.sampled_out = 0
+            self.dropped = 0
+            self.flushed = 0
+            self.write_errors = 0
+            self.rotations = 0
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, role, feature, decision, route=None):
+        """Record one permission check (cheap; safe to call on every request)"""
+        entry = (self._clock(), role, feature, decision, route)
+        with self._lock:
+            if decision == GRANTED and self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+                self.sampled_out += 1
+                return
+            (self._granted if decision == GRANTED else self._denied).append(entry)
+            self.recorded += 1
+            if self.path:
+                if len(self._pending) < self.max_pending:
+                    self._pending.append(entry)
+                else:
+                    self.dropped += 1
+            pending = len(self._pending)
+        if self.path:
+            self._ensure_flusher()
+            if pending >= self.batch_size:
+                self._wake.set()
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork, so each pre-fork worker starts its own
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='access-audit', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Append pending entries to the store; returns the number written"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            path = self.path
+        if not batch or not path:
+            return 0
+
+        data = ''.join(
+            json.dumps([round(entry[0], 3), *entry[1:]], separators=(',', ':')) + '\n'
+            for entry in batch
+        ).encode('utf-8')
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if self.max_bytes and size >= self.max_bytes:
+                self._rotate(path)
+        except OSError as e:
+            self.write_errors += 1
+            logger.error(f"Failed to write {len(batch)} access-audit entries to {path}: {str(e)}")
+            return 0
+        self.flushed += len(batch)
+        return len(batch)
+
+    def _rotate(self, path):
+        """Shift <path> to <path>.1, <path>.1 to <path>.2, ... dropping the oldest"""
+        with file_lock(path):
+            # Another process may have rotated it while we waited for the lock
+            try:
+                if os.stat(path).st_size < self.max_bytes:
+                    return
+            except FileNotFoundError:
+                return
+            if self.backups < 1:
+                os.remove(path)
+            else:
+                for n in range(self.backups - 1, 0, -1):
+                    if os.path.exists(f"{path}.{n}"):
+                        os.replace(f"{path}.{n}", f"{path}.{n + 1}")
+                os.replace(path, f"{path}.1")
+        self.rotations += 1
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _memory(self, denied_only):
+        with self._lock:
+            if denied_only:
+                return list(self._denied)
+            return sorted(list(self._granted) + list(self._denied), key=lambda entry: entry[0])
+
+    def _store_files(self, since=None):
+        """Store files oldest first, leaving out rotated ones last written before ``since``"""
+        if not self.path:
+            return []
+        files = []
+        for name in [f"{self.path}.{n}" for n in range(self.backups, 0, -1)] + [self.path]:
+            try:
+                modified = os.stat(name).st_mtime
+            except FileNotFoundError:
+                continue
+            # Entries are never newer than the file's last write
+            if since is None or name == self.path or modified >= since:
+                files.append(name)
+        return files
+
+    def _store(self, since=None):
+        for name in self._store_files(since):
+            try:
+                f = open(name, encoding='utf-8')
+            except FileNotFoundError:
+                # Rotated away since it was listed
+                continue
+            with f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by a crash mid-write
+                        continue
+                    if isinstance(entry, list) and len(entry) == len(FIELDS):
+                        yield tuple(entry)
+
+    def query(self, since=None, role=None, feature=None, decision=None, denied=None, limit=100, source='memory'):
+        """
+        Recent audit entries, newest first
+
+        Args:
+            since (float): Only entries at or after this UNIX timestamp
+            role (str): Only this role
+            feature (str): Only this feature
+            decision (str): Only this decision
+            denied (bool): Only denials (True) or only grants (False)
+            limit (int): Maximum entries returned (None for all)
+            source (str): 'memory' for this process's ring buffers, 'store'
+                for the append-only file shared by all processes
+
+        Returns:
+            list: Entry dicts with timestamp, role, feature, decision, route
+        """
+        if source == 'store':
+            self.flush()
+            entries = list(self._store(since))
+        else:
+            entries = self._memory(denied_only=bool(denied))
+
+        results = []
+        for entry in reversed(entries):
+            timestamp, entry_role, entry_feature, entry_decision, route = entry
+            if since is not None and timestamp < since:
+                if source == 'memory':
+                    break
+                continue
+            if role is not None and entry_role != role:
+                continue
+            if feature is not None and entry_feature != feature:
+                continue
+            if decision is not None and entry_decision != decision:
+                continue
+            if denied is not None and (entry_decision != GRANTED) != denied:
+                continue
+            results.append(entry_dict(entry))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def denials_by_role(self, window=3600, source='memory'):
+        """Count of denied checks per role over the last ``window`` seconds"""
+        entries = self.query(since=self._clock() - window, denied=True, limit=None, source=source)
+        return dict(Counter(entry['role'] for entry in entries).most_common())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "path": self.path,
+                "sample_rate": self.sample_rate,
+                "capacity": self.capacity,
+                "granted_buffered": len(self._granted),
+                "denied_buffered": len(self._denied),
+                "pending": len(self._pending),
+                "recorded": self.recorded,
+                "sampled_out": self.sampled_out,
+                "dropped": self.dropped,
+                "flushed": self.flushed,
+                "write_errors": self.write_errors,
+                "rotations": self.rotations
+            }
+
+
+access_audit = AccessAudit()
+atexit.register(access_audit.flush)
+
+
+def init_access_audit(app):
+    """
+    Configure the audit trail from the app config or environment
+
+    ACCESS_AUDIT_FILE / MUVHR_AUDIT_FILE set the store (default
+    mock/access_audit.jsonl; empty keeps the trail in memory only),
+    ACCESS_AUDIT_SAMPLE_RATE / MUVHR_AUDIT_SAMPLE_RATE the fraction of
+    granted checks kept, ACCESS_AUDIT_CAPACITY / MUVHR_AUDIT_CAPACITY the
+    size of each ring buffer, ACCESS_AUDIT_FLUSH_INTERVAL /
+    MUVHR_AUDIT_FLUSH_INTERVAL the seconds between background writes and
+    ACCESS_AUDIT_MAX_BYTES / MUVHR_AUDIT_MAX_BYTES the size at which the
+    store is rotated (ACCESS_AUDIT_BACKUPS / MUVHR_AUDIT_BACKUPS files kept).
+    """
+    path = app.config.get('ACCESS_AUDIT_FILE', os.environ.get('MUVHR_AUDIT_FILE', mock_path('access_audit.jsonl')))
+    rate = app.config.get('ACCESS_AUDIT_SAMPLE_RATE', os.environ.get('MUVHR_AUDIT_SAMPLE_RATE', DEFAULT_SAMPLE_RATE))
+    capacity = app.config.get('ACCESS_AUDIT_CAPACITY', os.environ.get('MUVHR_AUDIT_CAPACITY', DEFAULT_CAPACITY))
+    interval = app.config.get('ACCESS_AUDIT_FLUSH_INTERVAL', os.environ.get('MUVHR_AUDIT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+    max_bytes = app.config.get('ACCESS_AUDIT_MAX_BYTES', os.environ.get('MUVHR_AUDIT_MAX_BYTES', DEFAULT_MAX_BYTES))
+    backups = app.config.get('ACCESS_AUDIT_BACKUPS', os.environ.get('MUVHR_AUDIT_BACKUPS', DEFAULT_BACKUPS))
+    access_audit.configure(
+        path=path or None,
+        capacity=int(capacity),
+        sample_rate=min(max(float(rate), 0.0), 1.0),
+        flush_interval=float(interval),
+        max_bytes=int(max_bytes),
+        backups=int(backups)
+    )
+    app.extensions['access_audit'] = access_audit
+    logger.info(f"Access audit: {path or 'memory only'}, granted sample rate {float(rate)}")
+    return access_audit
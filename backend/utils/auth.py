@@ -1,19 +1,11 @@
 from functools import wraps
 from flask import request, jsonify
 import logging
+from backend.utils.permissions import permissions
+from backend.utils.access_audit import DENIED, GRANTED, INVALID_ROLE, MISSING_ROLE, access_audit
 
 logger = logging.getLogger(__name__)
 
-# Role-based permissions mapping
-role_permissions = {
-    'admin': ['contracts', 'onboarding', 'uploads', 'resources', 'time-off', 'time-tracking', 'groups', 'entities'],
-    'hr': ['contracts', 'onboarding', 'uploads', 'resources', 'time-off', 'time-tracking', 'groups'],
-    'manager': ['contracts', 'uploads', 'resources', 'time-off'],
-    'engineer': ['uploads', 'resources'],
-    'marketing': ['uploads', 'resources'],
-    'intern': ['resources'],
-}
-
 def role_required(feature):
     """
     Decorator to enforce role-based access control
@@ -30,23 +22,25 @@ def role_required(feature):
             # Get role from request parameters (temporary for testing)
             # In production, this would come from JWT token or session
             role = request.args.get("role", "").lower()
-            
-            logger.info(f"Access attempt: role={role}, feature={feature}")
+            route = request.url_rule.rule if request.url_rule is not None else request.path
             
             if not role:
+                access_audit.record(role, feature, MISSING_ROLE, route)
                 logger.warning("No role provided in request")
                 return jsonify({"error": "Role is required", "success": False}), 401
             
             # Check if role exists and has permission for the feature
-            if role not in role_permissions:
-                logger.warning(f"Invalid role: {role}")
-                return jsonify({"error": "Invalid role", "success": False}), 401
-            
-            if feature not in role_permissions[role]:
+            if not permissions.allows(role, feature):
+                if not permissions.is_role(role):
+                    access_audit.record(role, feature, INVALID_ROLE, route)
+                    logger.warning(f"Invalid role: {role}")
+                    return jsonify({"error": "Invalid role", "success": False}), 401
+
+                access_audit.record(role, feature, DENIED, route)
                 logger.warning(f"Access denied: role={role}, feature={feature}")
                 return jsonify({"error": "Access denied for this role", "success": False}), 403
             
-            logger.info(f"Access granted: role={role}, feature={feature}")
+            access_audit.record(role, feature, GRANTED, route)
             return f(*args, **kwargs)
         
         return decorated_function
@@ -62,4 +56,17 @@ def get_user_permissions(role):
     Returns:
         list: List of permissions for the role
     """
-    return role_permissions.get(role.lower(), [])
\ No newline at end of file
+    return list(permissions.features(role))
+
+def check_role_access(user_role, feature):
+    """
+    Check if a role has access to a feature
+    
+    Args:
+        user_role (str): User role
+        feature (str): Feature name, e.g. 'contracts' or 'onboarding-modify'
+    
+    Returns:
+        bool: True if access is allowed
+    """
+    return permissions.allows(user_role, feature)
\ No newline at end of file
@@ -0,0 +1,127 @@
+import logging
+import os
+import re
+import time
+import uuid
+from backend.utils.doc_store import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Unreferenced blobs younger than this are kept, so an upload whose metadata
+# has not been written yet is never collected
+GC_GRACE_PERIOD = 60 * 60
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class BlobStore:
+    """
+    Content-addressed file storage keyed by SHA-256
+
+    Blobs live at ``<root>/blobs/<aa>/<bb>/<sha256>``, fanned out on the first
+    two bytes of the hash so no directory grows too large. Identical uploads
+    share one blob; references are the upload records carrying the hash, and
+    blobs without references are removed by ``collect_garbage``.
+
+    Commits and removals hold one lock (``<root>/blobs.lock``, shared by all
+    processes), so collection cannot delete a blob, or its fan-out
+    directories, while an upload is committing the same content.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.blob_root = os.path.join(root, 'blobs')
+        self.tmp_root = os.path.join(root, 'tmp')
+
+    def blob_path(self, sha256):
+        if not _SHA256_RE.match(sha256 or ''):
+            raise ValueError(f"Invalid SHA-256 digest: {sha256!r}")
+        return os.path.join(self.blob_root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return os.path.exists(self.blob_path(sha256))
+
+    def temp_path(self):
+        """Scratch path on the same filesystem as the blobs, for atomic commits"""
+        os.makedirs(self.tmp_root, exist_ok=True)
+        return os.path.join(self.tmp_root, uuid.uuid4().hex)
+
+    def commit(self, tmp_path, sha256):
+        """
+        Move a fully written temp file into the store
+
+        Returns:
+            tuple: (blob path, True if the content was new)
+        """
+        path = self.blob_path(sha256)
+        with file_lock(self.blob_root):
+            is_new = not os.path.exists(path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Identical content: the rename leaves one copy with a fresh
+            # mtime, so a GC pass after the lock keeps it too
+            os.replace(tmp_path, path)
+        return path, is_new
+
+    def iter_blobs(self):
+        """Yield (sha256, path) for every stored blob"""
+        if not os.path.isdir(self.blob_root):
+            return
+        for dirpath, _, filenames in os.walk(self.blob_root):
+            for name in filenames:
+                if _SHA256_RE.match(name):
+                    yield name, os.path.join(dirpath, name)
+
+    def collect_garbage(self, referenced, grace_period=GC_GRACE_PERIOD, dry_run=False):
+        """
+        Delete blobs whose hash is not in ``referenced``
+
+        Args:
+            referenced (set): SHA-256 digests still used by upload records
+            grace_period (float): Skip blobs modified within this many seconds
+            dry_run (bool): Report without deleting
+
+        Returns:
+            dict: Number of blobs removed and bytes reclaimed
+        """
+        cutoff = time.time() - grace_period
+        removed = 0
+        reclaimed = 0
+        for sha256, path in self.iter_blobs():
+            if sha256 in referenced:
+                continue
+            st = os.stat(path)
+            if st.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                with file_lock(self.blob_root):
+                    # An upload may have committed this content since the stat
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    if st.st_mtime > cutoff:
+                        continue
+                    os.remove(path)
+                    self._prune_fanout_dirs(path)
+                logger.info(f"Removed unreferenced blob {sha256}")
+            removed += 1
+            reclaimed += st.st_size
+
+        # Stale scratch files from aborted uploads
+        if os.path.isdir(self.tmp_root):
+            for name in os.listdir(self.tmp_root):
+                path = os.path.join(self.tmp_root, name)
+                if os.path.getmtime(path) < cutoff and not dry_run:
+                    os.remove(path)
+
+        return {"removed": removed, "bytes_reclaimed": reclaimed}
+
+    def _prune_fanout_dirs(self, path):
+        """Remove the fan-out directories of a deleted blob if they are now empty"""
+        parent = os.path.dirname(path)
+        for _ in range(2):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                return
+            parent = os.path.dirname(parent)
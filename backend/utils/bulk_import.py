@@ -0,0 +1,245 @@
+import csv
+import json
+import time
+from datetime import date
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from backend.db import db
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class RowError(ValueError):
+    """Raised by a field converter for a value that cannot be imported"""
+
+
+# ----------------------------------------------------------------------
+# Field converters
+# ----------------------------------------------------------------------
+
+def text_field(max_length, required=True):
+    def convert(value):
+        value = '' if value is None else str(value).strip()
+        if not value:
+            if required:
+                raise RowError("is required")
+            return None
+        if len(value) > max_length:
+            raise RowError(f"is longer than {max_length} characters")
+        return value
+    return convert
+
+
+def date_field(value):
+    if isinstance(value, str):
+        value = value.strip()
+    if not value:
+        raise RowError("is required")
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise RowError(f"must be a date in YYYY-MM-DD format, got {value!r}")
+
+
+class ImportSpec:
+    """
+    How input records map onto one table
+
+    Args:
+        model: SQLAlchemy model receiving the rows
+        key (str): Column used to match existing rows for upserts
+        fields (dict): Column name -> converter raising RowError
+        prepare (callable): Optional hook turning an input record into column values
+    """
+
+    def __init__(self, model, key, fields, prepare=None):
+        self.model = model
+        self.key = key
+        self.fields = fields
+        self.prepare = prepare
+
+    def convert(self, record):
+        if self.prepare is not None:
+            record = self.prepare(record)
+        row = {}
+        for column, convert in self.fields.items():
+            try:
+                row[column] = convert(record.get(column))
+            except RowError as e:
+                raise RowError(f"{column} {e}")
+        return row
+
+
+# ----------------------------------------------------------------------
+# Readers: generators, so only one batch is ever held in memory
+# ----------------------------------------------------------------------
+
+def iter_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line_number, record in enumerate(csv.DictReader(f), start=2):
+            yield line_number, record
+
+
+def iter_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, RowError(f"invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield line_number, RowError("line is not a JSON object")
+                continue
+            yield line_number, record
+
+
+READERS = {
+    'csv': iter_csv,
+    'jsonl': iter_jsonl
+}
+
+
+def reader_for(path, input_format=None):
+    """Pick a reader from an explicit format or the file extension"""
+    if input_format is None:
+        input_format = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+    return READERS[input_format]
+
+
+# ----------------------------------------------------------------------
+# Importer
+# ----------------------------------------------------------------------
+
+class ErrorFile:
+    """Rejected rows as JSON lines: source line, reason and the raw record"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self.count = 0
+
+    def write(self, line_number, error, record):
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+        entry = {"line": line_number, "error": str(error), "record": record}
+        self._file.write(json.dumps(entry, default=str) + '\n')
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class BulkImporter:
+    """
+    Stream records into a table in batches of executemany inserts
+
+    Each batch is converted and validated, rejected rows go to the error
+    file, and the rest are written in a single statement per batch and
+    committed. With ``upsert`` an existing row with the same key is
+    updated in place; otherwise it is left alone.
+
+    When the database refuses a batch (a constraint, a value too long for
+    its column, the same key twice in one statement) the batch is rolled
+    back and retried row by row, and the rows it still refuses go to the
+    error file. Operational errors (a lost connection, a locked database)
+    are not about any one row and abort the import.
+    """
+
+    def __init__(self, spec, batch_size=DEFAULT_BATCH_SIZE, upsert=True, errors=None, progress=None):
+        self.spec = spec
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.errors = errors
+        self.progress = progress
+        self.read = 0
+        self.written = 0
+        self.rejected = 0
+        self.elapsed = 0.0
+
+    def _statement(self):
+        table = self.spec.model.__table__
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            stmt = sqlite.insert(table)
+        elif dialect == 'postgresql':
+            stmt = postgresql.insert(table)
+        else:
+            raise ValueError(f"Bulk import does not support the {dialect} dialect")
+
+        if not self.upsert:
+            return stmt.on_conflict_do_nothing(index_elements=[self.spec.key])
+        updates = {column: stmt.excluded[column] for column in self.spec.fields if column != self.spec.key}
+        return stmt.on_conflict_do_update(index_elements=[self.spec.key], set_=updates)
+
+    def _reject(self, line_number, error, record):
+        self.rejected += 1
+        if self.errors is not None:
+            self.errors.write(line_number, error, record)
+
+    def _flush(self, stmt, batch):
+        """Write (line_number, record, row) entries, falling back to one row at a time"""
+        if not batch:
+            return
+        try:
+            db.session.execute(stmt, [row for _, _, row in batch])
+            db.session.commit()
+            self.written += len(batch)
+            return
+        except OperationalError:
+            raise
+        except SQLAlchemyError:
+            db.session.rollback()
+
+        for line_number, record, row in batch:
+            try:
+                db.session.execute(stmt, [row])
+                db.session.commit()
+                self.written += 1
+            except OperationalError:
+                raise
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                self._reject(line_number, getattr(e, 'orig', None) or e, record)
+
+    def run(self, records):
+        """
+        Import (line_number, record) pairs; records may be RowError instances
+
+        Returns:
+            BulkImporter: self, with read/written/rejected counters filled in
+        """
+        stmt = self._statement()
+        start = time.perf_counter()
+        batch = []
+        try:
+            for line_number, record in records:
+                self.read += 1
+                if isinstance(record, RowError):
+                    self._reject(line_number, record, None)
+                    continue
+                try:
+                    batch.append((line_number, record, self.spec.convert(record)))
+                except RowError as e:
+                    self._reject(line_number, e, record)
+                    continue
+
+                if len(batch) >= self.batch_size:
+                    self._flush(stmt, batch)
+                    batch = []
+                    if self.progress is not None:
+                        self.progress(self)
+            self._flush(stmt, batch)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - start
+        return self
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
@@ -0,0 +1,149 @@
+import copy
+import json
+import logging
+import os
+import threading
+from backend.utils.doc_store import JsonDocumentWriter
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the mock/*.json documents served by the blueprints
+MOCK_DIR = os.path.abspath(os.environ.get('MUVHR_MOCK_DIR') or os.path.join(os.path.dirname(__file__), '..', '..', 'mock'))
+
+
+def mock_path(name):
+    """Return the absolute path of a document in the mock/ directory"""
+    return os.path.join(MOCK_DIR, name)
+
+
+class DocumentCache:
+    """
+    Process-wide cache of parsed JSON documents.
+
+    Each entry is keyed by its absolute path and remembers the (mtime, size,
+    inode) of the file it was parsed from. A lookup costs one ``os.stat``;
+    the file is only re-read and re-parsed when that signature changes or
+    the entry was invalidated explicitly.
+
+    Cached documents are shared between requests and must be treated as
+    read-only. Callers that need to modify a document should ask for a copy.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def load(self, path, default=list, copy_result=False):
+        """
+        Load a JSON document, serving it from memory when the file is unchanged
+
+        Args:
+            path (str): Path of the JSON file
+            default (callable): Factory for the value returned when the file
+                is missing or cannot be parsed
+            copy_result (bool): Return a deep copy safe for modification
+
+        Returns:
+            The parsed document, or ``default()`` on error
+        """
+        path = os.path.abspath(path)
+        try:
+            signature = self._signature(path)
+        except FileNotFoundError:
+            self.invalidate(path)
+            return default()
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                document = entry[1]
+                return copy.deepcopy(document) if copy_result else document
+            self.misses += 1
+
+        try:
+            with open(path, 'r') as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return default()
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid JSON document: {path}")
+            return default()
+
+        with self._lock:
+            self._entries[path] = (signature, document)
+        return copy.deepcopy(document) if copy_result else document
+
+    def invalidate(self, path=None):
+        """Drop one cached document, or every document when no path is given"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached documents"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "documents": len(self._entries)
+            }
+
+
+# Shared instance used by all blueprints
+document_cache = DocumentCache()
+
+
+def load_mock_document(name, copy_result=False):
+    """Load a mock/*.json document through the shared cache"""
+    return document_cache.load(mock_path(name), copy_result=copy_result)
+
+
+# One writer per document, so concurrent updates share group commits
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def mock_document_writer(name):
+    """Return the shared JsonDocumentWriter for a mock/*.json document"""
+    path = mock_path(name)
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = JsonDocumentWriter(path, on_commit=document_cache.invalidate)
+        return writer
+
+
+def save_mock_document(name, data):
+    """Atomically replace a mock/*.json document and invalidate its cache entry"""
+    try:
+        mock_document_writer(name).replace(data)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to save {name}: {str(e)}")
+        return False
+
+
+def update_mock_document(name, mutate):
+    """
+    Read-modify-write a mock/*.json document safely across processes
+
+    Args:
+        name (str): Document name in mock/
+        mutate (callable): Changes the latest document in place
+
+    Returns:
+        Whatever ``mutate`` returned, once the write is durable
+    """
+    return mock_document_writer(name).update(mutate)
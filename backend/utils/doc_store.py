@@ -0,0 +1,228 @@
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# How long a group-commit leader waits for more writes to join its batch
+DEFAULT_COMMIT_WINDOW = 0.002
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Advisory lock shared by every process using the same path
+
+    The lock lives on a sidecar ``<path>.lock`` file rather than the data
+    file itself, so it survives the data file being replaced by rename.
+    """
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+def fsync_directory(path):
+    """Make a rename in ``path``'s directory durable"""
+    fd = os.open(os.path.dirname(os.path.abspath(path)) or '.', os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data):
+    """
+    Replace a file so readers and crashes only ever see the old or new contents
+
+    The data goes to a temporary file in the same directory, is fsynced,
+    renamed over ``path``, and the directory entry is fsynced as well.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(path)
+
+
+class _Failed:
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _Replace:
+    __slots__ = ('document',)
+
+    def __init__(self, document):
+        self.document = document
+
+
+class _Pending:
+    __slots__ = ('item', 'done', 'result', 'lead')
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.lead = False
+
+
+class GroupCommitter:
+    """
+    Batch concurrent writes into one commit (leader/follower group commit)
+
+    The first writer to arrive becomes the leader: it waits ``window``
+    seconds for others to queue up, then passes every queued item to
+    ``commit`` in one call. Followers block until their batch is durable.
+    When more items queued up during the commit, leadership passes to the
+    oldest of them, so no caller does work on behalf of later batches.
+
+    Args:
+        commit (callable): Takes a list of items and returns one result
+            per item; a _Failed result is raised to that item's caller
+        window (float): Seconds the leader waits before committing
+    """
+
+    def __init__(self, commit, window=DEFAULT_COMMIT_WINDOW):
+        self._commit = commit
+        self.window = window
+        self._lock = threading.Lock()
+        self._queue = []
+        self._leading = False
+        self.items = 0
+        self.batches = 0
+
+    def submit(self, item):
+        """Queue an item and return its commit result once it is durable"""
+        entry = _Pending(item)
+        with self._lock:
+            self._queue.append(entry)
+            lead = entry.lead = not self._leading
+            self._leading = True
+
+        if not lead:
+            entry.done.wait()
+            if entry.lead:
+                self._lead()
+                entry.done.wait()
+        else:
+            self._lead()
+        if isinstance(entry.result, _Failed):
+            raise entry.result.error
+        return entry.result
+
+    def _lead(self):
+        if self.window:
+            time.sleep(self.window)
+        with self._lock:
+            batch, self._queue = self._queue, []
+
+        try:
+            results = self._commit([entry.item for entry in batch])
+        except Exception as e:
+            results = [_Failed(e)] * len(batch)
+
+        with self._lock:
+            self.items += len(batch)
+            self.batches += 1
+            if self._queue:
+                # Hand over to the oldest waiter instead of committing for it
+                successor = self._queue[0]
+                successor.lead = True
+                successor.done.set()
+            else:
+                self._leading = False
+        for entry, result in zip(batch, results):
+            entry.lead = False
+            entry.result = result
+            entry.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "items": self.items,
+                "batches": self.batches,
+                "items_per_batch": round(self.items / self.batches, 2) if self.batches else None
+            }
+
+
+class JsonDocumentWriter:
+    """
+    Crash-safe, multi-process read-modify-write of one JSON document
+
+    Every commit takes the file lock, re-reads the document from disk (so
+    changes made by other processes are never overwritten), applies each
+    queued mutation in order, and writes the result once with atomic_write.
+    A burst of concurrent updates therefore costs one serialize-and-fsync.
+    """
+
+    def __init__(self, path, indent=2, default=list, window=DEFAULT_COMMIT_WINDOW, on_commit=None):
+        self.path = path
+        self.indent = indent
+        self.default = default
+        self.on_commit = on_commit
+        self._committer = GroupCommitter(self._commit, window)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return self.default()
+
+    def _commit(self, mutations):
+        results = []
+        with file_lock(self.path):
+            document = self._read()
+            for mutate in mutations:
+                try:
+                    if isinstance(mutate, _Replace):
+                        document = mutate.document
+                        results.append(True)
+                    else:
+                        results.append(mutate(document))
+                except Exception as e:
+                    results.append(_Failed(e))
+            atomic_write(self.path, json.dumps(document, indent=self.indent))
+        if self.on_commit is not None:
+            self.on_commit(self.path)
+        return results
+
+    def update(self, mutate):
+        """
+        Apply ``mutate(document)`` to the latest on-disk document and persist it
+
+        The mutation changes the document in place; its return value is
+        returned here once the write is durable. A mutation that raises
+        should do so before changing anything.
+        """
+        return self._committer.submit(mutate)
+
+    def replace(self, document):
+        """Persist a whole new document"""
+        return self._committer.submit(_Replace(document))
+
+    def stats(self):
+        return self._committer.stats()
@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+from backend.utils.pagination import PaginationError, parse_date_arg
+
+# Window when none is requested: already expired or expiring within 30 days
+DEFAULT_WINDOW_DAYS = 30
+MAX_WINDOW_DAYS = 3650
+
+
+def parse_expiry_window(args, today=None):
+    """
+    Resolve expiry window query arguments to inclusive date bounds
+
+    ``window`` is a number of days from today (7, 30, 90, ...) or
+    ``overdue``; ``from``/``to`` give a custom range instead. With no
+    arguments the window covers overdue contracts and the next 30 days.
+
+    Args:
+        args: request.args
+        today (date): Reference date, defaults to the current date
+
+    Returns:
+        tuple: (from, to) as YYYY-MM-DD strings, either may be None (open)
+    """
+    today = today or date.today()
+    start = parse_date_arg(args, 'from')
+    end = parse_date_arg(args, 'to')
+    window = args.get('window', '').strip().lower()
+
+    if window and (start or end):
+        raise PaginationError("Use either window or from/to, not both")
+    if start and end and start > end:
+        raise PaginationError("from must not be after to")
+    if start or end:
+        return start, end
+
+    if window == 'overdue':
+        return None, (today - timedelta(days=1)).isoformat()
+    if not window:
+        return None, (today + timedelta(days=DEFAULT_WINDOW_DAYS)).isoformat()
+
+    try:
+        days = int(window.rstrip('d'))
+    except ValueError:
+        raise PaginationError("window must be a number of days or 'overdue'")
+    if not 0 <= days <= MAX_WINDOW_DAYS:
+        raise PaginationError(f"window must be between 0 and {MAX_WINDOW_DAYS} days")
+    return today.isoformat(), (today + timedelta(days=days)).isoformat()
+
+
+def is_iso_date(value):
+    """True for a well-formed YYYY-MM-DD string"""
+    try:
+        date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return False
+    return len(value) == 10
+
+
+def count_by_month(dates):
+    """
+    Group sorted YYYY-MM-DD strings into [{"month": "YYYY-MM", "count": n}]
+
+    Args:
+        dates (iterable): Dates in ascending order
+
+    Returns:
+        list: One entry per month that has at least one date
+    """
+    months = []
+    for value in dates:
+        month = value[:7]
+        if months and months[-1]["month"] == month:
+            months[-1]["count"] += 1
+        else:
+            months.append({"month": month, "count": 1})
+    return months
+
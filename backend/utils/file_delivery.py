@@ -0,0 +1,123 @@
+import hashlib
+import mimetypes
+import os
+import threading
+from flask import current_app, request, Response
+from werkzeug.utils import send_file
+
+# How file bytes leave the app:
+#   direct   - send_file through wsgi.file_wrapper (sendfile under gunicorn)
+#   sendfile - X-Sendfile header for Apache/lighttpd
+#   accel    - X-Accel-Redirect header for an nginx internal location
+DELIVERY_MODES = ('direct', 'sendfile', 'accel')
+
+# Cache-Control max-age for delivered files; revalidated with ETags
+DELIVERY_MAX_AGE = 3600
+
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+
+class _ContentHashCache:
+    """SHA-256 of files on disk, recomputed only when (mtime, size, inode) changes"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, st):
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BUFFER_SIZE), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+
+        with self._lock:
+            self._entries[path] = (signature, sha256)
+        return sha256
+
+
+content_hashes = _ContentHashCache()
+
+
+def delivery_mode():
+    mode = current_app.config.get('FILE_DELIVERY_MODE') or os.environ.get('MUVHR_FILE_DELIVERY', 'direct')
+    return mode if mode in DELIVERY_MODES else 'direct'
+
+
+def send_stored_file(path, download_name, sha256=None, as_attachment=True, accel_root=None, accel_location='',
+                     mimetype=None):
+    """
+    Deliver a file with a strong ETag, conditional GET and Range support
+
+    Args:
+        path (str): File on disk
+        download_name (str): Name offered to the browser; also used to guess
+            the MIME type (blobs have no extension)
+        sha256 (str): Known content hash; computed and cached when omitted
+        as_attachment (bool): Send Content-Disposition: attachment
+        accel_root (str): Storage directory mapped to accel_location in
+            nginx; only used in accel mode
+        accel_location (str): Sub-location of FILE_ACCEL_PREFIX for accel_root
+        mimetype (str): Content type to send instead of the one guessed from
+            download_name
+
+    Returns:
+        Response: 200/206 with the bytes, 304 when the client copy is current,
+        or 416 for unsatisfiable ranges
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    etag = sha256 or content_hashes.get(path, st)
+    mode = delivery_mode()
+
+    if mode == 'accel':
+        location = f"{current_app.config.get('FILE_ACCEL_PREFIX', '/protected').rstrip('/')}/{accel_location}"
+        relative = os.path.relpath(path, os.path.abspath(accel_root or os.path.dirname(path)))
+        redirect = f"{location.rstrip('/')}/{relative.replace(os.sep, '/')}"
+        return _accel_redirect(redirect, download_name, etag, st, as_attachment, mimetype)
+
+    # send_file answers If-None-Match/If-Modified-Since with 304 and Range
+    # with 206; use_x_sendfile hands the body off to the front-end server
+    response = send_file(
+        path,
+        request.environ,
+        download_name=download_name,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        conditional=True,
+        etag=etag,
+        last_modified=st.st_mtime,
+        max_age=DELIVERY_MAX_AGE,
+        use_x_sendfile=(mode == 'sendfile'),
+        response_class=current_app.response_class
+    )
+    _mark_private(response)
+    return response
+
+
+def _mark_private(response):
+    # Access is role-dependent, so shared caches must not store the bytes
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = DELIVERY_MAX_AGE
+
+
+def _accel_redirect(redirect, download_name, etag, st, as_attachment, mimetype=None):
+    """Let nginx stream the file from an internal location"""
+    mimetype = mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    response = Response(status=200, mimetype=mimetype)
+    response.headers['X-Accel-Redirect'] = redirect
+    response.headers['Content-Disposition'] = (
+        f"{'attachment' if as_attachment else 'inline'}; filename=\"{download_name}\""
+    )
+    response.set_etag(etag)
+    response.last_modified = st.st_mtime
+    _mark_private(response)
+    # nginx handles Range itself; only the 304 decision is made here
+    return response.make_conditional(request, accept_ranges=False)
@@ -0,0 +1,201 @@
+import hashlib
+import html
+import re
+import signal
+import zipfile
+import zlib
+
+# Content types of the upload formats, keyed by extension
+MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+READ_BUFFER_SIZE = 64 * 1024
+# Most bytes decompressed from any one zip member or PDF stream
+MAX_INFLATED_SIZE = 32 * 1024 * 1024
+# Extracted text kept in the upload record
+TEXT_EXCERPT_CHARS = 1000
+
+_PDF_STREAM_RE = re.compile(rb'stream\r?\n(.*?)\r?\nendstream', re.S)
+# Bytes before a stream searched for its dictionary (and its /Filter)
+_PDF_DICT_LOOKBACK = 1024
+_PDF_PAGE_RE = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+_PDF_TEXT_RE = re.compile(rb'\((?:[^()\\]|\\.)*\)\s*Tj|\[(?:[^\]\\]|\\.)*\]\s*TJ', re.S)
+_PDF_STRING_RE = re.compile(rb'\(((?:[^()\\]|\\.)*)\)', re.S)
+_DOCX_TEXT_RE = re.compile(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>|(</w:p>)')
+_XLSX_TEXT_RE = re.compile(r'<t(?:\s[^>]*)?>([^<]*)</t>')
+
+
+class InspectionError(Exception):
+    """The file itself is wrong (corrupt, mislabelled); retrying will not help"""
+
+
+class StageTimeout(Exception):
+    """A stage ran past its time limit inside the worker"""
+
+
+# ----------------------------------------------------------------------
+# Format readers
+# ----------------------------------------------------------------------
+
+def sniff_type(path):
+    """Extension matching the file's content (pdf, docx, xlsx), or None"""
+    with open(path, 'rb') as f:
+        head = f.read(8)
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        try:
+            with zipfile.ZipFile(path) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return None
+        if 'word/document.xml' in names:
+            return 'docx'
+        if 'xl/workbook.xml' in names:
+            return 'xlsx'
+    return None
+
+
+def _zip_text(archive, name):
+    try:
+        with archive.open(name) as member:
+            return member.read(MAX_INFLATED_SIZE).decode('utf-8', 'replace')
+    except KeyError:
+        return ''
+
+
+def _pdf_chunks(path):
+    """
+    The PDF outside its streams, then the content of each stream once
+
+    Unfiltered streams are yielded as they are and Flate streams inflated;
+    streams with other filters, or that fail to inflate, are skipped.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    streams = list(_PDF_STREAM_RE.finditer(data))
+    outside = []
+    position = 0
+    for match in streams:
+        outside.append(data[position:match.start()])
+        position = match.end()
+    outside.append(data[position:])
+    yield b'\n'.join(outside)
+
+    for match in streams:
+        # The stream dictionary sits between the object header and "stream"
+        head = data[max(0, match.start() - _PDF_DICT_LOOKBACK):match.start()]
+        head = head[head.rfind(b' obj') + 1:]
+        stream = match.group(1)
+        if b'/Filter' not in head:
+            yield stream
+        elif b'/FlateDecode' in head:
+            try:
+                yield zlib.decompressobj().decompress(stream, MAX_INFLATED_SIZE)
+            except zlib.error:
+                continue
+
+
+def _pdf_string(raw):
+    # Literal strings only; escapes other than \( \) \\ are dropped
+    return re.sub(rb'\\(.)', rb'\1', raw).decode('latin-1')
+
+
+def page_count(path, file_type):
+    """Pages in a PDF, pages recorded by Word in a DOCX, sheets in an XLSX"""
+    if file_type == 'pdf':
+        return sum(len(_PDF_PAGE_RE.findall(chunk)) for chunk in _pdf_chunks(path)) or None
+    with zipfile.ZipFile(path) as archive:
+        if file_type == 'docx':
+            match = re.search(r'<Pages>(\d+)</Pages>', _zip_text(archive, 'docProps/app.xml'))
+            return int(match.group(1)) if match else None
+        if file_type == 'xlsx':
+            return _zip_text(archive, 'xl/workbook.xml').count('<sheet ') or None
+    return None
+
+
+def extract_text(path, file_type):
+    """Best-effort plain text of a document (no layout)"""
+    if file_type == 'pdf':
+        parts = []
+        for chunk in _pdf_chunks(path):
+            for operator in _PDF_TEXT_RE.finditer(chunk):
+                parts.append(''.join(_pdf_string(s) for s in _PDF_STRING_RE.findall(operator.group(0))))
+        return ' '.join(parts)
+    with zipfile.ZipFile(path) as archive:
+        if file_type == 'docx':
+            return ''.join(
+                '\n' if paragraph_end else html.unescape(text)
+                for text, paragraph_end in _DOCX_TEXT_RE.findall(_zip_text(archive, 'word/document.xml'))
+            )
+        if file_type == 'xlsx':
+            return ' '.join(html.unescape(text) for text in _XLSX_TEXT_RE.findall(_zip_text(archive, 'xl/sharedStrings.xml')))
+    return ''
+
+
+# ----------------------------------------------------------------------
+# Pipeline stages: each takes (path, record) and returns fields to merge
+# ----------------------------------------------------------------------
+
+def checksum_stage(path, record):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BUFFER_SIZE), b''):
+            digest.update(block)
+    if record.get('sha256') and digest.hexdigest() != record['sha256']:
+        raise InspectionError("Stored file does not match its recorded SHA-256")
+    return {"checksum_verified": True}
+
+
+def sniff_stage(path, record):
+    declared = record.get('file_type')
+    detected = sniff_type(path)
+    if detected != declared:
+        raise InspectionError(f"Content is {detected or 'not a supported document'}, but the file is named .{declared}")
+    return {"mime_type": MIME_TYPES[detected]}
+
+
+def page_count_stage(path, record):
+    try:
+        return {"page_count": page_count(path, record['file_type'])}
+    except zipfile.BadZipFile as e:
+        raise InspectionError(f"Unreadable {record['file_type']}: {str(e)}")
+
+
+def text_stage(path, record):
+    try:
+        text = ' '.join(extract_text(path, record['file_type']).split())
+    except zipfile.BadZipFile as e:
+        raise InspectionError(f"Unreadable {record['file_type']}: {str(e)}")
+    return {"text_length": len(text), "text_excerpt": text[:TEXT_EXCERPT_CHARS]}
+
+
+STAGES = {
+    'checksum': checksum_stage,
+    'sniff': sniff_stage,
+    'page_count': page_count_stage,
+    'text': text_stage
+}
+
+
+def _on_alarm(signum, frame):
+    raise StageTimeout()
+
+
+def run_stage(name, path, record, timeout):
+    """
+    Run one stage in a pool worker, interrupted after ``timeout`` seconds
+
+    Pool workers run tasks on their main thread, so a SIGALRM timer can
+    stop a stage that hangs in Python code without killing the worker.
+    """
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return STAGES[name](path, record)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
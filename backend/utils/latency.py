@@ -0,0 +1,164 @@
+import bisect
+import json
+import logging
+import os
+import random
+import time
+from flask import request, jsonify
+
+logger = logging.getLogger(__name__)
+
+# Latency/fault profiles per environment. Keys are Flask endpoint names,
+# "<blueprint>.*" for a whole blueprint, or "*" for every endpoint.
+LATENCY_PROFILES = {
+    # Real traffic is never slowed down
+    'production': {},
+    # Mirrors the delays the handlers used to hard-code for the demo UI
+    'development': {
+        'contracts.*': {'delay_ms': 300},
+        'onboarding.list_onboarding': {'delay_ms': 400},
+        'onboarding.toggle_onboarding_task': {'delay_ms': 300},
+        'resources.list_resources': {'delay_ms': 400},
+        'resources.serve_file': {'delay_ms': 300},
+        'uploads.upload_file': {'delay_ms': 500},
+        'uploads.*': {'delay_ms': 300},
+    },
+    # Realistic slow backend for load tests: long-tailed latency plus faults
+    'loadtest': {
+        '*': {'percentiles': {50: 120, 95: 450, 99: 1200}, 'error_rate': 0.01},
+    },
+}
+
+
+class LatencyRule:
+    """
+    Delay and fault settings for one route
+
+    Args:
+        delay_ms (float): Fixed delay added to every request
+        jitter_ms (float): Uniform jitter of +/- jitter_ms around delay_ms
+        percentiles (dict): Percentile -> delay in ms, e.g. {50: 100, 99: 900}.
+            Delays are sampled by interpolating between the given points
+            (0 ms at the 0th percentile unless specified) and added to delay_ms.
+        error_rate (float): Fraction of requests answered with error_status
+        error_status (int): HTTP status used for injected faults
+    """
+
+    def __init__(self, delay_ms=0, jitter_ms=0, percentiles=None, error_rate=0.0, error_status=503):
+        self.delay_ms = float(delay_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.error_rate = float(error_rate)
+        self.error_status = int(error_status)
+
+        points = {float(p): float(ms) for p, ms in (percentiles or {}).items()}
+        if points:
+            points.setdefault(0.0, 0.0)
+        self._quantiles = sorted(points)
+        self._quantile_delays = [points[p] for p in self._quantiles]
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a rule from a dict, or from a bare number of milliseconds"""
+        if isinstance(config, (int, float)):
+            return cls(delay_ms=config)
+        return cls(**config)
+
+    @property
+    def is_noop(self):
+        return not (self.delay_ms or self.jitter_ms or self._quantiles or self.error_rate)
+
+    def sample_delay(self, rng):
+        """Return a delay in seconds drawn from this rule's distribution"""
+        delay = self.delay_ms
+        if self.jitter_ms:
+            delay += rng.uniform(-self.jitter_ms, self.jitter_ms)
+        if self._quantiles:
+            delay += self._sample_percentile(rng.uniform(0, 100))
+        return max(delay, 0.0) / 1000.0
+
+    def _sample_percentile(self, u):
+        quantiles, delays = self._quantiles, self._quantile_delays
+        i = bisect.bisect_left(quantiles, u)
+        if i >= len(quantiles):
+            return delays[-1]
+        if i == 0:
+            return delays[0]
+        lo, hi = quantiles[i - 1], quantiles[i]
+        weight = (u - lo) / (hi - lo)
+        return delays[i - 1] + weight * (delays[i] - delays[i - 1])
+
+    def should_fail(self, rng):
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+class LatencyInjector:
+    """Resolves latency rules per endpoint and applies them before each request"""
+
+    def __init__(self, rules=None, seed=None, sleep=time.sleep):
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self.configure(rules or {})
+
+    def configure(self, rules):
+        """Replace the active rule set"""
+        self.rules = {key: LatencyRule.from_config(value) for key, value in rules.items()}
+        self._resolved = {}
+
+    def rule_for(self, endpoint):
+        """Return the most specific rule for an endpoint, or None"""
+        if endpoint in self._resolved:
+            return self._resolved[endpoint]
+
+        rule = self.rules.get(endpoint)
+        if rule is None and endpoint and '.' in endpoint:
+            rule = self.rules.get(endpoint.split('.', 1)[0] + '.*')
+        if rule is None:
+            rule = self.rules.get('*')
+        if rule is not None and rule.is_noop:
+            rule = None
+
+        self._resolved[endpoint] = rule
+        return rule
+
+    def before_request(self):
+        rule = self.rule_for(request.endpoint)
+        if rule is None:
+            return None
+
+        delay = rule.sample_delay(self.rng)
+        if delay:
+            self.sleep(delay)
+
+        if rule.should_fail(self.rng):
+            logger.debug(f"Injected fault on {request.endpoint}")
+            return jsonify({"error": "Injected fault", "success": False}), rule.error_status
+        return None
+
+
+def load_latency_rules(app):
+    """
+    Build the rule set for the current environment
+
+    The profile is chosen by LATENCY_PROFILE in the app config or the
+    MUVHR_ENV environment variable (default: production). Rules from
+    LATENCY_RULES in the app config, or the MUVHR_LATENCY_RULES environment
+    variable as JSON, are merged over the profile.
+    """
+    profile = app.config.get('LATENCY_PROFILE') or os.environ.get('MUVHR_ENV', 'production')
+    if profile not in LATENCY_PROFILES:
+        logger.warning(f"Unknown latency profile '{profile}', injecting no latency")
+    rules = dict(LATENCY_PROFILES.get(profile, {}))
+
+    overrides = app.config.get('LATENCY_RULES')
+    if overrides is None and os.environ.get('MUVHR_LATENCY_RULES'):
+        overrides = json.loads(os.environ['MUVHR_LATENCY_RULES'])
+    rules.update(overrides or {})
+    return rules
+
+
+def init_latency(app):
+    """Attach the latency/fault injector to a Flask app"""
+    injector = LatencyInjector(load_latency_rules(app), seed=app.config.get('LATENCY_SEED'))
+    app.extensions['latency'] = injector
+    app.before_request(injector.before_request)
+    return injector
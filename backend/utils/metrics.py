@@ -0,0 +1,362 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.utils.doc_store import atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+# Request latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label used for requests that matched no route, so 404 scans cannot
+# create a series per path
+UNMATCHED_ENDPOINT = 'unmatched'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds between snapshots written for the other worker processes
+DEFAULT_SNAPSHOT_INTERVAL = 1.0
+# Counters of exited workers, folded together, in the snapshot directory
+ARCHIVE_NAME = 'exited.json'
+
+# Snapshot series: name -> (type, help, label names); gauges are only
+# summed over live processes
+SERIES = {
+    'muvhr_http_requests_total': ('counter', 'Requests completed, by status', ('method', 'endpoint', 'status')),
+    'muvhr_http_errors_total': ('counter', 'Requests answered with a 4xx or 5xx status', ('method', 'endpoint', 'status')),
+    'muvhr_http_requests_in_flight': ('gauge', 'Requests currently being handled', ('endpoint',)),
+    'muvhr_http_response_bytes_total': ('counter', 'Response body bytes sent (when the length is known)', ('endpoint',)),
+    'muvhr_db_queries_total': ('counter', 'Database queries executed while handling requests', ('endpoint',)),
+    'muvhr_db_query_seconds_total': ('counter', 'Time spent in database queries while handling requests', ('endpoint',))
+}
+DURATIONS = 'muvhr_http_request_duration_seconds'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values):
+    return ','.join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def merge_snapshot(total, snapshot, gauges=True):
+    """Add one process's snapshot into ``total`` (histograms bucket by bucket)"""
+    for name, values in snapshot.items():
+        if name != DURATIONS and SERIES[name][0] == 'gauge' and not gauges:
+            continue
+        merged = total.setdefault(name, {})
+        for key, value in values.items():
+            if name == DURATIONS:
+                counts, histogram_sum, count = merged.get(key, ([0] * len(value[0]), 0.0, 0))
+                merged[key] = (list(map(sum, zip(counts, value[0]))), histogram_sum + value[1], count + value[2])
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return total
+
+
+def dump_snapshot(snapshot):
+    return json.dumps({name: [[list(key), value] for key, value in values.items()] for name, values in snapshot.items()})
+
+
+def load_snapshot(data):
+    return {name: {tuple(key): value for key, value in values} for name, values in json.loads(data).items()}
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class _Histogram:
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+# Per-thread query counters; a request runs on one thread from start to finish
+_local = threading.local()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _local.query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(_local, 'query_start', None)
+    if start is None:
+        return
+    _local.query_start = None
+    _local.queries = getattr(_local, 'queries', 0) + 1
+    _local.query_time = getattr(_local, 'query_time', 0.0) + (time.perf_counter() - start)
+
+
+class Metrics:
+    """
+    Request metrics rendered in the Prometheus text format
+
+    Series are keyed by Flask endpoint name rather than URL, so the number
+    of series is bounded by the number of routes. Updates take one lock
+    and a bisect per request; rendering works on a snapshot.
+
+    With a ``directory`` shared by the worker processes of one server, each
+    process writes its snapshot there (``<pid>.json``) every
+    ``snapshot_interval`` seconds from a background thread, and ``render``
+    sums every snapshot, so any worker answering a scrape reports the whole
+    server. Snapshots of exited workers are folded into ARCHIVE_NAME, so
+    counters do not go back when workers are recycled.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, clock=time.perf_counter, directory=None,
+                 snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        self.buckets = tuple(sorted(buckets))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.configure(directory, snapshot_interval)
+        self.reset()
+
+    def configure(self, directory=None, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL):
+        with self._lock:
+            self.directory = directory
+            self.snapshot_interval = snapshot_interval
+
+    def reset(self):
+        with self._lock:
+            self._durations = {}
+            self._requests = {}
+            self._errors = {}
+            self._in_flight = {}
+            self._bytes = {}
+            self._queries = {}
+            self._query_time = {}
+            self._changes = 0
+            self._written = None
+
+    # ------------------------------------------------------------------
+    # Flask hooks
+    # ------------------------------------------------------------------
+
+    def before_request(self):
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        g._metrics = (self._clock(), endpoint)
+        _local.queries = 0
+        _local.query_time = 0.0
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+
+    def after_request(self, response):
+        self._finish(response.status_code, response.content_length or 0)
+        return response
+
+    def teardown_request(self, exc):
+        # after_request is skipped when a view raises; count it as a 500
+        if exc is not None:
+            self._finish(500, 0)
+
+    def _finish(self, status, size):
+        state = g.pop('_metrics', None)
+        if state is None:
+            return
+        start, endpoint = state
+        elapsed = self._clock() - start
+        queries = getattr(_local, 'queries', 0)
+        query_time = getattr(_local, 'query_time', 0.0)
+        method = request.method
+        index = bisect.bisect_left(self.buckets, elapsed)
+
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+
+            key = (method, endpoint)
+            histogram = self._durations.get(key)
+            if histogram is None:
+                histogram = self._durations[key] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[index] += 1
+            histogram.sum += elapsed
+            histogram.count += 1
+
+            status_key = (method, endpoint, status)
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            if status >= 400:
+                self._errors[status_key] = self._errors.get(status_key, 0) + 1
+
+            self._bytes[endpoint] = self._bytes.get(endpoint, 0) + size
+            if queries:
+                self._queries[endpoint] = self._queries.get(endpoint, 0) + queries
+                self._query_time[endpoint] = self._query_time.get(endpoint, 0.0) + query_time
+            self._changes += 1
+
+        if self.directory:
+            self._ensure_writer()
+
+    # ------------------------------------------------------------------
+    # Snapshots shared between worker processes
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """This process's values: series name -> {label tuple: value}"""
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {
+            DURATIONS: {key: (list(h.counts), h.sum, h.count) for key, h in self._durations.items()},
+            'muvhr_http_requests_total': dict(self._requests),
+            'muvhr_http_errors_total': dict(self._errors),
+            'muvhr_http_requests_in_flight': {(endpoint,): n for endpoint, n in self._in_flight.items()},
+            'muvhr_http_response_bytes_total': {(endpoint,): n for endpoint, n in self._bytes.items()},
+            'muvhr_db_queries_total': {(endpoint,): n for endpoint, n in self._queries.items()},
+            'muvhr_db_query_seconds_total': {(endpoint,): n for endpoint, n in self._query_time.items()}
+        }
+
+    def _ensure_writer(self):
+        # Threads do not survive fork, so each pre-fork worker starts its own
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='metrics-snapshot', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.snapshot_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Failed to write metrics snapshot to {self.directory}: {str(e)}")
+
+    def flush(self):
+        """Write this process's snapshot to the shared directory if it changed"""
+        with self._lock:
+            directory = self.directory
+            if not directory or self._written == self._changes:
+                return
+            changes = self._changes
+            data = dump_snapshot(self._snapshot())
+        atomic_write(os.path.join(directory, f"{os.getpid()}.json"), data)
+        with self._lock:
+            self._written = changes
+
+    def _collect(self):
+        """Sum of every process's snapshot, folding exited workers into the archive"""
+        own = self.snapshot()
+        directory = self.directory
+        if not directory:
+            return own
+        archive = os.path.join(directory, ARCHIVE_NAME)
+        total = merge_snapshot({}, own)
+        with file_lock(archive):
+            try:
+                with open(archive) as f:
+                    exited = load_snapshot(f.read())
+            except FileNotFoundError:
+                exited = {}
+            folded = []
+            for name in os.listdir(directory):
+                stem, ext = os.path.splitext(name)
+                if ext != '.json' or not stem.isdigit() or int(stem) == os.getpid():
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    with open(path) as f:
+                        snapshot = load_snapshot(f.read())
+                except (FileNotFoundError, ValueError):
+                    continue
+                if _process_alive(int(stem)):
+                    merge_snapshot(total, snapshot)
+                else:
+                    # Its in-flight gauge died with it
+                    merge_snapshot(exited, snapshot, gauges=False)
+                    folded.append(path)
+            if folded:
+                atomic_write(archive, dump_snapshot(exited))
+                for path in folded:
+                    os.remove(path)
+        return merge_snapshot(total, exited)
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    def render(self):
+        """Current values, summed over every worker sharing the directory, in the Prometheus text format"""
+        snapshot = self._collect()
+
+        lines = [
+            f'# HELP {DURATIONS} Request latency by endpoint',
+            f'# TYPE {DURATIONS} histogram'
+        ]
+        bounds = [format_value(float(b)) for b in self.buckets] + ['+Inf']
+        for (method, endpoint), (counts, total, count) in sorted(snapshot.get(DURATIONS, {}).items()):
+            labels = format_labels(('method', 'endpoint'), (method, endpoint))
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'{DURATIONS}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{DURATIONS}_sum{{{labels}}} {format_value(total)}')
+            lines.append(f'{DURATIONS}_count{{{labels}}} {count}')
+
+        for name, (kind, help_text, label_names) in SERIES.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key, value in sorted(snapshot.get(name, {}).items(), key=lambda item: str(item[0])):
+                lines.append(f'{name}{{{format_labels(label_names, key)}}} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def init_metrics(app):
+    """
+    Record request metrics for the app and all its blueprints
+
+    Call before other before_request hooks are registered so their time is
+    included. METRICS_ENABLED in the app config or MUVHR_METRICS=0 in the
+    environment turns collection off. METRICS_DIR / MUVHR_METRICS_DIR name
+    the directory where worker processes share snapshots (run/serve.py
+    sets one up); without it each process reports only itself.
+    """
+    enabled = app.config.get('METRICS_ENABLED', os.environ.get('MUVHR_METRICS', '1') not in ('0', 'false', 'no'))
+    if not enabled:
+        logger.info("Request metrics disabled")
+        return None
+
+    directory = app.config.get('METRICS_DIR', os.environ.get('MUVHR_METRICS_DIR'))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    metrics.configure(directory or None)
+
+    app.before_request(metrics.before_request)
+    app.after_request(metrics.after_request)
+    app.teardown_request(metrics.teardown_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.extensions['metrics'] = metrics
+    return metrics
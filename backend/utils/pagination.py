@@ -0,0 +1,199 @@
+import base64
+import bisect
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Counting stops here; larger results report an estimate instead of scanning
+COUNT_CAP = 10000
+
+
+class PaginationError(ValueError):
+    """Raised for malformed paging, sorting or filter arguments"""
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last item on a page"""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, types=None):
+    """
+    Inverse of encode_cursor; raises PaginationError for anything else
+
+    Args:
+        token (str): Cursor from a previous page
+        types (tuple): Expected type of each value, one per position; the
+            cursor must have exactly that many values
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+    if not isinstance(values, list):
+        raise PaginationError("Invalid cursor")
+    if types is not None and (len(values) != len(types) or not all(
+            isinstance(value, expected) and not isinstance(value, bool)
+            for value, expected in zip(values, types))):
+        # A value of another type would fail deep inside bisect or the database
+        raise PaginationError("Invalid cursor")
+    return tuple(values)
+
+
+def parse_page_args(args, sort_fields, default_sort, cursor_types=(str, str)):
+    """
+    Read limit/cursor/sort/order query arguments
+
+    Args:
+        args: request.args
+        sort_fields (iterable): Allowed values for ``sort``
+        default_sort (str): Sort field when none is given
+        cursor_types (tuple): Type of each cursor value; by default a
+            (sort value, id) pair of strings, as every sortable field is a
+            string or an ISO date
+
+    Returns:
+        dict: limit, cursor (tuple or None), sort, descending
+    """
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be positive")
+
+    sort = args.get('sort', default_sort)
+    if sort not in sort_fields:
+        raise PaginationError(f"sort must be one of: {', '.join(sorted(sort_fields))}")
+
+    order = args.get('order', 'asc').lower()
+    if order not in ('asc', 'desc'):
+        raise PaginationError("order must be 'asc' or 'desc'")
+
+    cursor = args.get('cursor')
+    return {
+        "limit": min(limit, MAX_PAGE_SIZE),
+        "cursor": decode_cursor(cursor, cursor_types) if cursor else None,
+        "sort": sort,
+        "descending": order == 'desc'
+    }
+
+
+def parse_date_arg(args, name):
+    """Validate an optional YYYY-MM-DD query argument, returning it as a string"""
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise PaginationError(f"{name} must be a date in YYYY-MM-DD format")
+    return value
+
+
+class SortedView:
+    """
+    Records sorted once by (field, id) for keyset paging in memory
+
+    A page is located with a binary search on the cursor, and filters on the
+    sort field itself (a prefix or a range) narrow the scanned slice with
+    further binary searches instead of testing every record.
+    """
+
+    def __init__(self, records, field, id_field='id'):
+        self.field = field
+        self.id_field = id_field
+        self.records = sorted(records, key=self.key)
+        self.keys = [self.key(record) for record in self.records]
+
+    def key(self, record):
+        value = record.get(self.field)
+        return (value if value is not None else '', record[self.id_field])
+
+    def _bounds(self, low, high):
+        """
+        Slice of records whose sort value lies between low and high (None = open)
+
+        high is inclusive and also matches values it prefixes, so
+        low == high == "Ah" selects every value starting with "Ah".
+        """
+        start = bisect.bisect_left(self.keys, (low,)) if low is not None else 0
+        end = bisect.bisect_left(self.keys, (high + '\uffff',)) if high is not None else len(self.keys)
+        return start, end
+
+    def between(self, low=None, high=None):
+        """Records whose sort value lies between low and high, in order"""
+        start, end = self._bounds(low, high)
+        return self.records[start:end]
+
+    def page(self, limit, cursor=None, descending=False, predicate=None, low=None, high=None):
+        """
+        Return (items, next cursor values or None, matching count, count is exact)
+
+        Args:
+            limit (int): Page size
+            cursor (tuple): Sort key of the last item of the previous page
+            descending (bool): Walk the order backwards
+            predicate (callable): Additional filter on records
+            low, high (str): Inclusive bounds on the sort field's value
+        """
+        start, end = self._bounds(low, high)
+        if descending:
+            if cursor is not None:
+                end = min(end, bisect.bisect_left(self.keys, tuple(cursor)))
+            indexes = range(end - 1, start - 1, -1)
+        else:
+            if cursor is not None:
+                start = max(start, bisect.bisect_right(self.keys, tuple(cursor)))
+            indexes = range(start, end)
+
+        items = []
+        next_cursor = None
+        for i in indexes:
+            record = self.records[i]
+            if predicate is not None and not predicate(record):
+                continue
+            if len(items) == limit:
+                next_cursor = self.key(items[-1])
+                break
+            items.append(record)
+
+        count, exact = self.count(predicate, low, high)
+        return items, next_cursor, count, exact
+
+    def count(self, predicate=None, low=None, high=None):
+        """Matching records, counting at most COUNT_CAP of them"""
+        start, end = self._bounds(low, high)
+        if predicate is None:
+            return end - start, True
+        count = 0
+        for i in range(start, end):
+            if predicate(self.records[i]):
+                count += 1
+                if count >= COUNT_CAP:
+                    return count, False
+        return count, True
+
+
+def keyset_condition(sort_column, id_column, cursor, descending=False):
+    """SQL condition selecting rows after a (sort value, id) cursor"""
+    if descending:
+        return tuple_(sort_column, id_column) < tuple_(*cursor)
+    return tuple_(sort_column, id_column) > tuple_(*cursor)
+
+
+def page_payload(items_key, items, next_cursor, total_count, exact, **extra):
+    """Standard JSON body for a keyset page"""
+    payload = {
+        items_key: items,
+        "total_count": total_count,
+        "total_count_exact": exact,
+        "next_cursor": encode_cursor(next_cursor) if next_cursor is not None else None
+    }
+    payload.update(extra)
+    return payload
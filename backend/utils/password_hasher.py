@@ -0,0 +1,105 @@
+import logging
+import os
+import threading
+from flask_bcrypt import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+# Verifications waiting for a worker, beyond those running, before rejecting
+DEFAULT_QUEUE_DEPTH = 16
+
+
+class HasherBusyError(Exception):
+    """Raised when every hashing slot and queue place is taken"""
+
+
+def hash_rounds(password_hash):
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), or None if unparseable"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification with bounded concurrency and fast rejection
+
+    Hashes run on the calling request thread (bcrypt releases the GIL), but
+    at most ``workers`` of them at once, so a login burst cannot take every
+    core, and at most ``queue_depth`` more callers wait for a turn. Anything
+    beyond that raises HasherBusyError straight away so the burst is shed
+    instead of piling request threads up behind itself while other endpoints
+    starve.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH):
+        self.rounds = rounds
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.configure(rounds, workers, queue_depth)
+
+    def configure(self, rounds=None, workers=None, queue_depth=None):
+        if rounds is not None:
+            self.rounds = rounds
+        if workers is not None or queue_depth is not None:
+            self.workers = workers if workers is not None else self.workers
+            self.queue_depth = queue_depth if queue_depth is not None else self.queue_depth
+            # (admitted, running); operations in flight release the pair they took
+            self._limits = (
+                threading.BoundedSemaphore(self.workers + self.queue_depth),
+                threading.BoundedSemaphore(self.workers)
+            )
+
+    def _run(self, fn, *args):
+        admitted, running = self._limits
+        if not admitted.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusyError("Password verification is busy, try again shortly")
+        try:
+            with running:
+                return fn(*args)
+        finally:
+            admitted.release()
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored bcrypt hash"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def hash(self, password):
+        """Hash a password at the configured cost"""
+        return self._run(generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def needs_rehash(self, password_hash):
+        return hash_rounds(password_hash) != self.rounds
+
+    def stats(self):
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected
+        }
+
+
+password_hasher = PasswordHasher()
+
+
+def init_password_hasher(app):
+    """
+    Configure password hashing from the app config or environment
+
+    BCRYPT_LOG_ROUNDS / MUVHR_BCRYPT_ROUNDS set the work factor,
+    PASSWORD_WORKERS / MUVHR_PASSWORD_WORKERS the concurrent hashes and
+    PASSWORD_QUEUE_DEPTH / MUVHR_PASSWORD_QUEUE_DEPTH the admission limit.
+    """
+    rounds = app.config.get('BCRYPT_LOG_ROUNDS', os.environ.get('MUVHR_BCRYPT_ROUNDS', DEFAULT_ROUNDS))
+    workers = app.config.get('PASSWORD_WORKERS', os.environ.get('MUVHR_PASSWORD_WORKERS', DEFAULT_WORKERS))
+    depth = app.config.get('PASSWORD_QUEUE_DEPTH', os.environ.get('MUVHR_PASSWORD_QUEUE_DEPTH', DEFAULT_QUEUE_DEPTH))
+    password_hasher.configure(int(rounds), int(workers), int(depth))
+    app.extensions['password_hasher'] = password_hasher
+    logger.info(f"Password hashing: cost {int(rounds)}, {int(workers)} at once, queue depth {int(depth)}")
+    return password_hasher
@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Single source of truth for role-based access. Features are listed in bit
+# order; "module" is the dashboard module a feature unlocks (None for
+# actions that have no module of their own).
+DEFAULT_POLICY = {
+    "features": [
+        {"name": "contracts", "module": "Contractors"},
+        {"name": "onboarding", "module": "Onboarding"},
+        {"name": "onboarding-modify", "module": None},
+        {"name": "resources", "module": "Resources"},
+        {"name": "uploads", "module": "Upload"},
+        {"name": "time-off", "module": "Time Off"},
+        {"name": "time-tracking", "module": "Time Tracking"},
+        {"name": "groups", "module": "Groups"},
+        {"name": "entities", "module": "Entities"},
+        {"name": "roles-permissions", "module": "Roles & Permissions"},
+        {"name": "billing-payments", "module": "Billing & Payments"}
+    ],
+    "roles": {
+        "admin": {
+            "display_name": "Admin",
+            "features": ["contracts", "onboarding", "onboarding-modify", "resources", "uploads", "time-off",
+                         "time-tracking", "groups", "entities", "roles-permissions", "billing-payments"]
+        },
+        "hr": {
+            "display_name": "HR Specialist",
+            "aliases": ["hr specialist", "hr-specialist", "hr_specialist"],
+            "features": ["contracts", "onboarding", "onboarding-modify", "resources", "uploads", "time-off",
+                         "time-tracking", "groups"]
+        },
+        "manager": {
+            "display_name": "Manager",
+            "features": ["contracts", "onboarding", "resources", "uploads", "time-off"]
+        },
+        "engineer": {
+            "display_name": "Engineer",
+            "features": ["onboarding", "resources", "uploads"]
+        },
+        "marketing": {
+            "display_name": "Marketing",
+            "features": ["onboarding", "resources", "uploads"]
+        },
+        "intern": {
+            "display_name": "Intern",
+            "features": ["onboarding", "resources"]
+        }
+    }
+}
+
+# Minimum seconds between checks of a file-backed policy for changes
+POLICY_CHECK_INTERVAL = 5.0
+
+
+class PolicyError(ValueError):
+    """Raised when a permission policy is malformed"""
+
+
+class CompiledPolicy:
+    """
+    Immutable, compiled form of a policy
+
+    Every feature gets one bit; every role (and each of its aliases, module
+    names included) maps to the OR of its feature bits, so an access check is
+    two dict lookups and an AND.
+    """
+
+    def __init__(self, policy):
+        self.feature_bits = {}
+        module_of = {}
+        for i, feature in enumerate(policy.get("features", [])):
+            name = feature["name"]
+            self.feature_bits[name] = 1 << i
+            if feature.get("module"):
+                module_of[name] = feature["module"]
+                # Module names ("Contractors", "Time Off") are accepted as features too
+                self.feature_bits[feature["module"]] = 1 << i
+                self.feature_bits[feature["module"].lower()] = 1 << i
+
+        self.role_masks = {}
+        self.canonical = {}
+        self.display_names = {}
+        self.role_features = {}
+        self.role_modules = {}
+        for role, spec in policy.get("roles", {}).items():
+            mask = 0
+            for name in spec.get("features", []):
+                if name not in self.feature_bits:
+                    raise PolicyError(f"Role '{role}' references unknown feature '{name}'")
+                mask |= self.feature_bits[name]
+
+            display_name = spec.get("display_name", role)
+            for key in [role, display_name] + list(spec.get("aliases", [])):
+                self.role_masks[key] = mask
+                self.role_masks[key.lower()] = mask
+                self.canonical[key] = role
+                self.canonical[key.lower()] = role
+
+            self.display_names[role] = display_name
+            self.role_features[role] = tuple(spec.get("features", []))
+            self.role_modules[role] = tuple(
+                module_of[name] for name in self.role_features[role] if name in module_of
+            )
+
+
+class PermissionEngine:
+    """
+    Role/feature access checks backed by a compiled policy
+
+    The policy comes from DEFAULT_POLICY or, when MUVHR_PERMISSIONS_FILE is
+    set, a JSON file of the same shape. ``reload`` recompiles it without a
+    restart; the compiled policy is swapped in with one assignment, so
+    concurrent checks always see either the old or the new policy.
+    """
+
+    def __init__(self, policy=None, path=None):
+        self.path = path
+        self._reload_lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0.0
+        # Bumped on every reload so derived caches know to rebuild
+        self.version = 0
+        self._compiled = CompiledPolicy(policy if policy is not None else self._read_policy())
+
+    def _read_policy(self):
+        if not self.path:
+            return DEFAULT_POLICY
+        with open(self.path) as f:
+            policy = json.load(f)
+        st = os.stat(self.path)
+        self._signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return policy
+
+    def reload(self, policy=None):
+        """Recompile from the given policy, or re-read the policy source"""
+        with self._reload_lock:
+            compiled = CompiledPolicy(policy if policy is not None else self._read_policy())
+            self._compiled = compiled
+            self.version += 1
+        logger.info("Permission policy reloaded")
+
+    def maybe_reload(self):
+        """Reload a file-backed policy if it changed; checks at most every POLICY_CHECK_INTERVAL"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + POLICY_CHECK_INTERVAL
+        try:
+            st = os.stat(self.path)
+            if (st.st_mtime_ns, st.st_size, st.st_ino) != self._signature:
+                self.reload()
+        except (OSError, ValueError) as e:
+            logger.error(f"Keeping current permission policy, reload failed: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+
+    def allows(self, role, feature):
+        """True if the role may use the feature (both given by name, any case)"""
+        compiled = self._compiled
+        mask = compiled.role_masks.get(role)
+        if mask is None:
+            mask = compiled.role_masks.get(role.lower(), 0) if role else 0
+        return (mask & compiled.feature_bits.get(feature, 0)) != 0
+
+    def roles(self):
+        """Canonical role names in policy order"""
+        return tuple(self._compiled.role_features)
+
+    def is_role(self, role):
+        return bool(role) and (role in self._compiled.role_masks or role.lower() in self._compiled.role_masks)
+
+    def canonical_role(self, role):
+        """Policy key for a role name or alias ("HR Specialist" -> "hr"), or None"""
+        if not role:
+            return None
+        canonical = self._compiled.canonical
+        return canonical.get(role) or canonical.get(role.lower())
+
+    def display_name(self, role):
+        """Dashboard name for a role ("hr" -> "HR Specialist"), or None"""
+        canonical = self.canonical_role(role)
+        return self._compiled.display_names.get(canonical) if canonical else None
+
+    def features(self, role):
+        """Tuple of feature names granted to a role"""
+        return self._compiled.role_features.get(self.canonical_role(role), ())
+
+    def modules(self, role):
+        """Cached tuple of dashboard modules granted to a role"""
+        return self._compiled.role_modules.get(self.canonical_role(role), ())
+
+
+permissions = PermissionEngine(path=os.environ.get('MUVHR_PERMISSIONS_FILE') or None)
+
+
+def init_permissions(app):
+    """Pick up edits to a file-backed policy between requests"""
+    app.before_request(permissions.maybe_reload)
+    return permissions
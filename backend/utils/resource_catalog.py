@@ -0,0 +1,165 @@
+import json
+import threading
+from backend.utils.permissions import permissions
+
+
+class ResourceCatalog:
+    """
+    Normalized resource catalog with a role -> resource inverted index
+
+    Each resource is stored once, keyed by id, with a filename -> id map for
+    file lookups. ``allowed_roles`` entries are canonicalized through the
+    permission engine ("HR Specialist" and "hr" index the same role). The
+    per-role listing and its JSON encoding are built on first use and kept
+    until a resource visible to that role changes; an ACL change only touches
+    the roles it adds or removes.
+    """
+
+    def __init__(self, records=None, id_field='id'):
+        self.id_field = id_field
+        self._lock = threading.RLock()
+        self._resources = {}
+        self._position = {}
+        self._next_position = 0
+        self._by_filename = {}
+        self._role_index = {}
+        self._listings = {}
+        self._source = None
+        # Incremented whenever any role's listing changes
+        self.version = 0
+        if records:
+            self.sync(records)
+
+    @staticmethod
+    def _roles_of(record):
+        roles = set()
+        for role in record.get('allowed_roles', []):
+            roles.add(permissions.canonical_role(role) or role.lower())
+        return roles
+
+    def _invalidate(self, roles):
+        for role in roles:
+            self._listings.pop(role, None)
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def upsert(self, record):
+        """Add a resource or replace it entirely"""
+        with self._lock:
+            resource_id = record[self.id_field]
+            if resource_id in self._resources:
+                self.remove(resource_id)
+            # A replaced resource keeps its place in listings
+            if resource_id not in self._position:
+                self._position[resource_id] = self._next_position
+                self._next_position += 1
+
+            self._resources[resource_id] = record
+            self._by_filename[record['filename']] = resource_id
+            roles = self._roles_of(record)
+            for role in roles:
+                self._role_index.setdefault(role, set()).add(resource_id)
+            self._invalidate(roles)
+
+    def remove(self, resource_id):
+        """Drop a resource from the catalog and every role it was listed for"""
+        with self._lock:
+            record = self._resources.pop(resource_id, None)
+            if record is None:
+                return
+            if self._by_filename.get(record['filename']) == resource_id:
+                del self._by_filename[record['filename']]
+            roles = self._roles_of(record)
+            for role in roles:
+                self._role_index.get(role, set()).discard(resource_id)
+            self._invalidate(roles)
+
+    def set_allowed_roles(self, resource_id, allowed_roles):
+        """Change one resource's ACL, re-indexing only the roles that differ"""
+        with self._lock:
+            record = self._resources[resource_id]
+            old_roles = self._roles_of(record)
+            record = dict(record, allowed_roles=list(allowed_roles))
+            self._resources[resource_id] = record
+            new_roles = self._roles_of(record)
+
+            for role in old_roles - new_roles:
+                self._role_index.get(role, set()).discard(resource_id)
+            for role in new_roles - old_roles:
+                self._role_index.setdefault(role, set()).add(resource_id)
+            # The record itself changed, so every listing showing it is stale
+            self._invalidate(old_roles | new_roles)
+
+    def sync(self, records):
+        """
+        Bring the catalog in line with a full list of records
+
+        Only resources that were added, removed or modified are re-indexed.
+        Calling sync again with the same list object is a no-op.
+        """
+        with self._lock:
+            if records is self._source:
+                return
+            seen = set()
+            for record in records:
+                resource_id = record[self.id_field]
+                seen.add(resource_id)
+                current = self._resources.get(resource_id)
+                if current == record:
+                    continue
+                if current is not None and self._only_acl_differs(current, record):
+                    self.set_allowed_roles(resource_id, record.get('allowed_roles', []))
+                else:
+                    self.upsert(dict(record))
+            for resource_id in list(self._resources):
+                if resource_id not in seen:
+                    self.remove(resource_id)
+            self._source = records
+
+    @staticmethod
+    def _only_acl_differs(current, record):
+        strip = lambda r: {k: v for k, v in r.items() if k != 'allowed_roles'}
+        return strip(current) == strip(record)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_by_filename(self, filename):
+        with self._lock:
+            resource_id = self._by_filename.get(filename)
+            return self._resources.get(resource_id) if resource_id is not None else None
+
+    def role_can_access(self, role, resource_id):
+        """O(1) check of a resource's ACL against a role"""
+        canonical = permissions.canonical_role(role) or (role or '').lower()
+        with self._lock:
+            return resource_id in self._role_index.get(canonical, ())
+
+    def _listing(self, role):
+        canonical = permissions.canonical_role(role) or (role or '').lower()
+        listing = self._listings.get(canonical)
+        if listing is None:
+            ids = sorted(self._role_index.get(canonical, ()), key=self._position.get)
+            records = [self._resources[resource_id] for resource_id in ids]
+            encoded = json.dumps(records, sort_keys=True, separators=(',', ':'))
+            listing = (records, encoded)
+            self._listings[canonical] = listing
+        return listing
+
+    def for_role(self, role):
+        """Resources the role may access, in catalog order"""
+        with self._lock:
+            return self._listing(role)[0]
+
+    def encoded_for_role(self, role):
+        """(count, JSON array text) of the role's resources, cached per role"""
+        with self._lock:
+            records, encoded = self._listing(role)
+            return len(records), encoded
+
+    def __len__(self):
+        return len(self._resources)
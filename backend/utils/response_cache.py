@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from functools import wraps
+from flask import current_app, request
+from backend.utils.permissions import permissions
+
+# Upper bound on cached bodies; endpoints x roles stays far below this
+MAX_ENTRIES = 1024
+
+
+class ResponseCache:
+    """
+    Encoded JSON responses keyed by (endpoint, role, data version)
+
+    A view's successful JSON body is stored as bytes with a strong ETag and
+    replayed until one of its data sources changes version. Sources are
+    callables returning the current version of the data a view reads; the
+    permission policy version is always included since it decides what a
+    role may see. A view over constant data needs no sources. Requests
+    whose If-None-Match carries the current ETag get an empty 304.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def version(self, sources):
+        """Current version tuple for a list of version callables"""
+        return (permissions.version,) + tuple(source() for source in sources)
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, body):
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_entries:
+                # Evict the oldest insertion
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (version, body, etag)
+        return body, etag
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _respond(body, etag):
+    if request.if_none_match.contains(etag):
+        response_cache.not_modified += 1
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate on every poll
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def cached_response(*sources):
+    """
+    Decorator caching a role-keyed JSON view's encoded body
+
+    Args:
+        *sources: Callables returning the version of each data source the
+            view reads (none for constant data)
+
+    Returns:
+        function: Decorator function
+    """
+    def wrapper(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = (request.endpoint, kwargs.get('role', '').lower())
+            version = response_cache.version(sources)
+            cached = response_cache.get(key, version)
+            if cached is not None:
+                return _respond(*cached)
+
+            response = current_app.make_response(f(*args, **kwargs))
+            # Errors and denials are rendered fresh every time
+            if response.status_code != 200 or not response.is_json:
+                return response
+            return _respond(*response_cache.put(key, version, response.get_data()))
+
+        return decorated_function
+    return wrapper
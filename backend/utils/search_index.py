@@ -0,0 +1,541 @@
+import bisect
+import heapq
+import logging
+import math
+import operator
+import re
+import threading
+from backend.utils.permissions import permissions
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields and their ranking weights, per document kind
+FIELD_WEIGHTS = {
+    'resource': {'title': 3.0, 'filename': 2.0, 'category': 1.5, 'description': 1.0, 'uploaded_by': 1.0},
+    'upload': {'title': 3.0, 'original_filename': 2.0, 'category': 1.5, 'description': 1.0, 'uploaded_by': 1.0,
+               'text_excerpt': 0.5}
+}
+
+# Query terms shorter than this only match whole tokens
+MIN_PREFIX_LENGTH = 2
+# A token matched by prefix counts for this fraction of an exact match
+PREFIX_WEIGHT = 0.5
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Ranked results kept per recent query and updated as matching documents
+# change; broad queries cost time proportional to their matches, repeats
+# cost nothing
+RESULT_CACHE_SIZE = 256
+RESULT_CACHE_DEPTH = 5 * MAX_LIMIT
+# Relative slack on score bounds, for floating-point rounding
+_SCORE_BOUND_SLACK = 1e-9
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lower-case alphanumeric tokens of a string ("Q3-report.pdf" -> q3, report, pdf)"""
+    return TOKEN_RE.findall(str(text).lower()) if text else []
+
+
+def canonical_roles(allowed_roles):
+    """allowed_roles entries as canonical role names, like ResourceCatalog"""
+    return frozenset(permissions.canonical_role(role) or role.lower() for role in allowed_roles or ())
+
+
+class _Document:
+    __slots__ = ('kind', 'doc_id', 'record', 'public', 'roles', 'tokens')
+
+    def __init__(self, kind, doc_id, record, public, roles, tokens):
+        self.kind = kind
+        self.doc_id = doc_id
+        self.record = record
+        self.public = public
+        self.roles = roles
+        self.tokens = tokens
+
+
+class _CachedResult:
+    __slots__ = ('top', 'total_count', 'idfs', 'floor')
+
+    def __init__(self, top, total_count, idfs, floor):
+        self.top = top
+        self.total_count = total_count
+        # Scores in top are under these idfs, not today's
+        self.idfs = idfs
+        # No matching document left out of top scores above this
+        self.floor = floor
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over several kinds of documents
+
+    Each document, identified by (kind, id), gets an integer document number
+    and is tokenized once over the fields in FIELD_WEIGHTS; a posting maps
+    token -> {docno: weight}, where weight sums the field weights of every
+    occurrence. The vocabulary is also kept sorted so a query term can be
+    expanded to every token it prefixes.
+
+    A query is the AND of its terms: the posting keys of each term are
+    intersected, narrowest first, and only the surviving documents are
+    scored. Each term scores its best-matching token by weight * idf,
+    prefix matches at PREFIX_WEIGHT, and ties go to the most recently added
+    document (the highest number; a replaced document keeps its number).
+
+    ``roles`` on a document (canonical role names) restricts it to those
+    roles; None means any role may see it. Restricted documents are also
+    kept per role, so the check at query time is a set operation too.
+
+    The ranked results of recent queries are kept and updated in place: a
+    document that matches every term of a cached query is ranked into it
+    when indexed and taken out when changed or removed, so a repeated
+    broad query is not re-scored while uploads arrive. Each cached entry
+    keeps the idfs it was ranked with; a hit re-scores the leading entries
+    with today's idfs until the requested page provably outranks every
+    other match, and is re-ranked from the postings when it cannot.
+    """
+
+    def __init__(self, field_weights=FIELD_WEIGHTS, result_cache_size=RESULT_CACHE_SIZE):
+        self.field_weights = field_weights
+        self.result_cache_size = result_cache_size
+        self._lock = threading.RLock()
+        self._docnos = {}
+        self._docs = {}
+        self._next_docno = 0
+        self._by_kind = {kind: set() for kind in field_weights}
+        # Documents with a roles restriction, and those documents per role
+        self._restricted = set()
+        self._role_docs = {}
+        self._postings = {}
+        self._vocab = []
+        self._sources = {}
+        self._stale = {}
+        self._results = {}
+        # Query term -> cache keys of the cached queries using it
+        self._term_queries = {}
+        # Incremented whenever a document is added, changed or removed
+        self.version = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _tokens_of(self, kind, record):
+        tokens = {}
+        for field, weight in self.field_weights[kind].items():
+            for token in tokenize(record.get(field)):
+                tokens[token] = tokens.get(token, 0.0) + weight
+        return tokens
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def upsert(self, kind, doc_id, record, public=None, roles=None):
+        """
+        Index a document, or re-index it if it changed
+
+        Args:
+            kind (str): Key of FIELD_WEIGHTS
+            doc_id: Document id, unique within the kind
+            record (dict): Source record holding the indexed fields
+            public (dict): What search results show (defaults to the record)
+            roles (frozenset): Canonical roles allowed to see it, or None
+        """
+        with self._lock:
+            stale = self._stale.get(kind)
+            if stale is not None:
+                stale.discard(doc_id)
+            docno = self._docnos.get((kind, doc_id))
+            if docno is None:
+                docno = self._docnos[(kind, doc_id)] = self._next_docno
+                self._next_docno += 1
+            else:
+                current = self._docs[docno]
+                if current.record == record and current.roles == roles:
+                    return
+                self._unindex(docno, current)
+
+            self.version += 1
+            tokens = self._tokens_of(kind, record)
+            document = self._docs[docno] = _Document(kind, doc_id, record, public if public is not None else record, roles, tokens)
+            self._by_kind[kind].add(docno)
+            if roles is not None:
+                self._restricted.add(docno)
+                for role in roles:
+                    self._role_docs.setdefault(role, set()).add(docno)
+            for token, weight in tokens.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    bisect.insort(self._vocab, token)
+                posting[docno] = weight
+            self._admit_cached(docno, document)
+
+    def _unindex(self, docno, document):
+        self._retract_cached(docno, document)
+        self._by_kind[document.kind].discard(docno)
+        if document.roles is not None:
+            self._restricted.discard(docno)
+            for role in document.roles:
+                self._role_docs[role].discard(docno)
+        for token in document.tokens:
+            posting = self._postings[token]
+            del posting[docno]
+            if not posting:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+
+    def remove(self, kind, doc_id):
+        """Drop a document from the index"""
+        with self._lock:
+            docno = self._docnos.pop((kind, doc_id), None)
+            if docno is not None:
+                self._unindex(docno, self._docs.pop(docno))
+                self.version += 1
+
+    def _doc_ids(self, kind):
+        return {self._docs[docno].doc_id for docno in self._by_kind[kind]}
+
+    def sync(self, kind, records, roles=None, id_field='id'):
+        """
+        Bring one kind in line with a full list of records
+
+        Only new or changed records are re-tokenized. Calling sync again with
+        the same list object is a no-op.
+
+        Args:
+            roles (callable): Returns the canonical roles for a record
+        """
+        with self._lock:
+            if records is self._sources.get(kind):
+                return
+            seen = set()
+            for record in records:
+                doc_id = record[id_field]
+                seen.add(doc_id)
+                self.upsert(kind, doc_id, record, roles=roles(record) if roles else None)
+            for doc_id in self._doc_ids(kind) - seen:
+                self.remove(kind, doc_id)
+            self._sources[kind] = records
+
+    def begin_reload(self, kind):
+        """Start re-supplying every document of a kind (see end_reload)"""
+        with self._lock:
+            self._stale[kind] = self._doc_ids(kind)
+
+    def end_reload(self, kind):
+        """Drop the documents of a kind that were not re-supplied since begin_reload"""
+        with self._lock:
+            stale = self._stale.pop(kind, None)
+            for doc_id in stale or ():
+                self.remove(kind, doc_id)
+            if stale:
+                logger.info(f"Search index dropped {len(stale)} {kind} documents after a reload")
+
+    def follow(self, kind, public=None):
+        """
+        Return an UploadLog listener that mirrors the log into one kind
+
+        Args:
+            public (callable): Builds the result view of a record
+        """
+        def listener(event, record_id=None, record=None):
+            if event == 'put':
+                self.upsert(kind, record_id, record, public=public(record) if public else None)
+            elif event == 'delete':
+                self.remove(kind, record_id)
+            elif event == 'reset':
+                self.begin_reload(kind)
+            elif event == 'reloaded':
+                self.end_reload(kind)
+        return listener
+
+    def _cached_matching(self, tokens):
+        """Cache keys of queries whose every term matches one of these tokens"""
+        if not self._results:
+            return []
+        matched = set()
+        for token in tokens:
+            # The token itself, and every prefix long enough to be expanded
+            for end in range(MIN_PREFIX_LENGTH, len(token)):
+                if token[:end] in self._term_queries:
+                    matched.add(token[:end])
+            if token in self._term_queries:
+                matched.add(token)
+        return list({key for term in matched for key in self._term_queries[term] if key[0] <= matched})
+
+    @staticmethod
+    def _visible(document, key):
+        _, canonical, kinds = key
+        return (kinds is None or document.kind in kinds) and (
+            canonical is None or document.roles is None or canonical in document.roles)
+
+    def _idfs(self, terms):
+        """(term, token) -> idf of the token times its match factor for the term"""
+        total_docs = max(len(self._docs), 1)
+        idfs = {}
+        for term in terms:
+            exact, prefixed = self._expand(term)
+            for tokens, factor in ((exact, 1.0), (prefixed, PREFIX_WEIGHT)):
+                for token in tokens:
+                    idfs[(term, token)] = math.log(1 + total_docs / len(self._postings[token])) * factor
+        return idfs
+
+    def _score(self, terms, tokens, idfs):
+        """
+        A document's score for a query, as _rank computes it, under idfs
+
+        Tokens missing from idfs are added with today's idf, so later scores
+        against the same entry stay consistent with this one.
+        """
+        total_docs = max(len(self._docs), 1)
+        score = 0.0
+        # Summed in the same order as _rank, so equal scores compare equal
+        for term in sorted(terms):
+            best = 0.0
+            for token, weight in tokens.items():
+                if token == term:
+                    factor = 1.0
+                elif len(term) >= MIN_PREFIX_LENGTH and token.startswith(term):
+                    factor = PREFIX_WEIGHT
+                else:
+                    continue
+                idf = idfs.get((term, token))
+                if idf is None:
+                    idf = idfs[(term, token)] = math.log(1 + total_docs / len(self._postings[token])) * factor
+                best = max(best, weight * idf)
+            score += best
+        return score
+
+    def _retract_cached(self, docno, document):
+        """Take a document out of the cached results it appears in"""
+        for key in self._cached_matching(document.tokens):
+            if not self._visible(document, key):
+                continue
+            cached = self._results[key]
+            # Dropping a member of the true top n leaves the true top n - 1
+            cached.top = [item for item in cached.top if item[1] != docno]
+            cached.total_count -= 1
+
+    def _admit_cached(self, docno, document):
+        """Rank a newly indexed document into the cached results it matches"""
+        for key in self._cached_matching(document.tokens):
+            if not self._visible(document, key):
+                continue
+            cached = self._results[key]
+            top = cached.top
+            item = (self._score(key[0], document.tokens, cached.idfs), docno)
+            # Results past the cached prefix are unknown, so only a document
+            # ranking inside it (or a complete list) can be placed
+            if len(top) == cached.total_count or (top and item > top[-1]):
+                bisect.insort(top, item, key=lambda entry: (-entry[0], -entry[1]))
+                if len(top) > RESULT_CACHE_DEPTH:
+                    cached.floor = max(cached.floor, top.pop()[0])
+            else:
+                cached.floor = max(cached.floor, item[0])
+            cached.total_count += 1
+
+    def _rescored(self, key, cached, count):
+        """
+        The first ``count`` results of a cached entry under today's idfs
+
+        When every idf moved by the same factor (a single-token query, or
+        no change at all) the cached order stands and only the page is
+        re-scored. Otherwise no score exceeds its cached one by more than
+        the largest idf ratio, so entries are re-scored in cached order
+        until ``count`` of them beat that bound for everything not yet
+        re-scored (the rest of top, and the floor). Returns None when top
+        runs out first and the entry must be re-ranked.
+        """
+        total_docs = max(len(self._docs), 1)
+        term_idfs = {term: {} for term in key[0]}
+        ratios = set()
+        for (term, token), idf in cached.idfs.items():
+            posting = self._postings.get(token)
+            if posting is not None:
+                factor = 1.0 if token == term else PREFIX_WEIGHT
+                current = term_idfs[term][token] = math.log(1 + total_docs / len(posting)) * factor
+                ratios.add(current / idf)
+        # Summed in the same order as _rank, so equal scores compare equal
+        term_idfs = [term_idfs[term] for term in sorted(key[0])]
+
+        def score(docno):
+            tokens = self._docs[docno].tokens
+            total = 0.0
+            for idfs in term_idfs:
+                best = 0.0
+                if len(idfs) <= len(tokens):
+                    for token, idf in idfs.items():
+                        weight = tokens.get(token)
+                        if weight is not None and weight * idf > best:
+                            best = weight * idf
+                else:
+                    for token, weight in tokens.items():
+                        idf = idfs.get(token)
+                        if idf is not None and weight * idf > best:
+                            best = weight * idf
+                total += best
+            return total
+
+        complete = len(cached.top) == cached.total_count
+        if len(ratios) <= 1:
+            if len(cached.top) < count and not complete:
+                return None
+            return sorted(((score(docno), docno) for _, docno in cached.top[:count]), reverse=True)
+
+        growth = max(ratios) * (1 + _SCORE_BOUND_SLACK)
+        best = []
+        for cached_score, docno in cached.top:
+            if len(best) == count and best[0][0] > growth * max(cached_score, cached.floor):
+                break
+            item = (score(docno), docno)
+            if len(best) < count:
+                heapq.heappush(best, item)
+            else:
+                heapq.heappushpop(best, item)
+        else:
+            if not complete and not (len(best) == count and best[0][0] > growth * cached.floor):
+                return None
+        return sorted(best, reverse=True)
+
+    def _drop_cached(self, key):
+        del self._results[key]
+        for term in key[0]:
+            keys = self._term_queries[term]
+            keys.discard(key)
+            if not keys:
+                del self._term_queries[term]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _expand(self, term):
+        """Tokens a query term matches: itself, then every token it prefixes"""
+        exact = [term] if term in self._postings else []
+        if len(term) < MIN_PREFIX_LENGTH:
+            return exact, []
+        i = bisect.bisect_right(self._vocab, term)
+        j = bisect.bisect_left(self._vocab, term + '\uffff', i)
+        return exact, self._vocab[i:j]
+
+    def search(self, query, role=None, kinds=None, limit=DEFAULT_LIMIT, offset=0):
+        """
+        Ranked documents matching every term of a query
+
+        Args:
+            query (str): Free text; each token must match a whole token or
+                a token prefix in the document
+            role (str): Only documents this role may see (None skips the check)
+            kinds (iterable): Only these kinds (default all)
+            limit (int): Maximum results
+            offset (int): Results to skip, for paging
+
+        Returns:
+            tuple: (list of result dicts with type, score and the public
+            fields, total number of matches)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [], 0
+        canonical = (permissions.canonical_role(role) or role.lower()) if role is not None else None
+        kinds = set(kinds) if kinds is not None else None
+
+        with self._lock:
+            cache_key = (frozenset(terms), canonical, frozenset(kinds) if kinds is not None else None)
+            cached = self._results.get(cache_key)
+            top = self._rescored(cache_key, cached, offset + limit) if cached is not None else None
+            if top is not None:
+                total_count = cached.total_count
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+                ranked = self._rank(terms, canonical, kinds)
+                top = heapq.nlargest(max(offset + limit, RESULT_CACHE_DEPTH), ranked)
+                total_count = len(ranked)
+                if cached is not None:
+                    self._drop_cached(cache_key)
+                if self.result_cache_size:
+                    if len(self._results) >= self.result_cache_size:
+                        # Evict the oldest insertion
+                        self._drop_cached(next(iter(self._results)))
+                    floor = top[-1][0] if len(top) < total_count else 0.0
+                    self._results[cache_key] = _CachedResult(list(top), total_count, self._idfs(terms), floor)
+                    for term in cache_key[0]:
+                        self._term_queries.setdefault(term, set()).add(cache_key)
+
+            return [
+                dict(self._docs[docno].public, type=self._docs[docno].kind, score=round(score, 3))
+                for score, docno in top[offset:offset + limit]
+            ], total_count
+
+    def _rank(self, terms, canonical, kinds):
+        """(score, docno) for every visible document matching all terms"""
+        total_docs = max(len(self._docs), 1)
+        scoring = []
+        matched = None
+        # Narrowest term first, so each intersection is as small as possible
+        expanded = sorted(((term, self._expand(term)) for term in terms), key=lambda item: sum(
+            len(self._postings[token]) for tokens in item[1] for token in tokens
+        ))
+        for term, (exact, prefixed) in expanded:
+            matches = [
+                (self._postings[token], math.log(1 + total_docs / len(self._postings[token])) * factor)
+                for tokens, factor in ((exact, 1.0), (prefixed, PREFIX_WEIGHT))
+                for token in tokens
+            ]
+            if not matches:
+                return []
+            scoring.append((term, matches))
+            # Set algebra on posting keys runs in C (a dict view intersects
+            # without copying); only the final matches are scored in Python
+            if len(matches) == 1:
+                keys = matches[0][0].keys()
+            else:
+                keys = set().union(*(posting for posting, _ in matches))
+            matched = keys if matched is None else matched & keys
+            if not matched:
+                return []
+
+        if kinds is not None and len(kinds) < len(self._by_kind):
+            matched = set().union(*(matched & self._by_kind[kind] for kind in kinds if kind in self._by_kind))
+        if canonical is not None:
+            hidden = matched & self._restricted
+            if hidden:
+                matched = (matched - hidden) | (hidden & self._role_docs.get(canonical, set()))
+
+        # Score term by term over the whole match list, not doc by doc, in
+        # term order so sums match _score exactly
+        matched = list(matched)
+        scores = [0.0] * len(matched)
+        for _, matches in sorted(scoring, key=operator.itemgetter(0)):
+            if len(matches) == 1:
+                posting, idf = matches[0]
+                weights = [posting[docno] * idf for docno in matched]
+            else:
+                # A term matching several tokens counts its best one
+                best = dict.fromkeys(matched, 0.0)
+                for posting, idf in matches:
+                    for docno in best.keys() & posting.keys():
+                        weight = posting[docno] * idf
+                        if weight > best[docno]:
+                            best[docno] = weight
+                weights = best.values()
+            scores = list(map(operator.add, scores, weights))
+        return list(zip(scores, matched))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": {kind: len(docnos) for kind, docnos in self._by_kind.items()},
+                "tokens": len(self._vocab),
+                "cached_queries": len(self._results),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "version": self.version
+            }
+
+    def __len__(self):
+        return len(self._docs)
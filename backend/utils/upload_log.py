@@ -0,0 +1,375 @@
+import bisect
+import json
+import logging
+import os
+import threading
+from backend.utils.doc_cache import mock_path, load_mock_document
+from backend.utils.doc_store import GroupCommitter, atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+# Fields exposed by the archive listing (no server-side paths)
+PUBLIC_FIELDS = (
+    "id", "title", "original_filename", "category", "uploaded_by",
+    "upload_date", "upload_time", "file_size", "file_type", "status"
+)
+
+# Secondary indexes kept for archive filtering, blob reference counts and
+# the post-processing status
+INDEXED_FIELDS = ("category", "uploaded_by", "sha256", "status")
+
+# Compact once at least this many log lines are superseded and they make up
+# more than half of the log
+COMPACT_MIN_GARBAGE = 1000
+
+
+def project_public(record):
+    """Return the archive-listing view of an upload record"""
+    return {field: record.get(field) for field in PUBLIC_FIELDS}
+
+
+def order_key(record):
+    """Stable archive ordering key: upload date, upload time, id"""
+    return (record.get("upload_date") or '', record.get("upload_time") or '', record["id"])
+
+
+class UploadLog:
+    """
+    Append-only JSON-lines store for upload metadata.
+
+    Each line is a full record; a later line with the same id supersedes an
+    earlier one, and ``{"id": ..., "_deleted": true}`` removes it. Records are
+    indexed in memory by id and by INDEXED_FIELDS, and the public projection
+    used by the archive listing is computed once per record.
+
+    Live records are also kept in (upload_date, upload_time, id) order so the
+    archive can be paged with a keyset cursor that survives compaction.
+
+    Appends from other processes are picked up by reading the log from the
+    last known offset; a changed inode (compaction elsewhere) forces a full
+    reload. The log stays open between reads, which both pins the offset to
+    the file it belongs to and keeps its inode number from being reused by
+    the file that replaces it.
+    """
+
+    def __init__(self, path, legacy_path=None, compact_min_garbage=COMPACT_MIN_GARBAGE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.compact_min_garbage = compact_min_garbage
+        self._lock = threading.RLock()
+        self._file = None
+        self._listeners = []
+        self._reloading = False
+        # Concurrent appends share one write and fsync
+        self._appender = GroupCommitter(self._append_lines)
+        self._reset()
+
+    def _reset(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._listeners:
+            self._reloading = True
+            self._notify('reset')
+        self._records = {}
+        self._public = {}
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        self._order = []
+        self._offset = 0
+        self._lines = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _import_legacy(self):
+        """Seed the log from the legacy uploads.json document"""
+        if not self.legacy_path or os.path.exists(self.path):
+            return
+        legacy = load_mock_document(os.path.basename(self.legacy_path))
+        if not legacy:
+            return
+        with open(self.path, 'a') as f:
+            for record in legacy:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        logger.info(f"Imported {len(legacy)} upload records from {self.legacy_path}")
+
+    def _refresh(self):
+        """Apply log lines written since the last read, by this or another process"""
+        self._read_log()
+        if self._reloading:
+            self._reloading = False
+            self._notify('reloaded')
+
+    def _read_log(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._import_legacy()
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return
+
+        if self._file is not None and os.fstat(self._file.fileno()).st_ino != st.st_ino:
+            self._reset()
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        # Size of the file actually open, which may be newer than the stat above
+        if os.fstat(self._file.fileno()).st_size == self._offset:
+            return
+
+        self._file.seek(self._offset)
+        chunk = self._file.read()
+        # Ignore a trailing partial line still being written
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._offset += end
+
+    def _apply(self, record):
+        self._lines += 1
+        record_id = record["id"]
+        previous = self._records.pop(record_id, None)
+        self._public.pop(record_id, None)
+        if previous is not None:
+            for field in INDEXED_FIELDS:
+                ids = self._indexes[field].get(previous.get(field))
+                if ids is not None:
+                    ids.pop(record_id, None)
+            key = order_key(previous)
+            i = bisect.bisect_left(self._order, key)
+            if i < len(self._order) and self._order[i] == key:
+                del self._order[i]
+
+        if record.get("_deleted"):
+            if previous is not None:
+                self._notify('delete', record_id)
+            return
+
+        self._records[record_id] = record
+        self._public[record_id] = project_public(record)
+        for field in INDEXED_FIELDS:
+            self._indexes[field].setdefault(record.get(field), {})[record_id] = None
+        # New uploads sort last, so this is normally an append
+        bisect.insort(self._order, order_key(record))
+        self._notify('put', record_id, record)
+
+    # ------------------------------------------------------------------
+    # Change listeners
+    # ------------------------------------------------------------------
+
+    def add_listener(self, listener):
+        """
+        Call ``listener(event, record_id, record)`` on every change to the live records
+
+        Events are 'put' (new or updated record) and 'delete', plus 'reset'
+        when the log is about to be reloaded from scratch (after compaction)
+        and 'reloaded' once it has been, so records missing from the reload
+        can be dropped. The current records are replayed to a new listener
+        as a reload.
+        """
+        with self._lock:
+            self._refresh()
+            self._listeners.append(listener)
+            listener('reset')
+            for record_id, record in self._records.items():
+                listener('put', record_id, record)
+            listener('reloaded')
+
+    def _notify(self, event, record_id=None, record=None):
+        for listener in self._listeners:
+            try:
+                listener(event, record_id, record)
+            except Exception as e:
+                logger.error(f"Upload log listener failed on {event} {record_id}: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _append_lines(self, records):
+        data = b''.join((json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8') for record in records)
+        # Shared lock: appends from many processes may proceed together, but
+        # never while compaction is rewriting the log
+        with file_lock(self.path, shared=True):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return [None] * len(records)
+
+    def append(self, record):
+        """Append a new or updated record (durable when this returns)"""
+        self._appender.submit(record)
+        with self._lock:
+            self._refresh()
+            self._maybe_compact()
+
+    def delete(self, record_id):
+        """Append a tombstone for a record"""
+        self._appender.submit({"id": record_id, "_deleted": True})
+        with self._lock:
+            self._refresh()
+
+    def garbage(self):
+        """Number of log lines that no longer describe a live record"""
+        return self._lines - len(self._records)
+
+    def _maybe_compact(self):
+        garbage = self.garbage()
+        if garbage >= self.compact_min_garbage and garbage * 2 > self._lines:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with one line per live record"""
+        # The exclusive lock holds off appends from every process, so no line
+        # written after the read below can be lost by the rename
+        with self._lock, file_lock(self.path):
+            # Rebuild from disk rather than trusting the in-memory view
+            self._reset()
+            self._refresh()
+            atomic_write(self.path, ''.join(
+                json.dumps(record, separators=(',', ':')) + '\n' for record in self._records.values()
+            ))
+            logger.info(f"Compacted upload log: {self._lines} lines -> {len(self._records)}")
+            self._reset()
+            self._refresh()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Pick up changes made by other processes"""
+        with self._lock:
+            self._refresh()
+
+    def get(self, record_id):
+        """Return the full record for an id, or None"""
+        with self._lock:
+            self._refresh()
+            return self._records.get(record_id)
+
+    def find(self, field, value):
+        """Full records whose indexed ``field`` equals ``value``"""
+        with self._lock:
+            self._refresh()
+            return [self._records[record_id] for record_id in self._indexes[field].get(value, {})]
+
+    def list_public(self, **filters):
+        """
+        Return archive-listing records, optionally filtered by indexed fields
+
+        Args:
+            **filters: Exact-match values for fields in INDEXED_FIELDS
+
+        Returns:
+            list: Public projections in upload order
+        """
+        with self._lock:
+            self._refresh()
+            active = [(field, value) for field, value in filters.items() if value]
+            if not active:
+                return list(self._public.values())
+
+            # Walk the smallest matching index and probe the others
+            id_sets = sorted(
+                (self._indexes[field].get(value, {}) for field, value in active),
+                key=len
+            )
+            smallest, others = id_sets[0], id_sets[1:]
+            return [
+                self._public[record_id] for record_id in smallest
+                if all(record_id in ids for ids in others)
+            ]
+
+    def page_public(self, limit, cursor=None, descending=False, date_from=None, date_to=None, **filters):
+        """
+        Return one keyset page of archive-listing records in upload order
+
+        Args:
+            limit (int): Page size
+            cursor (tuple): order_key of the last record of the previous page
+            descending (bool): Newest first
+            date_from, date_to (str): Inclusive YYYY-MM-DD bounds on upload_date
+            **filters: Exact-match values for fields in INDEXED_FIELDS
+
+        Returns:
+            tuple: (records, next cursor or None, total_count, total_count is exact)
+        """
+        with self._lock:
+            self._refresh()
+            active = [(field, value) for field, value in filters.items() if value]
+            id_sets = sorted(
+                (self._indexes[field].get(value, {}) for field, value in active),
+                key=len
+            )
+
+            keys = self._order
+            lo = bisect.bisect_left(keys, (date_from,)) if date_from else 0
+            hi = bisect.bisect_left(keys, (date_to + '\uffff',)) if date_to else len(keys)
+            if id_sets and len(id_sets[0]) < hi - lo:
+                # The smallest index is narrower than the date range: order just
+                # its matches instead of scanning the range
+                keys = sorted(
+                    order_key(self._records[record_id]) for record_id in id_sets[0]
+                    if all(record_id in ids for ids in id_sets[1:])
+                )
+                id_sets = []
+                lo = bisect.bisect_left(keys, (date_from,)) if date_from else 0
+                hi = bisect.bisect_left(keys, (date_to + '\uffff',)) if date_to else len(keys)
+
+            if id_sets:
+                # Assume the filters are spread evenly over the date range
+                total_count = round((hi - lo) * len(id_sets[0]) / max(len(self._records), 1))
+                exact = len(id_sets) == 1 and hi - lo == len(self._order)
+                if exact:
+                    total_count = len(id_sets[0])
+            else:
+                total_count, exact = hi - lo, True
+
+            if descending:
+                if cursor is not None:
+                    hi = min(hi, bisect.bisect_left(keys, cursor))
+                positions = range(hi - 1, lo - 1, -1)
+            else:
+                if cursor is not None:
+                    lo = max(lo, bisect.bisect_right(keys, cursor))
+                positions = range(lo, hi)
+
+            items = []
+            last_key = next_cursor = None
+            for i in positions:
+                record_id = keys[i][2]
+                if not all(record_id in ids for ids in id_sets):
+                    continue
+                if len(items) == limit:
+                    next_cursor = last_key
+                    break
+                items.append(self._public[record_id])
+                last_key = keys[i]
+            return items, next_cursor, total_count, exact
+
+    def reference_count(self, sha256):
+        """Number of live records pointing at a stored blob"""
+        with self._lock:
+            self._refresh()
+            return len(self._indexes["sha256"].get(sha256, {}))
+
+    def referenced_hashes(self):
+        """Set of blob digests used by at least one live record"""
+        with self._lock:
+            self._refresh()
+            return {sha256 for sha256, ids in self._indexes["sha256"].items() if sha256 and ids}
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._records)
+
+
+upload_log = UploadLog(mock_path('uploads.jsonl'), legacy_path=mock_path('uploads.json'))
@@ -0,0 +1,279 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from backend.utils.file_inspect import InspectionError, StageTimeout, run_stage
+from backend.utils.upload_log import upload_log
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+READY = 'ready'
+FAILED = 'failed'
+
+# Stages run in order; each one's fields are merged into the upload record
+PIPELINE = ('checksum', 'sniff', 'page_count', 'text')
+RESULT_FIELDS = ('checksum_verified', 'mime_type', 'page_count', 'text_length', 'text_excerpt', 'processing_error')
+
+DEFAULT_WORKERS = min(2, os.cpu_count() or 1)
+# Uploads waiting for a worker; beyond this they stay pending for run/process_uploads.py
+DEFAULT_QUEUE_DEPTH = 256
+DEFAULT_STAGE_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+# Seconds before retry n is n * RETRY_BACKOFF
+RETRY_BACKOFF = 0.5
+# How much longer than a stage's own limit to wait before presuming its worker stuck
+TIMEOUT_GRACE = 5.0
+# Seconds a terminated worker gets to exit before it is killed
+WORKER_EXIT_TIMEOUT = 2.0
+
+
+class StageFailed(Exception):
+    """A stage kept failing for reasons other than the file itself"""
+
+
+class UploadProcessor:
+    """
+    Background post-processing of uploads on a bounded process pool
+
+    Uploads are recorded with status 'pending' and queued here; the request
+    returns straight away. One coordinator thread per pool worker takes an
+    upload and runs PIPELINE stage by stage in the pool (checksums and
+    document parsing are CPU-bound, so threads would hold the GIL), giving
+    each stage ``stage_timeout`` seconds and ``retries`` more attempts after
+    a timeout or crash. An InspectionError (corrupt or mislabelled file)
+    fails the upload at once. The outcome is appended to the upload log as
+    a new version of the record with status 'ready' or 'failed'.
+
+    A re-upload of content that is already 'ready' under the same type
+    reuses those results without queueing anything.
+    """
+
+    def __init__(self, log=upload_log, workers=DEFAULT_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH,
+                 stage_timeout=DEFAULT_STAGE_TIMEOUT, retries=DEFAULT_RETRIES, enabled=True):
+        self.log = log
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.configure(workers, queue_depth, stage_timeout, retries, enabled)
+
+    def configure(self, workers=DEFAULT_WORKERS, queue_depth=DEFAULT_QUEUE_DEPTH,
+                  stage_timeout=DEFAULT_STAGE_TIMEOUT, retries=DEFAULT_RETRIES, enabled=True):
+        with self._lock:
+            self.workers = workers
+            self.queue_depth = queue_depth
+            self.stage_timeout = stage_timeout
+            self.retries = retries
+            self.enabled = enabled
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
+            self.queued = 0
+            self.dropped = 0
+            self.reused = 0
+            self.ready = 0
+            self.failed = 0
+            self.retried = 0
+            self.timeouts = 0
+
+    def _new_executor(self):
+        # forkserver children start clean instead of copying a threaded server
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('forkserver'))
+
+    def _ensure_started(self):
+        # Pools and threads do not survive fork, so each pre-fork worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.queue_depth)
+            self._executor = self._new_executor()
+            for i in range(self.workers):
+                threading.Thread(target=self._run, name=f'upload-processing-{i}', daemon=True).start()
+            self._pid = os.getpid()
+
+    def _replace_executor(self, failed):
+        with self._lock:
+            if self._executor is not failed:
+                # Another thread already replaced it
+                return
+            self._executor = self._new_executor()
+        # shutdown() alone would leave a hung worker running forever, so the
+        # old pool's processes are terminated; jobs still running on it fail
+        # with BrokenProcessPool and are retried on the new pool
+        processes = list((failed._processes or {}).values())
+        failed.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(WORKER_EXIT_TIMEOUT)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+
+    def enqueue(self, record):
+        """
+        Schedule processing for a newly recorded upload
+
+        Returns:
+            str: The record's status now ('pending', or 'ready' if results were reused)
+        """
+        if not self.enabled:
+            return PENDING
+        if self._reuse(record):
+            return READY
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record["id"])
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Processing queue full; upload {record['id']} left pending")
+            return PENDING
+        self.queued += 1
+        return PENDING
+
+    def _reuse(self, record):
+        for other in self.log.find('sha256', record.get('sha256')):
+            if other["id"] != record["id"] and other.get('status') == READY and other.get('file_type') == record.get('file_type'):
+                results = {field: other[field] for field in RESULT_FIELDS if field in other}
+                self.reused += 1
+                return self._finish(record["id"], READY, results) is not None
+        return False
+
+    def _run(self):
+        while True:
+            record_id = self._queue.get()
+            try:
+                self.process(record_id)
+            except Exception as e:
+                logger.error(f"Processing upload {record_id} failed unexpectedly: {str(e)}")
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+
+    def process(self, record_id):
+        """
+        Run the pipeline for one pending upload and record the outcome
+
+        Returns:
+            str: 'ready' or 'failed', or None if the upload is gone or not pending
+        """
+        record = self.log.get(record_id)
+        if record is None or record.get('status') != PENDING:
+            return None
+        self._ensure_started()
+        # Workers only need what the stages read
+        job = {field: record.get(field) for field in ('id', 'sha256', 'file_type')}
+        path = record.get('file_path')
+
+        results = {}
+        try:
+            if not path or not os.path.isfile(path):
+                raise InspectionError("Stored file is missing")
+            for stage in PIPELINE:
+                results.update(self._run_stage(stage, path, job))
+        except (InspectionError, StageFailed) as e:
+            logger.warning(f"Upload {record_id} failed processing: {str(e)}")
+            return self._finish(record_id, FAILED, dict(results, processing_error=str(e)))
+        return self._finish(record_id, READY, results)
+
+    def _run_stage(self, stage, path, job):
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                time.sleep(RETRY_BACKOFF * attempt)
+            try:
+                executor = self._executor
+                future = executor.submit(run_stage, stage, path, job, self.stage_timeout)
+                return future.result(timeout=self.stage_timeout + TIMEOUT_GRACE)
+            except InspectionError:
+                raise
+            except StageTimeout:
+                self.timeouts += 1
+                error = f"{stage} timed out after {self.stage_timeout}s"
+            except FutureTimeoutError:
+                # Hung where the worker's timer cannot reach (e.g. in C code)
+                self.timeouts += 1
+                error = f"{stage} worker hung"
+                self._replace_executor(executor)
+            except BrokenProcessPool:
+                error = f"{stage} worker crashed"
+                self._replace_executor(executor)
+            except Exception as e:
+                error = f"{stage} failed: {str(e)}"
+            logger.warning(f"Upload {job['id']}: {error} (attempt {attempt + 1} of {self.retries + 1})")
+        raise StageFailed(error)
+
+    def _finish(self, record_id, status, results):
+        # Re-read so the new version starts from the latest record
+        current = self.log.get(record_id)
+        if current is None:
+            return None
+        record = {field: value for field, value in current.items() if field not in RESULT_FIELDS}
+        record.update(results, status=status, processed_at=datetime.now().isoformat(timespec='seconds'))
+        self.log.append(record)
+        if status == READY:
+            self.ready += 1
+        else:
+            self.failed += 1
+        return status
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "stage_timeout": self.stage_timeout,
+            "retries": self.retries,
+            "waiting": self._queue.qsize() if self._pid == os.getpid() else 0,
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "reused": self.reused,
+            "ready": self.ready,
+            "failed": self.failed,
+            "retried": self.retried,
+            "timeouts": self.timeouts
+        }
+
+
+upload_processor = UploadProcessor()
+
+
+def init_upload_processing(app):
+    """
+    Configure upload post-processing from the app config or environment
+
+    UPLOAD_PROCESSING in the app config or MUVHR_UPLOAD_PROCESSING=0 in the
+    environment turns it off (uploads stay pending), PROCESSING_WORKERS / MUVHR_PROCESSING_WORKERS sets the pool
+    size, PROCESSING_QUEUE_DEPTH / MUVHR_PROCESSING_QUEUE_DEPTH the uploads
+    that may wait, PROCESSING_STAGE_TIMEOUT / MUVHR_PROCESSING_STAGE_TIMEOUT
+    the seconds per stage and PROCESSING_RETRIES / MUVHR_PROCESSING_RETRIES
+    the extra attempts after a timeout or crash.
+    """
+    enabled = app.config.get('UPLOAD_PROCESSING', os.environ.get('MUVHR_UPLOAD_PROCESSING', '1') not in ('0', 'false', 'no'))
+    workers = app.config.get('PROCESSING_WORKERS', os.environ.get('MUVHR_PROCESSING_WORKERS', DEFAULT_WORKERS))
+    depth = app.config.get('PROCESSING_QUEUE_DEPTH', os.environ.get('MUVHR_PROCESSING_QUEUE_DEPTH', DEFAULT_QUEUE_DEPTH))
+    timeout = app.config.get('PROCESSING_STAGE_TIMEOUT', os.environ.get('MUVHR_PROCESSING_STAGE_TIMEOUT', DEFAULT_STAGE_TIMEOUT))
+    retries = app.config.get('PROCESSING_RETRIES', os.environ.get('MUVHR_PROCESSING_RETRIES', DEFAULT_RETRIES))
+    upload_processor.configure(
+        workers=int(workers),
+        queue_depth=int(depth),
+        stage_timeout=float(timeout),
+        retries=int(retries),
+        enabled=bool(enabled)
+    )
+    app.extensions['upload_processor'] = upload_processor
+    logger.info(f"Upload processing: {'on' if upload_processor.enabled else 'off'}, {int(workers)} workers, {float(timeout)}s per stage")
+    return upload_processor
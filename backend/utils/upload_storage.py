@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from backend.utils.doc_store import atomic_write
+
+# Size of the pieces copied from the request stream to disk
+COPY_BUFFER_SIZE = 64 * 1024
+# Chunk size handed out to clients of the resumable protocol
+RESUMABLE_CHUNK_SIZE = 1024 * 1024
+# Unfinished resumable sessions older than this are removed
+SESSION_MAX_AGE = 24 * 60 * 60
+
+_SESSION_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class FileTooLargeError(Exception):
+    """Raised as soon as an upload grows past the configured size limit"""
+
+    def __init__(self, max_size):
+        super().__init__(f"File exceeds maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class UploadSessionError(Exception):
+    """Raised for invalid or unknown resumable upload sessions"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def stream_to_file(source, dest_path, max_size, buffer_size=COPY_BUFFER_SIZE):
+    """
+    Copy a stream to disk in fixed-size pieces, hashing while writing
+
+    The destination is written under a temporary name and renamed into place
+    only when the copy completes; nothing is left behind on failure.
+
+    Args:
+        source: File-like object with a read(size) method
+        dest_path (str): Final path of the stored file
+        max_size (int): Abort with FileTooLargeError once more bytes arrive
+
+    Returns:
+        tuple: (size in bytes, SHA-256 hex digest)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, 'wb') as out:
+            while True:
+                block = source.read(buffer_size)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_size:
+                    raise FileTooLargeError(max_size)
+                digest.update(block)
+                out.write(block)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size, digest.hexdigest()
+
+
+class ResumableUploads:
+    """
+    Chunk-indexed resumable upload sessions stored on disk
+
+    Each session is a directory holding ``session.json`` (written once at
+    init) and one file per received chunk. Chunks are written to a temporary
+    name and renamed, so an interrupted transfer never counts as received and
+    any worker can accept any chunk. Finalizing concatenates the chunks in
+    order into the destination file while hashing.
+    """
+
+    def __init__(self, root, max_size, chunk_size=RESUMABLE_CHUNK_SIZE, max_age=SESSION_MAX_AGE):
+        self.root = root
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.max_age = max_age
+
+    def _session_dir(self, upload_id):
+        if not _SESSION_ID_RE.match(upload_id or ''):
+            raise UploadSessionError("Upload session not found", 404)
+        return os.path.join(self.root, upload_id)
+
+    def _chunk_path(self, upload_id, index):
+        return os.path.join(self._session_dir(upload_id), f"{index:06d}.chunk")
+
+    def create(self, metadata, total_size=None):
+        """Start a session; returns its descriptor including the upload_id"""
+        if total_size is not None:
+            if total_size <= 0:
+                raise UploadSessionError("Empty file not allowed")
+            if total_size > self.max_size:
+                raise FileTooLargeError(self.max_size)
+
+        self.purge_stale()
+        upload_id = uuid.uuid4().hex
+        session = {
+            "upload_id": upload_id,
+            "chunk_size": self.chunk_size,
+            "total_size": total_size,
+            "total_chunks": -(-total_size // self.chunk_size) if total_size else None,
+            "created_at": time.time(),
+            "metadata": metadata
+        }
+        path = os.path.join(self.root, upload_id)
+        os.makedirs(path)
+        atomic_write(os.path.join(path, 'session.json'), json.dumps(session))
+        return session
+
+    def load(self, upload_id):
+        """Return a session descriptor, raising UploadSessionError if unknown"""
+        try:
+            with open(os.path.join(self._session_dir(upload_id), 'session.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadSessionError("Upload session not found", 404)
+
+    def received_chunks(self, upload_id):
+        """Sorted list of chunk indexes stored for a session"""
+        names = os.listdir(self._session_dir(upload_id))
+        return sorted(int(name.split('.', 1)[0]) for name in names if name.endswith('.chunk'))
+
+    def put_chunk(self, upload_id, index, source):
+        """Store one chunk; re-sending a chunk replaces the previous copy"""
+        session = self.load(upload_id)
+        if index < 0 or (session["total_chunks"] is not None and index >= session["total_chunks"]):
+            raise UploadSessionError("Chunk index out of range")
+        if index * session["chunk_size"] >= self.max_size:
+            raise FileTooLargeError(self.max_size)
+
+        size, _ = stream_to_file(source, self._chunk_path(upload_id, index), session["chunk_size"])
+        if size == 0:
+            os.remove(self._chunk_path(upload_id, index))
+            raise UploadSessionError("Empty chunk")
+        return size
+
+    def finalize(self, upload_id, dest_path):
+        """
+        Assemble a session's chunks into dest_path
+
+        The session is kept, so a rejected result (a checksum mismatch) can be
+        fixed by re-sending chunks; the caller discards it once accepted.
+
+        Returns:
+            tuple: (session descriptor, size in bytes, SHA-256 hex digest)
+        """
+        session = self.load(upload_id)
+        chunks = self.received_chunks(upload_id)
+        expected = session["total_chunks"] or (chunks[-1] + 1 if chunks else 0)
+        missing = sorted(set(range(expected)) - set(chunks))
+        if not chunks or missing:
+            raise UploadSessionError(f"Missing chunks: {missing}", 409)
+
+        # Every chunk but the last must be full, or offsets would be wrong
+        for index in chunks[:-1]:
+            if os.path.getsize(self._chunk_path(upload_id, index)) != session["chunk_size"]:
+                raise UploadSessionError(f"Chunk {index} is incomplete", 409)
+
+        with _ChunkReader([self._chunk_path(upload_id, index) for index in chunks]) as reader:
+            size, sha256 = stream_to_file(reader, dest_path, self.max_size)
+
+        if session["total_size"] is not None and size != session["total_size"]:
+            os.remove(dest_path)
+            raise UploadSessionError("Assembled size does not match declared total_size", 409)
+
+        return session, size, sha256
+
+    def discard(self, upload_id):
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+
+    def purge_stale(self):
+        """Remove sessions that were never finalized"""
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root, exist_ok=True)
+            return
+        cutoff = time.time() - self.max_age
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if _SESSION_ID_RE.match(name) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+class _ChunkReader:
+    """Read a sequence of chunk files as one stream"""
+
+    def __init__(self, paths):
+        self._paths = list(paths)
+        self._current = None
+
+    def read(self, size):
+        while True:
+            if self._current is None:
+                if not self._paths:
+                    return b''
+                self._current = open(self._paths.pop(0), 'rb')
+            block = self._current.read(size)
+            if block:
+                return block
+            self._current.close()
+            self._current = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._current is not None:
+            self._current.close()
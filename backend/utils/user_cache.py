@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+# Longest time a role changed by another process can still be served
+DEFAULT_TTL = 30.0
+
+
+class CachedUser(UserMixin):
+    """Lightweight, detached stand-in for a User row in the session user slot"""
+
+    __slots__ = ('id', 'username', 'role')
+
+    def __init__(self, id, username, role):
+        self.id = id
+        self.username = username
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.role)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'role': self.role
+        }
+
+
+class UserCache:
+    """
+    Bounded LRU cache of CachedUser records with a time-to-live
+
+    Entries expire ``ttl`` seconds after they were loaded, which bounds how
+    long a role changed elsewhere can be served. Changes made through this
+    process invalidate the entry immediately (see invalidate).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def configure(self, max_entries=None, ttl=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if ttl is not None:
+                self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, user_id, loader):
+        """
+        Return the cached user for an id, calling loader(user_id) on a miss
+
+        Args:
+            user_id (int): User primary key
+            loader (callable): Returns a User (or None) from the database
+
+        Returns:
+            CachedUser or None
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[user_id]
+                self.expired += 1
+            self.misses += 1
+
+        # Load outside the lock so a slow query does not block other lookups
+        user = loader(user_id)
+        if user is None:
+            return None
+        return self.put(user)
+
+    def put(self, user):
+        """Cache a fresh copy of a user (a User row or CachedUser)"""
+        cached = CachedUser.from_user(user)
+        with self._lock:
+            self._entries[cached.id] = (self._clock() + self.ttl, cached)
+            self._entries.move_to_end(cached.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return cached
+
+    def invalidate(self, user_id=None):
+        """Drop one user, or everything when user_id is None"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+user_cache = UserCache()
+
+
+def init_user_cache(app, user_model):
+    """
+    Size the user cache from config and keep it in step with User updates
+
+    USER_CACHE_TTL / USER_CACHE_SIZE in the app config, or the
+    MUVHR_USER_CACHE_TTL / MUVHR_USER_CACHE_SIZE environment variables,
+    override the defaults. A TTL of 0 disables caching.
+    """
+    ttl = app.config.get('USER_CACHE_TTL', os.environ.get('MUVHR_USER_CACHE_TTL', DEFAULT_TTL))
+    size = app.config.get('USER_CACHE_SIZE', os.environ.get('MUVHR_USER_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+    user_cache.configure(max_entries=int(size), ttl=float(ttl))
+
+    # Role or username edits made through the ORM take effect on the next request
+    @event.listens_for(user_model, 'after_update')
+    @event.listens_for(user_model, 'after_delete')
+    def _invalidate_user(mapper, connection, target):
+        user_cache.invalidate(target.id)
+
+    app.extensions['user_cache'] = user_cache
+    logger.info(f"User cache: {int(size)} entries, {float(ttl)}s TTL")
+    return user_cache
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Demo: concurrent readers against a busy writer, rollback journal vs WAL
+
+A writer thread commits small transactions back to back while reader
+threads run indexed lookups. With the rollback journal every commit locks
+readers out (they wait on busy_timeout or fail with "database is locked");
+with the pragmas from backend/db.py readers keep going at full speed.
+
+    python bench/bench_db_concurrency.py [--readers 4] [--seconds 3]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from backend.db import SQLITE_PRAGMAS, install_sqlite_pragmas
+
+# The pre-change defaults: rollback journal, full sync, readers give up at once
+LEGACY_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 0}
+
+ROWS = 10000
+
+def make_engine(path, pragmas, readers):
+    engine = create_engine(f"sqlite:///{path}", pool_size=readers + 1, max_overflow=0)
+    install_sqlite_pragmas(engine, pragmas)
+    return engine
+
+def setup(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE contracts (id INTEGER PRIMARY KEY, name TEXT, expiry TEXT)"))
+        conn.execute(text("CREATE INDEX ix_contracts_expiry ON contracts (expiry)"))
+        conn.execute(
+            text("INSERT INTO contracts (name, expiry) VALUES (:name, :expiry)"),
+            [{"name": f"Contractor {i}", "expiry": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"} for i in range(ROWS)]
+        )
+
+def writer(engine, stop, counts):
+    i = 0
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("UPDATE contracts SET name = :name WHERE id = :id"),
+                             {"name": f"Renamed {i}", "id": i % ROWS + 1})
+            counts["writes"] += 1
+        except OperationalError:
+            counts["write_errors"] += 1
+        i += 1
+
+def reader(engine, stop, latencies, errors):
+    with engine.connect() as conn:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                conn.execute(text("SELECT count(*) FROM contracts WHERE expiry BETWEEN '2025-03-01' AND '2025-03-31'")).scalar()
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors.append(1)
+            conn.rollback()
+
+def run(label, pragmas, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, 'demo.db'), pragmas, readers)
+        setup(engine)
+        stop = threading.Event()
+        counts = {"writes": 0, "write_errors": 0}
+        latencies, errors = [], []
+        threads = [threading.Thread(target=writer, args=(engine, stop, counts))]
+        threads += [threading.Thread(target=reader, args=(engine, stop, latencies, errors)) for _ in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    reads = len(latencies)
+    ms = sorted(l * 1000 for l in latencies) or [0.0]
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{label:<16} {reads / seconds:>9.0f} {len(errors):>9} {statistics.median(ms):>8.2f} {p99:>8.2f} {ms[-1]:>8.2f} {counts['writes'] / seconds:>9.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'reads/s':>9} {'locked':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'writes/s':>9}")
+    run("rollback journal", LEGACY_PRAGMAS, args.readers, args.seconds)
+    run("WAL (db.py)", SQLITE_PRAGMAS, args.readers, args.seconds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-request cost of the /metrics instrumentation
+
+Serves the same two routes (a small JSON response, and one that runs a
+SQLite query) from a bare Flask app and from one with init_metrics
+applied, and reports the added time per request. Each side takes the best
+of several rounds to keep scheduler noise out of the comparison.
+
+    python bench/bench_metrics.py [--requests 5000] [--rounds 7]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+from backend.utils.metrics import init_metrics, metrics
+
+def make_app(engine):
+    app = Flask(__name__)
+
+    @app.route("/ping")
+    def ping():
+        return jsonify({"success": True})
+
+    @app.route("/query")
+    def query():
+        with engine.connect() as conn:
+            value = conn.execute(text("SELECT 1")).scalar()
+        return jsonify({"value": value, "success": True})
+
+    return app
+
+def measure(app, path, requests, rounds):
+    client = app.test_client()
+    for _ in range(200):
+        client.get(path)
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(path)
+        per_request = (time.perf_counter() - start) / requests
+        best = per_request if best is None else min(best, per_request)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    paths = ("/ping", "/query")
+
+    # The query listeners are engine-wide, so measure the bare app first
+    plain = make_app(engine)
+    baseline = {path: measure(plain, path, args.requests, args.rounds) for path in paths}
+
+    instrumented = make_app(engine)
+    init_metrics(instrumented)
+    with_metrics = {path: measure(instrumented, path, args.requests, args.rounds) for path in paths}
+
+    print(f"{'route':<8} {'bare':>10} {'metrics':>10} {'added':>10} {'overhead':>9}")
+    for path in paths:
+        added = with_metrics[path] - baseline[path]
+        print(f"{path:<8} {baseline[path] * 1e6:>8.1f}us {with_metrics[path] * 1e6:>8.1f}us "
+              f"{added * 1e6:>8.1f}us {added / baseline[path]:>8.1%}")
+
+    start = time.perf_counter()
+    rendered = metrics.render()
+    print(f"render: {(time.perf_counter() - start) * 1e3:.2f} ms for {len(rendered.splitlines())} lines")
+
+if __name__ == '__main__':
+    main()
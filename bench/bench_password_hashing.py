@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: password verifications per second at each bcrypt cost
+
+Reports single-thread verifications per second (one core) and the
+throughput of the bounded hasher with all its workers busy.
+
+    python bench/bench_password_hashing.py [--rounds 10 11 12 13] [--seconds 3] [--workers N]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask_bcrypt import check_password_hash, generate_password_hash
+from backend.utils.password_hasher import PasswordHasher, DEFAULT_WORKERS
+
+PASSWORD = "muvon123"
+
+def single_thread_rate(password_hash, seconds):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        check_password_hash(password_hash, PASSWORD)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def pool_rate(password_hash, seconds, workers):
+    """Drive the hasher from as many client threads as it has workers"""
+    hasher = PasswordHasher(workers=workers, queue_depth=workers)
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        done = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(password_hash, PASSWORD)
+            done += 1
+        return done
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as clients:
+        total = sum(clients.map(lambda _: client(), range(workers)))
+    return total / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    print(f"{'cost':>4}  {'ms/verify':>9}  {'logins/s/core':>13}  {f'bounded ({args.workers} workers)':>18}")
+    for rounds in args.rounds:
+        password_hash = generate_password_hash(PASSWORD, rounds).decode('utf-8')
+        per_core = single_thread_rate(password_hash, args.seconds)
+        pooled = pool_rate(password_hash, args.seconds, args.workers)
+        print(f"{rounds:>4}  {1000 / per_core:>9.1f}  {per_core:>13.1f}  {pooled:>18.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: search index build, query and incremental-update latency
+
+Indexes synthetic resources and upload records (titles and descriptions
+drawn from a Zipf-weighted vocabulary, categories, filenames with a
+per-document code, uploaders), then reports the mean number of matches and
+p50/p99 latency for several query shapes, each run uncached as a random
+role so the allowed_roles filter applies, a repeated query served from the
+result cache, the same query shapes with the cache on while an upload is
+indexed before every query, and the cost of indexing one new upload.
+
+    python bench/bench_search.py [--documents 100000] [--queries 2000]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import time
+from backend.utils.search_index import RESULT_CACHE_SIZE, SearchIndex, canonical_roles
+from backend.utils.upload_log import project_public
+
+WORDS = (
+    "policy handbook benefits salary onboarding security architecture budget quarterly review "
+    "report marketing campaign template training guide compliance contract vendor payroll "
+    "expense travel leave holiday engineering design roadmap release incident audit"
+).split()
+SYLLABLES = ("ka", "lo", "mi", "ra", "te", "su", "no", "vi", "de", "pa", "ri", "zu", "be", "go")
+CATEGORIES = ("policy", "finance", "engineering", "marketing", "hr", "legal")
+ROLES = ("admin", "hr", "manager", "engineer", "marketing", "intern")
+
+# (label, query) pairs covering the common shapes
+QUERIES = (
+    ("rare exact", "doc{n}"),
+    ("two terms", "quarterly budget"),
+    ("prefix", "onboard"),
+    ("prefix + term", "secu handbook"),
+    ("three terms", "travel expense policy"),
+    ("broad", "pdf")
+)
+
+def make_vocabulary(rng, size):
+    """
+    Words with Zipf-like weights, as in real text
+
+    Made-up words take the most frequent ranks (the "stop words") and the
+    long tail; the fixed words sit just below the top, so the queries on
+    them are common but not universal.
+    """
+    made_up = set()
+    while len(made_up) < size - len(WORDS):
+        made_up.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))))
+    made_up = sorted(made_up)
+    rng.shuffle(made_up)
+    words = made_up[:20] + list(WORDS) + made_up[20:]
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+def make_record(rng, i, vocabulary):
+    words, weights = vocabulary
+    title = ' '.join(rng.choices(words, weights, k=3)).title()
+    return {
+        "id": f"D-{i}",
+        "title": title,
+        "description": ' '.join(rng.choices(words, weights, k=8)),
+        "category": rng.choice(CATEGORIES),
+        "original_filename": f"{title.lower().replace(' ', '-')}-doc{i}.{rng.choice(('pdf', 'docx', 'xlsx'))}",
+        "uploaded_by": rng.choice(ROLES),
+        "allowed_roles": rng.sample(ROLES, rng.randint(1, len(ROLES)))
+    }
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000, help="Queries per shape")
+    parser.add_argument('--vocabulary', type=int, default=5000, help="Distinct words in titles and descriptions")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    records = [make_record(rng, i, vocabulary) for i in range(args.documents)]
+    # Uncached, so every query below is ranked from the postings
+    index = SearchIndex(result_cache_size=0)
+
+    start = time.perf_counter()
+    for record in records:
+        if int(record["id"][2:]) % 2:
+            index.upsert('upload', record["id"], record, public=project_public(record))
+        else:
+            # Resources carry the filename field under its own name
+            resource = dict(record, filename=record["original_filename"])
+            index.upsert('resource', record["id"], resource, roles=canonical_roles(record["allowed_roles"]))
+    build = time.perf_counter() - start
+    print(f"indexed {len(index)} documents, {index.stats()['tokens']} tokens in {build:.2f}s")
+
+    print(f"{'query':<16} {'matches':>8} {'p50':>9} {'p99':>9}")
+    for label, template in QUERIES:
+        timings = []
+        matches = 0
+        for _ in range(args.queries):
+            query = template.format(n=rng.randrange(args.documents))
+            role = rng.choice(ROLES)
+            t0 = time.perf_counter()
+            _, total_count = index.search(query, role=role)
+            timings.append(time.perf_counter() - t0)
+            matches += total_count
+        print(f"{label:<16} {matches // args.queries:>8} {percentile(timings, 0.5) * 1e3:>7.3f}ms {percentile(timings, 0.99) * 1e3:>7.3f}ms")
+
+    # A repeated query between changes is answered from the result cache
+    index.result_cache_size = RESULT_CACHE_SIZE
+    timings = []
+    for _ in range(args.queries):
+        t0 = time.perf_counter()
+        index.search("pdf", role="hr")
+        timings.append(time.perf_counter() - t0)
+    print(f"{'broad, cached':<16} {'':>8} {percentile(timings, 0.5) * 1e3:>7.3f}ms {percentile(timings, 0.99) * 1e3:>7.3f}ms")
+
+    # Steady upload traffic only invalidates the cached queries it could match
+    print(f"{'with uploads':<16} {'hit rate':>8}")
+    next_id = args.documents
+    for label, template in QUERIES:
+        timings = []
+        hits = 0
+        for _ in range(args.queries):
+            record = make_record(rng, next_id, vocabulary)
+            next_id += 1
+            index.upsert('upload', record["id"], record, public=project_public(record))
+            query = template.format(n=rng.randrange(args.documents))
+            hits_before = index.cache_hits
+            t0 = time.perf_counter()
+            index.search(query, role=rng.choice(ROLES))
+            timings.append(time.perf_counter() - t0)
+            hits += index.cache_hits - hits_before
+        print(f"{label:<16} {hits / args.queries:>8.0%} {percentile(timings, 0.5) * 1e3:>7.3f}ms {percentile(timings, 0.99) * 1e3:>7.3f}ms")
+
+    timings = []
+    for i in range(next_id, next_id + args.queries):
+        record = make_record(rng, i, vocabulary)
+        t0 = time.perf_counter()
+        index.upsert('upload', record["id"], record, public=project_public(record))
+        timings.append(time.perf_counter() - t0)
+    print(f"{'index 1 upload':<16} {'':>8} {percentile(timings, 0.5) * 1e3:>7.3f}ms {percentile(timings, 0.99) * 1e3:>7.3f}ms")
+
+if __name__ == '__main__':
+    main()
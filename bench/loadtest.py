@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Load test: the dashboard flow against synthetic data, in-process or over HTTP
+
+Generates a dataset of contracts, onboarding staff and upload records at
+the chosen scale (cached under --data-dir and copied fresh for every run),
+then drives a weighted mix of the requests static/script.js makes from
+concurrent clients. Reports throughput, p50/p95/p99 latency per operation
+and peak RSS, and compares them with a stored baseline: any regression
+beyond --tolerance makes the run exit with status 1.
+
+    python bench/loadtest.py [--mode inprocess|server] [--scale 1k|10k|100k]
+                             [--concurrency 8] [--duration 20] [--workers 2]
+                             [--baseline bench/baseline.json] [--save-baseline]
+
+Only the local machine is involved: the server mode launches run/serve.py
+on a free loopback port.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import http.client
+import json
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from datetime import date, timedelta
+from io import BytesIO
+from urllib.parse import quote
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000}
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'muvhr-bench')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Allowed slowdown before a result counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# p95 changes smaller than this are scheduler noise, not regressions
+P95_NOISE_FLOOR_MS = 2.0
+
+FIRST_NAMES = ['Azril', 'Sharifah', 'Ahmad', 'Mei Ling', 'Ravi', 'Nurul', 'Daniel', 'Aisha', 'Kumar', 'Siti', 'Jason', 'Farah']
+LAST_NAMES = ['Rahman', 'Aminah', 'Hassan', 'Tan', 'Kumar', 'Ismail', 'Lee', 'Abdullah', 'Wong', 'Yusof', 'Lim', 'Ong']
+POSITIONS = ['Software Engineer', 'Project Manager', 'DevOps Engineer', 'UX Designer', 'Data Analyst', 'HR Executive', 'Marketing Specialist']
+TASK_NAMES = [
+    'Complete IT setup and security training',
+    'Review company handbook and policies',
+    'Meet with direct manager and team',
+    'Set up payroll and benefits',
+    'Finish first-week shadowing'
+]
+UPLOAD_CATEGORIES = ['policy', 'contract', 'report', 'training']
+UPLOAD_TYPES = ['pdf', 'docx', 'xlsx']
+
+
+# ----------------------------------------------------------------------
+# Synthetic data
+# ----------------------------------------------------------------------
+
+def dataset_dir(data_dir, scale, seed):
+    return os.path.join(data_dir, f"{scale}-seed{seed}")
+
+
+def app_environment(root):
+    """Environment pointing the app at a dataset directory"""
+    env = dict(os.environ)
+    env.update({
+        'MUVHR_DATABASE_URL': f"sqlite:///{os.path.join(root, 'muvhr.db')}",
+        'MUVHR_MOCK_DIR': os.path.join(root, 'mock'),
+        'MUVHR_UPLOAD_FOLDER': os.path.join(root, 'uploads'),
+        'MUVHR_ENV': 'production',
+        'PYTHONPATH': REPO_ROOT
+    })
+    return env
+
+
+def person_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def generate(root, count, seed):
+    """Write the mock documents and seed the database (run in a child process)"""
+    from sqlalchemy import insert
+    from backend.app import app
+    from backend.db import db, create_tables
+    from backend.models.contract import Contract
+    from backend.models.onboarding import Staff, OnboardingTask
+
+    rng = random.Random(seed)
+    today = date.today()
+    mock_dir = os.path.join(root, 'mock')
+
+    contracts = [
+        {
+            "id": f"C-{i:06d}",
+            "name": person_name(rng),
+            "position": rng.choice(POSITIONS),
+            "contract_expiry": (today + timedelta(days=rng.randint(-60, 720))).isoformat()
+        }
+        for i in range(1, count + 1)
+    ]
+    with open(os.path.join(mock_dir, 'contracts.json'), 'w') as f:
+        json.dump(contracts, f)
+    shutil.copy(os.path.join(REPO_ROOT, 'mock', 'resources.json'), mock_dir)
+    with open(os.path.join(mock_dir, 'onboarding.json'), 'w') as f:
+        json.dump([], f)
+
+    with open(os.path.join(mock_dir, 'uploads.jsonl'), 'w') as f:
+        for i in range(count):
+            uploaded = today - timedelta(days=rng.randint(0, 365))
+            file_type = rng.choice(UPLOAD_TYPES)
+            size = rng.randint(10_000, 5_000_000)
+            record = {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "title": f"Document {i}",
+                "original_filename": f"document_{i}.{file_type}",
+                "stored_filename": f"{i:064x}",
+                "category": rng.choice(UPLOAD_CATEGORIES),
+                "uploaded_by": rng.choice(['admin', 'hr', 'manager', 'engineer', 'marketing']),
+                "upload_date": uploaded.isoformat(),
+                "upload_time": f"{rng.randint(8, 18):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+                "file_size": f"{size / 1024:.1f} KB",
+                "size_bytes": size,
+                "sha256": f"{i:064x}",
+                "file_type": file_type,
+                "file_path": None,
+                "deduplicated": False
+            }
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    with app.app_context():
+        create_tables()
+        for start in range(0, count, 5000):
+            batch = contracts[start:start + 5000]
+            db.session.execute(insert(Contract), [
+                dict(c, contract_expiry=date.fromisoformat(c["contract_expiry"])) for c in batch
+            ])
+            staff = [
+                {
+                    "id": f"S{i:06d}",
+                    "name": person_name(rng),
+                    "position": rng.choice(POSITIONS),
+                    "start_date": today - timedelta(days=rng.randint(-30, 90))
+                }
+                for i in range(start + 1, start + len(batch) + 1)
+            ]
+            db.session.execute(insert(Staff), staff)
+            db.session.execute(insert(OnboardingTask), [
+                {"staff_id": member["id"], "task_index": index, "name": name, "completed": rng.random() < 0.5}
+                for member in staff
+                for index, name in enumerate(TASK_NAMES, start=1)
+            ])
+            db.session.commit()
+        Staff.refresh_progress()
+        db.session.commit()
+
+    with open(os.path.join(root, 'dataset.json'), 'w') as f:
+        json.dump({"count": count, "seed": seed}, f)
+
+
+def ensure_dataset(data_dir, scale, seed):
+    """Generate the dataset once per (scale, seed) and return its directory"""
+    root = dataset_dir(data_dir, scale, seed)
+    if os.path.exists(os.path.join(root, 'dataset.json')):
+        return root
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(os.path.join(root, 'mock'))
+    os.makedirs(os.path.join(root, 'uploads'))
+    print(f"Generating {scale} dataset in {root} ...", flush=True)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--generate', root, '--scale', scale, '--seed', str(seed)],
+        env=app_environment(root), check=True, stdout=subprocess.DEVNULL
+    )
+    print(f"Generated in {time.perf_counter() - start:.1f}s", flush=True)
+    return root
+
+
+def fresh_copy(root):
+    """Copy a dataset so writes during a run never leak into the next one"""
+    run_root = tempfile.mkdtemp(prefix='run-', dir=os.path.dirname(root))
+    shutil.rmtree(run_root)
+    shutil.copytree(root, run_root)
+    return run_root
+
+
+# ----------------------------------------------------------------------
+# Workload: the requests static/script.js makes, weighted
+# ----------------------------------------------------------------------
+
+ROLES = ('admin', 'hr', 'manager', 'engineer', 'marketing', 'intern')
+
+
+def sample_document(rng, file_type):
+    """
+    A small but valid PDF, DOCX or XLSX holding up to ~64 KiB of random words
+
+    Upload processing checks the content against the extension, so random
+    bytes would only exercise the failure path.
+    """
+    words = ' '.join(rng.choice(TASK_NAMES + POSITIONS) for _ in range(rng.randint(40, 2500)))
+    if file_type == 'pdf':
+        stream = f"BT ({words}) Tj ET".encode()
+        return (
+            b"%PDF-1.4\n1 0 obj << /Type /Page >> endobj\n"
+            b"2 0 obj << /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream +
+            b"\nendstream\nendobj\n%%EOF\n"
+        )
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        if file_type == 'docx':
+            archive.writestr('word/document.xml', f"<w:document><w:body><w:p><w:r><w:t>{words}</w:t></w:r></w:p></w:body></w:document>")
+            archive.writestr('docProps/app.xml', "<Properties><Pages>1</Pages></Properties>")
+        else:
+            archive.writestr('xl/workbook.xml', '<workbook><sheets><sheet name="Sheet1"/></sheets></workbook>')
+            archive.writestr('xl/sharedStrings.xml', f"<sst><si><t>{words}</t></si></sst>")
+    return buffer.getvalue()
+
+
+def multipart(fields, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+    )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+class Workload:
+    """Weighted request mix; each operation returns (method, path, body, headers)"""
+
+    def __init__(self, count):
+        self.count = count
+        # name: (weight, permission feature, builder)
+        self.operations = {
+            'dashboard': (10, None, self.dashboard),
+            'api_contractors': (12, 'contracts', self.api_contractors),
+            'contracts': (10, 'contracts', self.contracts),
+            'contracts_expiring': (5, 'contracts', self.contracts_expiring),
+            'resources': (15, 'resources', self.resources),
+            'onboarding': (3, 'onboarding', self.onboarding),
+            'onboarding_summary': (5, 'onboarding', self.onboarding_summary),
+            'onboarding_toggle': (10, 'onboarding-modify', self.onboarding_toggle),
+            'files': (15, 'uploads', self.files),
+            'upload': (5, 'uploads', self.upload)
+        }
+        self.names = list(self.operations)
+        self.weights = [self.operations[name][0] for name in self.names]
+
+    def roles_for(self, permissions):
+        """Roles allowed to run each operation, so every request should succeed"""
+        return {
+            name: [role for role in ROLES if feature is None or permissions.allows(role, feature)]
+            for name, (weight, feature, builder) in self.operations.items()
+        }
+
+    def dashboard(self, rng, role):
+        return 'GET', f'/api/dashboard/{role}', None, {}
+
+    def api_contractors(self, rng, role):
+        query = f'role={role}&limit=50'
+        if rng.random() < 0.3:
+            query += f'&name={quote(rng.choice(FIRST_NAMES))}'
+        return 'GET', f'/api/contractors/{role}?{query}', None, {}
+
+    def contracts(self, rng, role):
+        sort = rng.choice(['name', 'contract_expiry', 'position'])
+        return 'GET', f'/contracts?role={role}&limit=50&sort={sort}', None, {}
+
+    def contracts_expiring(self, rng, role):
+        return 'GET', f'/contracts/expiring?role={role}&window={rng.choice([7, 30, 90])}', None, {}
+
+    def resources(self, rng, role):
+        return 'GET', f'/resources?role={role}', None, {}
+
+    def onboarding(self, rng, role):
+        return 'GET', f'/onboarding?role={role}', None, {}
+
+    def onboarding_summary(self, rng, role):
+        return 'GET', f'/onboarding/summary?role={role}&limit=50', None, {}
+
+    def onboarding_toggle(self, rng, role):
+        staff_id = f'S{rng.randint(1, self.count):06d}'
+        body = json.dumps({"task_id": rng.randint(1, len(TASK_NAMES))}).encode()
+        return 'POST', f'/onboarding/{staff_id}/toggle?role={role}', body, {'Content-Type': 'application/json'}
+
+    def files(self, rng, role):
+        query = f'role={role}&limit=50&order=desc'
+        if rng.random() < 0.3:
+            query += f'&category={rng.choice(UPLOAD_CATEGORIES)}'
+        return 'GET', f'/files?{query}', None, {}
+
+    def upload(self, rng, role):
+        file_type = rng.choice(UPLOAD_TYPES)
+        body, headers = multipart(
+            {"title": "Load test upload", "category": rng.choice(UPLOAD_CATEGORIES), "uploaded_by": role},
+            f"loadtest.{file_type}", sample_document(rng, file_type)
+        )
+        return 'POST', f'/upload?role={role}', body, headers
+
+
+# ----------------------------------------------------------------------
+# Clients
+# ----------------------------------------------------------------------
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body, headers):
+        response = self.client.open(path, method=method, data=body, headers=headers)
+        size = len(response.get_data())
+        return response.status_code, size
+
+
+class HttpClient:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    def request(self, method, path, body, headers):
+        # The pre-fork server speaks HTTP/1.0: one request per connection
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, len(response.read())
+        finally:
+            connection.close()
+
+
+def drive(make_client, workload, roles, concurrency, duration, warmup, seed):
+    """Run the mix from ``concurrency`` threads; returns (samples, elapsed)"""
+    samples = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline = [None]
+
+    def run(index):
+        rng = random.Random(seed * 1000 + index)
+        try:
+            client = make_client()
+            for _ in range(warmup):
+                name = rng.choices(workload.names, workload.weights)[0]
+                try:
+                    client.request(*workload.operations[name][2](rng, rng.choice(roles[name])))
+                except (OSError, http.client.HTTPException):
+                    pass
+        except BaseException:
+            # Release the other clients and the main thread from the barrier
+            start_barrier.abort()
+            raise
+        try:
+            start_barrier.wait()
+        except threading.BrokenBarrierError:
+            # Another client failed; the main thread reports it
+            return
+        local = []
+        while time.perf_counter() < deadline[0]:
+            name = rng.choices(workload.names, workload.weights)[0]
+            request = workload.operations[name][2](rng, rng.choice(roles[name]))
+            started = time.perf_counter()
+            try:
+                status, size = client.request(*request)
+            except (OSError, http.client.HTTPException):
+                status, size = None, 0
+            local.append((name, time.perf_counter() - started, status, size))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    # Every client has finished warming up once the barrier trips
+    deadline[0] = time.perf_counter() + duration + 3600
+    try:
+        start_barrier.wait()
+    except threading.BrokenBarrierError:
+        raise RuntimeError("A client failed during warm-up")
+    started = time.perf_counter()
+    deadline[0] = started + duration
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+# ----------------------------------------------------------------------
+# Peak RSS
+# ----------------------------------------------------------------------
+
+def peak_rss_kb(pid='self'):
+    """High-water resident set size of a process (VmHWM), in KiB"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree(pid):
+    pids = [pid]
+    for pid in pids:
+        try:
+            for task in os.listdir(f'/proc/{pid}/task'):
+                with open(f'/proc/{pid}/task/{task}/children') as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+# ----------------------------------------------------------------------
+# Modes
+# ----------------------------------------------------------------------
+
+def run_inprocess(run_root, args, workload):
+    os.environ.update(app_environment(run_root))
+    import logging
+    from backend.app import app
+    from backend.server import warm_up
+    from backend.utils.permissions import permissions
+    # Handler output would dominate an in-process run; the server mode keeps it
+    logging.getLogger().setLevel(logging.WARNING)
+
+    warm_up(app)
+    samples, elapsed = drive(
+        lambda: InProcessClient(app), workload, workload.roles_for(permissions),
+        args.concurrency, args.duration, args.warmup, args.seed
+    )
+    rss = peak_rss_kb()
+    drain_background_work()
+    return samples, elapsed, rss
+
+
+def drain_background_work(timeout=60):
+    """Let queued upload processing and audit writes finish before the run directory goes"""
+    from backend.utils.access_audit import access_audit
+    from backend.utils.upload_processing import upload_processor
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = upload_processor.stats()
+        if stats["ready"] + stats["failed"] >= stats["queued"]:
+            break
+        time.sleep(0.1)
+    access_audit.flush()
+    stats = upload_processor.stats()
+    print(f"Upload processing: {stats['ready']} ready, {stats['failed']} failed of {stats['queued']} queued")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode} during start-up")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start listening in time")
+
+
+def run_server(run_root, args, workload):
+    from backend.utils.permissions import permissions
+
+    port = free_port()
+    env = app_environment(run_root)
+    env.update({
+        'MUVHR_HOST': '127.0.0.1',
+        'MUVHR_PORT': str(port),
+        'MUVHR_WORKERS': str(args.workers),
+        'MUVHR_THREADS': str(args.threads),
+        # Recycling mid-run would measure worker boot, not requests
+        'MUVHR_MAX_REQUESTS': '0'
+    })
+    log_path = os.path.join(run_root, 'server.log')
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(REPO_ROOT, 'run', 'serve.py')],
+            env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    try:
+        wait_for_port(port, process)
+        samples, elapsed = drive(
+            lambda: HttpClient('127.0.0.1', port), workload, workload.roles_for(permissions),
+            args.concurrency, args.duration, args.warmup, args.seed
+        )
+        rss = max(peak_rss_kb(pid) for pid in process_tree(process.pid))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return samples, elapsed, rss
+
+
+# ----------------------------------------------------------------------
+# Report and baseline
+# ----------------------------------------------------------------------
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed, rss_kb):
+    operations = {}
+    for name in sorted({sample[0] for sample in samples}):
+        latencies = sorted(sample[1] * 1000 for sample in samples if sample[0] == name)
+        errors = sum(1 for sample in samples if sample[0] == name and (sample[2] is None or sample[2] >= 400))
+        operations[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2)
+        }
+    latencies = sorted(sample[1] * 1000 for sample in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(op["errors"] for op in operations.values()),
+        "throughput": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+        "peak_rss_mb": round(rss_kb / 1024, 1),
+        "operations": operations
+    }
+
+
+def print_report(key, result):
+    print(f"\n{key}: {result['requests']} requests, {result['errors']} errors, "
+          f"{result['throughput']} req/s, peak RSS {result['peak_rss_mb']} MB")
+    print(f"{'operation':<20} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(result["operations"].items()) + [("all", result)]
+    for name, op in rows:
+        print(f"{name:<20} {op['requests']:>9} {op['errors']:>7} {op['p50']:>9.2f} {op['p95']:>9.2f} {op['p99']:>9.2f}")
+
+
+def compare(result, baseline, tolerance):
+    """Return a list of regression messages (empty when within tolerance)"""
+    problems = []
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        problems.append(f"throughput {result['throughput']} req/s < baseline {baseline['throughput']} req/s")
+    if result["errors"] > baseline.get("errors", 0):
+        problems.append(f"errors {result['errors']} > baseline {baseline.get('errors', 0)}")
+    for name, op in result["operations"].items():
+        base = baseline["operations"].get(name)
+        if base is None:
+            continue
+        limit = max(base["p95"] * (1 + tolerance), base["p95"] + P95_NOISE_FLOOR_MS)
+        if op["p95"] > limit:
+            problems.append(f"{name} p95 {op['p95']} ms > baseline {base['p95']} ms")
+    base_rss = baseline.get("peak_rss_mb")
+    if base_rss and result["peak_rss_mb"] > base_rss * (1 + tolerance):
+        problems.append(f"peak RSS {result['peak_rss_mb']} MB > baseline {base_rss} MB")
+    return problems
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mode', choices=('inprocess', 'server'), default='inprocess')
+    parser.add_argument('--scale', choices=tuple(SCALES), default='1k')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0, help="Measured seconds after warm-up")
+    parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per client")
+    parser.add_argument('--workers', type=int, default=2, help="Server mode: worker processes")
+    parser.add_argument('--threads', type=int, default=8, help="Server mode: threads per worker")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--generate', metavar='DIR', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        generate(args.generate, SCALES[args.scale], args.seed)
+        return
+
+    root = ensure_dataset(args.data_dir, args.scale, args.seed)
+    run_root = fresh_copy(root)
+    workload = Workload(SCALES[args.scale])
+    try:
+        if args.mode == 'server':
+            samples, elapsed, rss_kb = run_server(run_root, args, workload)
+        else:
+            samples, elapsed, rss_kb = run_inprocess(run_root, args, workload)
+    finally:
+        shutil.rmtree(run_root, ignore_errors=True)
+
+    key = f"{args.mode}/{args.scale}/c{args.concurrency}"
+    if args.mode == 'server':
+        key += f"/w{args.workers}t{args.threads}"
+    result = summarize(samples, elapsed, rss_kb)
+    print_report(key, result)
+
+    baselines = load_baselines(args.baseline)
+    if args.save_baseline:
+        baselines[key] = result
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nSaved baseline {key} to {args.baseline}")
+        return
+
+    if key not in baselines:
+        print(f"\nNo baseline for {key} in {args.baseline}; run with --save-baseline to record one")
+        sys.exit(2)
+    problems = compare(result, baselines[key], args.tolerance)
+    if problems:
+        print(f"\nREGRESSION against baseline {key} (tolerance {args.tolerance:.0%}):")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print(f"\nWithin {args.tolerance:.0%} of baseline {key}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Stress test: concurrent writers in several processes lose no updates
+
+Worker processes, each running several threads, increment a counter and
+append ids in one JSON document through JsonDocumentWriter, and append
+and overwrite records in an UploadLog whose compaction threshold is low
+enough to compact repeatedly while the others keep appending. The final
+files must hold every update; the run exits with status 1 otherwise.
+
+--naive runs the document part with the old open('w') + json.dump
+read-modify-write for comparison (expect lost updates or corrupt JSON).
+
+    python bench/stress_doc_store.py [--processes 4] [--threads 8] [--updates 50] [--naive]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+from backend.utils.doc_store import JsonDocumentWriter
+from backend.utils.upload_log import UploadLog
+
+def naive_update(path, mutate):
+    """The pre-change save: read, modify, truncate and rewrite in place"""
+    try:
+        with open(path) as f:
+            document = json.load(f)
+    except (FileNotFoundError, ValueError):
+        document = {}
+    mutate(document)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+def worker(index, directory, threads, updates, naive, results):
+    doc_path = os.path.join(directory, 'document.json')
+    writer = JsonDocumentWriter(doc_path, default=dict)
+    log = UploadLog(os.path.join(directory, 'uploads.jsonl'), compact_min_garbage=50)
+
+    def run(thread):
+        for i in range(updates):
+            tag = f"{index}-{thread}-{i}"
+
+            def mutate(document):
+                document["counter"] = document.get("counter", 0) + 1
+                document.setdefault("ids", []).append(tag)
+
+            if naive:
+                naive_update(doc_path, mutate)
+            else:
+                writer.update(mutate)
+
+            # Overwrite the same record a few times so compaction has garbage
+            record_id = f"{index}-{thread}-{i // 4}"
+            log.append({"id": record_id, "version": i % 4, "upload_date": "2025-01-01", "upload_time": "00:00:00"})
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put({"document": writer.stats(), "log": log._appender.stats()})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--updates', type=int, default=50, help="Updates per thread")
+    parser.add_argument('--naive', action='store_true', help="Use the old unlocked, non-atomic writer")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='muvhr-stress-')
+    results = multiprocessing.Queue()
+    start = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=worker, args=(i, directory, args.threads, args.updates, args.naive, results))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    expected = args.processes * args.threads * args.updates
+    failures = []
+    try:
+        with open(os.path.join(directory, 'document.json')) as f:
+            document = json.load(f)
+    except ValueError as e:
+        document = {}
+        failures.append(f"document.json is not valid JSON: {e}")
+    counter = document.get("counter", 0)
+    ids = set(document.get("ids", []))
+    if counter != expected or len(ids) != expected:
+        failures.append(f"document: {expected - counter} lost increments, {expected - len(ids)} lost ids")
+
+    log = UploadLog(os.path.join(directory, 'uploads.jsonl'))
+    # Each thread writes its records in order, so the last version wins
+    expected_records = {}
+    for p in range(args.processes):
+        for t in range(args.threads):
+            for i in range(args.updates):
+                expected_records[f"{p}-{t}-{i // 4}"] = i % 4
+    missing = [record_id for record_id in expected_records if log.get(record_id) is None]
+    stale = [
+        record_id for record_id, version in expected_records.items()
+        if log.get(record_id) is not None and log.get(record_id)["version"] != version
+    ]
+    if missing or stale:
+        failures.append(f"upload log: {len(missing)} records missing, {len(stale)} with a lost overwrite")
+    shutil.rmtree(directory, ignore_errors=True)
+
+    document_items = sum(s["document"]["items"] for s in stats)
+    document_batches = sum(s["document"]["batches"] for s in stats)
+    log_items = sum(s["log"]["items"] for s in stats)
+    log_batches = sum(s["log"]["batches"] for s in stats)
+    print(f"{args.processes} processes x {args.threads} threads x {args.updates} updates in {elapsed:.2f}s")
+    if not args.naive:
+        print(f"document: {document_items} updates in {document_batches} commits ({document_items / max(document_batches, 1):.1f} per fsync)")
+    print(f"upload log: {log_items} appends in {log_batches} writes ({log_items / max(log_batches, 1):.1f} per fsync)")
+    if failures:
+        for failure in failures:
+            print(f"FAIL {failure}")
+        sys.exit(1)
+    print(f"OK: {expected} document updates and {len(expected_records)} log records all present")
+
+if __name__ == '__main__':
+    main()
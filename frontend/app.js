@@ -617,7 +617,7 @@ function renderResourcesSection(resources, currentRole) {
 
 async function viewFile(filename, role) {
   try {
-    const res = await fetch(`http://localhost:8080/files/${filename}?role=${role}`);
+    const res = await fetch(`http://localhost:8080/files/${filename}?role=${role}&info=1`);
     const data = await res.json();
     
     if (res.ok) {
@@ -633,7 +633,7 @@ async function viewFile(filename, role) {
 
 async function downloadFile(filename, role) {
   try {
-    const res = await fetch(`http://localhost:8080/files/${filename}?role=${role}`);
+    const res = await fetch(`http://localhost:8080/files/${filename}?role=${role}&info=1`);
     const data = await res.json();
     
     if (res.ok) {
@@ -776,10 +776,33 @@ document.addEventListener('DOMContentLoaded', function() {
 
 // Archive Functions
 async function loadArchive() {
+  const currentRole = getCurrentRole();
+  
+  if (!currentRole) {
+    showNotification('error', 'Role Required', 'Please select your role first');
+    return;
+  }
+  
   try {
-    const res = await fetch('http://localhost:8080/files');
+    const res = await fetch(`http://localhost:8080/files?role=${currentRole}`);
     const data = await res.json();
-    renderArchiveSection(data.files);
+    
+    if (res.ok) {
+      renderArchiveSection(data.files);
+    } else {
+      console.error('Error loading archive:', data.error);
+      document.getElementById('archive-section').innerHTML = `
+        <div class="bg-white rounded-xl shadow-sm border border-gray-200 p-8 text-center">
+          <div class="w-16 h-16 bg-red-100 rounded-full flex items-center justify-center mx-auto mb-4">
+            <svg class="w-8 h-8 text-red-400" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+              <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-2.5L13.732 4c-.77-.833-1.964-.833-2.732 0L3.732 16.5c-.77.833.192 2.5 1.732 2.5z"></path>
+            </svg>
+          </div>
+          <h3 class="text-lg font-medium text-gray-900 mb-2">Access Denied</h3>
+          <p class="text-gray-600">${data.error}</p>
+        </div>
+      `;
+    }
   } catch (error) {
     console.error('Error loading archive:', error);
     document.getElementById('archive-section').innerHTML = `
@@ -926,8 +949,10 @@ function renderArchiveSection(files) {
 }
 
 async function downloadArchiveFile(fileId) {
+  const currentRole = getCurrentRole();
+  
   try {
-    const res = await fetch(`http://localhost:8080/files/download/${fileId}`);
+    const res = await fetch(`http://localhost:8080/files/download/${fileId}?role=${currentRole}&info=1`);
     const data = await res.json();
     
     if (res.ok) {
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from backend.routes.uploads import blob_store
+from backend.utils.blob_store import GC_GRACE_PERIOD
+from backend.utils.upload_log import upload_log
+
+def gc_blobs(grace_period=GC_GRACE_PERIOD, dry_run=False):
+    """Remove stored blobs that no upload record references anymore"""
+    referenced = upload_log.referenced_hashes()
+    result = blob_store.collect_garbage(referenced, grace_period=grace_period, dry_run=dry_run)
+    
+    action = "Would remove" if dry_run else "Removed"
+    print(f"{action} {result['removed']} unreferenced blobs "
+          f"({result['bytes_reclaimed']} bytes); {len(referenced)} blobs still referenced.")
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced upload blobs")
+    parser.add_argument('--dry-run', action='store_true', help="report without deleting")
+    parser.add_argument('--grace', type=float, default=GC_GRACE_PERIOD,
+                        help="keep blobs modified within this many seconds (default: %(default)s)")
+    args = parser.parse_args()
+    gc_blobs(grace_period=args.grace, dry_run=args.dry_run)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Bulk import contracts, staff or users from CSV or JSON-lines files
+
+    python run/import_records.py contracts export.csv
+    python run/import_records.py staff staff.jsonl --batch-size 5000 --insert-only
+    python run/import_records.py users users.csv --errors rejected.jsonl
+
+Input is streamed in batches, so memory use does not grow with file size.
+Rows are upserted by id (username for users) unless --insert-only is given,
+in which case existing rows are kept. Rejected rows are written with their
+line number and reason to <input>.errors.jsonl.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import resource
+from backend.db import create_tables
+from backend.app import app
+from backend.models.contract import Contract
+from backend.models.onboarding import Staff
+from backend.models.user import User
+from backend.utils.bulk_import import (
+    DEFAULT_BATCH_SIZE, BulkImporter, ErrorFile, ImportSpec, RowError, date_field, reader_for, text_field
+)
+from backend.utils.password_hasher import password_hasher
+from backend.utils.permissions import permissions
+
+def prepare_user(record):
+    """Canonicalize the role and hash a plaintext password if one is given"""
+    record = dict(record)
+    role = permissions.canonical_role((record.get('role') or '').strip())
+    if role is None:
+        raise RowError(f"role {record.get('role')!r} is not a known role")
+    record['role'] = role
+    if not record.get('password_hash'):
+        if not record.get('password'):
+            raise RowError("password or password_hash is required")
+        record['password_hash'] = password_hasher.hash(record['password'])
+    return record
+
+SPECS = {
+    'contracts': ImportSpec(Contract, 'id', {
+        'id': text_field(10),
+        'name': text_field(100),
+        'position': text_field(100),
+        'contract_expiry': date_field
+    }),
+    'staff': ImportSpec(Staff, 'id', {
+        'id': text_field(10),
+        'name': text_field(100),
+        'position': text_field(100),
+        'start_date': date_field
+    }),
+    'users': ImportSpec(User, 'username', {
+        'username': text_field(80),
+        'password_hash': text_field(128),
+        'role': text_field(50)
+    }, prepare=prepare_user)
+}
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def report_progress(importer):
+    print(f"  {importer.read:>10,} rows read, {importer.written:,} written, "
+          f"{importer.rejected:,} rejected", file=sys.stderr)
+
+def import_records(entity, path, input_format=None, batch_size=DEFAULT_BATCH_SIZE,
+                   upsert=True, errors_path=None, quiet=False):
+    """Stream a file into the table for entity and print a summary"""
+    errors = ErrorFile(errors_path or f"{path}.errors.jsonl")
+    importer = BulkImporter(
+        SPECS[entity], batch_size=batch_size, upsert=upsert, errors=errors,
+        progress=None if quiet else report_progress
+    )
+    with app.app_context():
+        create_tables()
+        try:
+            importer.run(reader_for(path, input_format)(path))
+        finally:
+            errors.close()
+
+    print(f"Imported {importer.written:,} of {importer.read:,} {entity} rows in {importer.elapsed:.2f}s "
+          f"({importer.rows_per_second:,.0f} rows/s, peak RSS {peak_rss_mb():.0f} MB)")
+    if importer.rejected:
+        print(f"{importer.rejected:,} rejected rows written to {errors.path}")
+    return importer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('entity', choices=sorted(SPECS))
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="default: from the file extension")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--insert-only', action='store_true', help="keep existing rows instead of updating them")
+    parser.add_argument('--errors', help="rejected rows file (default: <path>.errors.jsonl)")
+    parser.add_argument('--quiet', action='store_true', help="no per-batch progress")
+    args = parser.parse_args()
+
+    importer = import_records(
+        args.entity, args.path, args.format, args.batch_size,
+        upsert=not args.insert_only, errors_path=args.errors, quiet=args.quiet
+    )
+    sys.exit(1 if importer.rejected else 0)
+
+if __name__ == '__main__':
+    main()
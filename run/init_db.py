@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.db import db, create_tables, pool_stats
+from backend.app import app
+from backend.models.onboarding import Staff
+
+def init_database():
+    """Create any missing tables, columns and indexes in the configured database"""
+    with app.app_context():
+        create_tables()
+        # create_tables backfills rollup columns it adds; recounting here too
+        # repairs databases whose columns were added before it did
+        print(f"Recounted onboarding progress for {Staff.refresh_progress()} staff")
+        db.session.commit()
+        print(f"Database ready: {pool_stats()['status']}")
+
+if __name__ == '__main__':
+    init_database()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+from backend.models.onboarding import Staff, OnboardingTask
+from backend.db import db, create_tables
+from backend.app import app
+from backend.routes.onboarding import load_onboarding_data
+
+def migrate_onboarding(force=False):
+    """One-shot migration of mock/onboarding.json into the staff/onboarding_tasks tables"""
+    
+    with app.app_context():
+        create_tables()
+        
+        if Staff.query.first() is not None and not force:
+            print("Onboarding tables already populated, skipping (use --force to reload).")
+            return
+        
+        staff_data = load_onboarding_data()
+        if not staff_data:
+            print("No onboarding data found in mock/onboarding.json")
+            return
+        
+        # Replace everything in a single transaction
+        OnboardingTask.query.delete()
+        Staff.query.delete()
+        
+        staff_rows = []
+        task_rows = []
+        for staff in staff_data:
+            staff_rows.append({
+                'id': staff['id'],
+                'name': staff['name'],
+                'position': staff['position'],
+                'start_date': datetime.strptime(staff['start_date'], "%Y-%m-%d").date()
+            })
+            for task in staff.get('tasks', []):
+                task_rows.append({
+                    'staff_id': staff['id'],
+                    'task_index': task['id'],
+                    'name': task['name'],
+                    'completed': bool(task.get('completed', False))
+                })
+        
+        db.session.execute(db.insert(Staff), staff_rows)
+        if task_rows:
+            db.session.execute(db.insert(OnboardingTask), task_rows)
+        Staff.refresh_progress()
+        db.session.commit()
+        print(f"Successfully migrated {len(staff_rows)} staff and {len(task_rows)} onboarding tasks to the database!")
+
+if __name__ == '__main__':
+    migrate_onboarding(force='--force' in sys.argv[1:])
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from backend.utils.upload_log import upload_log
+from backend.utils.upload_processing import PENDING, FAILED, upload_processor
+
+def process_uploads(retry_failed=False):
+    """Run post-processing for uploads left pending (or failed, when asked)"""
+    statuses = (PENDING, FAILED) if retry_failed else (PENDING,)
+    records = [record for status in statuses for record in upload_log.find('status', status)]
+    outcomes = {}
+    for record in records:
+        if record.get('status') == FAILED:
+            # Put it back in line; process() only takes pending uploads
+            upload_log.append(dict(record, status=PENDING))
+        outcome = upload_processor.process(record["id"])
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    print(f"Processed {len(records)} uploads: "
+          + ', '.join(f"{count} {outcome or 'skipped'}" for outcome, count in sorted(outcomes.items(), key=str)))
+    return outcomes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Post-process uploads that are still pending")
+    parser.add_argument('--retry-failed', action='store_true', help="also reprocess uploads that failed")
+    args = parser.parse_args()
+    process_uploads(retry_failed=args.retry_failed)
@@ -6,7 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from datetime import datetime
 from backend.models.contract import Contract
-from backend.db import db
+from backend.db import db, create_tables
 from backend.app import app
 
 def seed_contracts():
@@ -22,6 +22,8 @@ def seed_contracts():
     ]
     
     with app.app_context():
+        create_tables()
+        
         # Clear existing contracts
         Contract.query.delete()
         
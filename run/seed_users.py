@@ -3,21 +3,21 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.models.user import User
-from backend.db import db
+from backend.db import db, create_tables
 from backend.app import app
-from flask_bcrypt import generate_password_hash
+from backend.utils.password_hasher import password_hasher
 
 def seed_users():
     with app.app_context():
-        # Create all tables
-        db.create_all()
+        # Create any missing tables
+        create_tables()
         
         # Check if user already exists
         if not User.query.filter_by(username="azril").first():
             # Create default admin user
             admin_user = User(
                 username="azril",
-                password_hash=generate_password_hash("muvon123").decode("utf-8"),
+                password_hash=password_hasher.hash("muvon123"),
                 role="admin"
             )
             db.session.add(admin_user)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Production launcher: pre-forked workers with warm-up, graceful reload and recycling
+
+    python run/serve.py [--port 8080] [--workers N] [--threads 4] [--max-requests 10000]
+
+Settings default to MUVHR_PORT, MUVHR_WORKERS, MUVHR_THREADS, ... (see
+backend/server.py). Send SIGHUP to reload the code, SIGTERM to drain and stop.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.server import main
+
+if __name__ == '__main__':
+    main()
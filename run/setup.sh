@@ -7,5 +7,8 @@ pip install -r requirements.txt
 # Install frontend deps (optional: if you use npm packages for frontend)
 npm install
 
+# Create database tables and indexes
+python run/init_db.py
+
 # Launch server (Codex runs on port 8080 by default)
 python backend/app.py
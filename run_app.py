@@ -11,14 +11,19 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import and run the Flask app
 from backend.app import app
 
+# Development server; use run/serve.py for production
+HOST = os.environ.get('MUVHR_HOST', '0.0.0.0')
+PORT = int(os.environ.get('MUVHR_PORT') or os.environ.get('PORT') or 5000)
+DEBUG = os.environ.get('MUVHR_DEBUG', '1') != '0'
+
 if __name__ == "__main__":
     print("🚀 Starting MuvHR Flask Application...")
-    print("📍 Access the application at: http://localhost:5000")
+    print(f"📍 Access the application at: http://localhost:{PORT}")
     print("🔧 Press Ctrl+C to stop the server")
     print("-" * 50)
     
     try:
-        app.run(host="0.0.0.0", port=5000, debug=True)
+        app.run(host=HOST, port=PORT, debug=DEBUG)
     except KeyboardInterrupt:
         print("\n👋 MuvHR application stopped.")
     except Exception as e:
@@ -14,9 +14,14 @@ sys.path.insert(0, str(project_root))
 # Import and run the Flask app
 from backend.app import app
 
+# Development server; use run/serve.py for production
+HOST = os.environ.get('MUVHR_HOST', '0.0.0.0')
+PORT = int(os.environ.get('MUVHR_PORT') or os.environ.get('PORT') or 8080)
+DEBUG = os.environ.get('MUVHR_DEBUG', '1') != '0'
+
 if __name__ == "__main__":
     print("🚀 Starting MuvHR Backend Server...")
-    print("📍 Server will be available at: http://localhost:8080")
+    print(f"📍 Server will be available at: http://localhost:{PORT}")
     print("🎯 Frontend should be served from: frontend/index.html")
     print("📊 Features available:")
     print("   • Contracts Management (Admin, HR, Manager)")
@@ -27,7 +32,7 @@ if __name__ == "__main__":
     print("\n" + "="*50 + "\n")
     
     try:
-        app.run(host="0.0.0.0", port=8080, debug=True)
+        app.run(host=HOST, port=PORT, debug=DEBUG)
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
     except Exception as e:
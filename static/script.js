@@ -5,10 +5,10 @@
 const roleModuleAccess = {
     'Admin': ['Contractors', 'Onboarding', 'Resources', 'Upload', 'Time Off', 'Time Tracking', 'Groups', 'Entities', 'Roles & Permissions', 'Billing & Payments'],
     'HR Specialist': ['Contractors', 'Onboarding', 'Resources', 'Upload', 'Time Off', 'Time Tracking', 'Groups'],
-    'Manager': ['Contractors', 'Resources', 'Upload', 'Time Off'],
-    'Engineer': ['Resources', 'Upload'],
-    'Marketing': ['Resources', 'Upload'],
-    'Intern': ['Resources']
+    'Manager': ['Contractors', 'Onboarding', 'Resources', 'Upload', 'Time Off'],
+    'Engineer': ['Onboarding', 'Resources', 'Upload'],
+    'Marketing': ['Onboarding', 'Resources', 'Upload'],
+    'Intern': ['Onboarding', 'Resources']
 };
 
 const moduleDefinitions = {
@@ -219,6 +219,7 @@ async function updateRoleDisplay() {
         
         // Generate dashboard modules
         generateDashboardModules(roleName);
+        prefetchDashboard(currentRole);
         
     } else {
         roleDisplay.innerHTML = `
@@ -230,6 +231,7 @@ async function updateRoleDisplay() {
         // Hide welcome header and dashboard modules
         welcomeHeader.classList.add('hidden');
         dashboardModules.classList.add('hidden');
+        window.dashboardData = null;
     }
     
     // Clear all content sections when role changes
@@ -300,6 +302,37 @@ function generateDashboardModules(roleName) {
 // MODULE LOADING FUNCTIONS
 // ==========================================
 
+// Module payloads prefetched in one request per role change; each is
+// used once, so reopening a module fetches it fresh
+window.dashboardData = null;
+
+async function prefetchDashboard(role) {
+    window.dashboardData = null;
+    if (!role) return;
+    try {
+        const res = await fetch(`/api/dashboard/${role}`);
+        if (res.ok) {
+            const data = await res.json();
+            window.dashboardData = { role: role, modules: data.modules };
+        }
+    } catch (error) {
+        console.error('Error prefetching dashboard:', error);
+    }
+}
+
+async function fetchModule(moduleKey, url) {
+    const cached = window.dashboardData;
+    if (cached && cached.role === getCurrentRole() && cached.modules[moduleKey]) {
+        const module = cached.modules[moduleKey];
+        delete cached.modules[moduleKey];
+        if (module.success) {
+            return { ok: true, data: module.data };
+        }
+    }
+    const res = await fetch(url);
+    return { ok: res.ok, data: await res.json() };
+}
+
 async function loadContracts() {
     const currentRole = getCurrentRole();
     if (!currentRole) {
@@ -311,10 +344,9 @@ async function loadContracts() {
     const roleFormatted = formatRoleForAPI(currentRole);
     
     try {
-        const res = await fetch(`/api/contractors/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('contracts', `/api/contractors/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderContractsTable(data.contractors);
         } else {
             showErrorMessage('contracts-table', 'Access Denied', data.error);
@@ -336,10 +368,9 @@ async function loadOnboarding() {
     const roleFormatted = currentRole.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
     
     try {
-        const res = await fetch(`/api/onboarding/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('onboarding', `/api/onboarding/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderOnboardingSection(data.staff, currentRole);
         } else {
             showErrorMessage('onboarding-section', 'Access Denied', data.error);
@@ -361,10 +392,9 @@ async function loadResources() {
     const roleFormatted = currentRole.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
     
     try {
-        const res = await fetch(`/api/resources/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('resources', `/api/resources/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderResourcesSection(data.resources, currentRole);
         } else {
             showErrorMessage('resources-section', 'Access Denied', data.error);
@@ -386,10 +416,9 @@ async function loadTimeOff() {
     const roleFormatted = currentRole.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
     
     try {
-        const res = await fetch(`/api/time-off/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('time-off', `/api/time-off/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderTimeOffSection(data.time_off);
         } else {
             showErrorMessage('time-off-section', 'Access Denied', data.error);
@@ -411,10 +440,9 @@ async function loadTimeTracking() {
     const roleFormatted = currentRole.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
     
     try {
-        const res = await fetch(`/api/time-tracking/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('time-tracking', `/api/time-tracking/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderTimeTrackingSection(data.time_tracking);
         } else {
             showErrorMessage('time-tracking-section', 'Access Denied', data.error);
@@ -436,10 +464,9 @@ async function loadGroups() {
     const roleFormatted = currentRole.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
     
     try {
-        const res = await fetch(`/api/groups/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('groups', `/api/groups/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderGroupsSection(data.groups);
         } else {
             showErrorMessage('groups-section', 'Access Denied', data.error);
@@ -461,10 +488,9 @@ async function loadEntities() {
     const roleFormatted = currentRole.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase());
     
     try {
-        const res = await fetch(`/api/entities/${roleFormatted}`);
-        const data = await res.json();
+        const { ok, data } = await fetchModule('entities', `/api/entities/${roleFormatted}`);
         
-        if (res.ok) {
+        if (ok) {
             renderEntitiesSection(data.entities);
         } else {
             showErrorMessage('entities-section', 'Access Denied', data.error);